@@ -0,0 +1,202 @@
+"""Utilitários de áudio PCM: leitura de WAV e saída "sempre aberta".
+
+O `AudioKeepAlive` mantém um `QAudioOutput` tocando silêncio enquanto o
+monitor está armado. Assim o dispositivo (ou o PulseAudio) não entra em
+suspensão entre um susto e outro, e o som do susto entra direto no stream
+que já está rodando, sem pagar a latência de acordar a saída.
+"""
+
+import os
+import struct
+import time
+from collections import namedtuple
+
+from PyQt5.QtCore import QIODevice
+from PyQt5.QtMultimedia import QAudio, QAudioDeviceInfo, QAudioFormat, QAudioOutput
+
+from . import metrics
+
+# Saída do `python -m components.audio_prep`
+PREPARED_DIR = 'assets/prepared'
+
+WavInfo = namedtuple('WavInfo', 'channels sample_rate sample_width data_offset data_size')
+
+
+def parse_wav(data):
+    """Lê o cabeçalho RIFF/WAVE de `data` (bytes, mmap ou memoryview).
+
+    Só aceita PCM inteiro. Levanta ValueError se o arquivo não for válido.
+    """
+    if len(data) < 12 or bytes(data[0:4]) != b'RIFF' or bytes(data[8:12]) != b'WAVE':
+        raise ValueError("não é um arquivo WAV (RIFF/WAVE)")
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = bytes(data[pos:pos + 4])
+        size = struct.unpack_from('<I', data, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b'fmt ':
+            if size < 16 or body + 16 > len(data):
+                raise ValueError("chunk 'fmt ' truncado")
+            tag, channels, rate, _, _, bits = struct.unpack_from('<HHIIHH', data, body)
+            if channels == 0:
+                raise ValueError("WAV sem canais")
+            if tag not in (1, 0xFFFE):
+                raise ValueError(f"formato WAV não suportado (tag {tag}), use PCM")
+            if bits not in (8, 16, 24, 32):
+                raise ValueError(f"profundidade não suportada: {bits} bits")
+            fmt = (channels, rate, bits // 8)
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("chunk 'data' antes do 'fmt '")
+            size = min(size, len(data) - body)
+            return WavInfo(fmt[0], fmt[1], fmt[2], body, size)
+        # Chunks têm tamanho par (byte de padding)
+        pos = body + size + (size & 1)
+    raise ValueError("WAV sem chunk 'data'")
+
+
+def load_wav(source):
+    """Retorna (WavInfo, bytes PCM) de um WAV (caminho ou bytes)."""
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            data = f.read()
+    else:
+        data = bytes(source)
+    info = parse_wav(data)
+    return info, data[info.data_offset:info.data_offset + info.data_size]
+
+
+def prepared_path(path, prepared_dir=PREPARED_DIR):
+    """Retorna a versão preparada (reamostrada/normalizada) do WAV, se existir."""
+    candidate = os.path.join(prepared_dir, os.path.basename(path))
+    return candidate if os.path.exists(candidate) else path
+
+
+def audio_format(info):
+    """Monta o QAudioFormat equivalente ao WavInfo."""
+    fmt = QAudioFormat()
+    fmt.setSampleRate(info.sample_rate)
+    fmt.setChannelCount(info.channels)
+    fmt.setSampleSize(info.sample_width * 8)
+    fmt.setCodec('audio/pcm')
+    fmt.setByteOrder(QAudioFormat.LittleEndian)
+    # WAV de 8 bits é unsigned, o resto é signed
+    fmt.setSampleType(QAudioFormat.UnSignedInt if info.sample_width == 1 else QAudioFormat.SignedInt)
+    return fmt
+
+
+def bytes_per_second(info):
+    return info.sample_rate * info.channels * info.sample_width
+
+
+class _SilenceFeeder(QIODevice):
+    """QIODevice em modo pull: entrega o PCM pendente e, depois, silêncio."""
+
+    def __init__(self, silence_byte=0, parent=None):
+        super().__init__(parent)
+        self._silence_byte = silence_byte
+        self._pending = b''
+        self._pos = 0
+        self.on_first_chunk = None
+
+    def queue(self, pcm):
+        self._pending = pcm
+        self._pos = 0
+
+    def readData(self, maxlen):
+        if self._pos < len(self._pending):
+            first = self._pos == 0
+            chunk = self._pending[self._pos:self._pos + maxlen]
+            self._pos += len(chunk)
+            if first and self.on_first_chunk:
+                self.on_first_chunk()
+            if len(chunk) < maxlen:
+                chunk += bytes([self._silence_byte]) * (maxlen - len(chunk))
+            return chunk
+        return bytes([self._silence_byte]) * maxlen
+
+    def consumed_bytes(self):
+        """Quanto do PCM pendente já foi entregue (None se não há som)."""
+        return self._pos if self._pending else None
+
+    def writeData(self, data):
+        return 0
+
+    def bytesAvailable(self):
+        # Stream infinito: sempre há dados (nem que seja silêncio)
+        return (1 << 20) + super().bytesAvailable()
+
+
+class AudioKeepAlive:
+    """Mantém a saída de áudio aberta enquanto o monitor estiver armado."""
+
+    def __init__(self, sound, buffer_ms=60):
+        self.info, self.pcm = load_wav(sound)
+        self.format = audio_format(self.info)
+        if not QAudioDeviceInfo.defaultOutputDevice().isFormatSupported(self.format):
+            raise ValueError("formato do WAV não suportado pela saída padrão")
+        self.buffer_ms = buffer_ms
+        self.output = None
+        self.feeder = None
+        self._requested_at = None
+
+    @property
+    def armed(self):
+        return self.output is not None
+
+    def arm(self):
+        """Abre o stream e começa a tocar silêncio."""
+        if self.output is not None:
+            return
+        self.feeder = _SilenceFeeder(0x80 if self.info.sample_width == 1 else 0)
+        self.feeder.on_first_chunk = self._on_first_chunk
+        self.feeder.open(QIODevice.ReadOnly)
+        self.output = QAudioOutput(self.format)
+        self.output.setBufferSize(bytes_per_second(self.info) * self.buffer_ms // 1000)
+        self.output.start(self.feeder)
+        print(f"[AUDIO] Saída mantida aberta ({self.buffer_ms} ms de buffer)")
+
+    def disarm(self):
+        if self.output is None:
+            return
+        self.output.stop()
+        self.feeder.close()
+        self.output = None
+        self.feeder = None
+
+    def play(self):
+        """Coloca o som do susto no stream que já está tocando."""
+        if self.output is None:
+            self.arm()
+        if self.output.state() == QAudio.SuspendedState:
+            self.output.resume()
+        self._requested_at = time.perf_counter()
+        self.feeder.queue(self.pcm)
+
+    def stop(self):
+        """Volta para o silêncio sem fechar o stream."""
+        if self.feeder is not None:
+            self.feeder.queue(b'')
+
+    def position_ms(self):
+        """Posição do som do susto que já saiu pelo dispositivo (ms), ou None."""
+        if self.feeder is None:
+            return None
+        consumed = self.feeder.consumed_bytes()
+        if not consumed:
+            return None
+        queued = self.output.bufferSize() - self.output.bytesFree()
+        return max(0.0, (consumed - queued) * 1000.0 / bytes_per_second(self.info))
+
+    def _on_first_chunk(self):
+        if self._requested_at is None:
+            return
+        # Tempo até o pull + o que ainda estava na fila do dispositivo na frente
+        queued = self.output.bufferSize() - self.output.bytesFree()
+        latency = (time.perf_counter() - self._requested_at) * 1000.0
+        latency += queued * 1000.0 / bytes_per_second(self.info)
+        self._requested_at = None
+        metrics.record('audio.keepalive_latency_ms', latency)
+        print(f"[AUDIO] Latência do susto (keep-alive): {latency:.1f} ms")
@@ -0,0 +1,158 @@
+"""Preparação offline dos WAVs de susto.
+
+Para cada WAV:
+  - mede o volume (RMS em dBFS e loudness estilo LUFS: blocos de 400 ms,
+    gate absoluto de -70 e relativo de -10; sem o filtro K, então é uma
+    aproximação);
+  - detecta o silêncio inicial, que soma direto na latência percebida;
+  - reamostra para o formato da saída, normaliza o loudness (com limite
+    de pico) e corta o silêncio.
+
+O resultado vai para `assets/prepared/`. Quem decide o que reprocessar é o
+build (ver build.py): a chave é o hash do conteúdo + parâmetros e fica no
+manifest único dele, então rodar de novo, por aqui ou pelo build, só
+reprocessa o que mudou.
+O nome do arquivo preparado é o nome do original, e é por ele que o
+`prepared_path` acha a versão preparada: os sons padrão vêm do SUSTOS,
+com o mesmo caminho que o monitor recebe.
+
+Por que -16 LUFS: os WAVs originais chegam a ~-2 LUFS com pico em 0 dBFS
+(masterizados no talo, já com clipping). A -16, o nível usual para
+alto-falante de notebook/desktop, todos os personagens ficam com o mesmo
+volume percebido e sobra margem para o mixer somar o susto com a música
+do menu sem estourar. O susto fica ~13 dB mais baixo que o original; quem
+quiser o volume bruto usa `--lufs -3`.
+
+Uso: python -m components.audio_prep [arquivos.wav ...] [--rate 48000] [--lufs -16]
+"""
+
+import argparse
+import glob
+import os
+import wave
+
+import numpy as np
+
+from .audio import PREPARED_DIR, load_wav
+from .catalog import SUSTOS
+from .mixer import convert, pcm_to_float
+
+SCARE_SOUNDS = sorted({info['sound'] for info in SUSTOS.values()})
+TARGET_LUFS = -16.0
+TARGET_RATE = 48000      # quando o dispositivo não informa a taxa preferida
+TARGET_CHANNELS = 2
+
+
+def rms_dbfs(samples):
+    rms = np.sqrt(np.mean(np.square(samples, dtype=np.float64)))
+    return 20.0 * np.log10(max(rms, 1e-10))
+
+
+def loudness(samples, rate):
+    """Loudness integrado (LUFS aproximado, sem filtro K)."""
+    block = int(rate * 0.4)
+    hop = block // 4
+    if len(samples) < block:
+        block = hop = len(samples)
+    # Energia por bloco: média dos quadrados somada entre canais
+    power = np.square(samples, dtype=np.float64).sum(axis=1)
+    csum = np.concatenate(([0.0], np.cumsum(power)))
+    starts = np.arange(0, len(samples) - block + 1, hop)
+    energy = (csum[starts + block] - csum[starts]) / block
+    lufs = -0.691 + 10.0 * np.log10(np.maximum(energy, 1e-12))
+
+    gated = energy[lufs > -70.0]
+    if not len(gated):
+        return -70.0
+    relative = -0.691 + 10.0 * np.log10(gated.mean()) - 10.0
+    gated = energy[(lufs > -70.0) & (lufs > relative)]
+    return float(-0.691 + 10.0 * np.log10(gated.mean())) if len(gated) else -70.0
+
+
+def leading_silence(samples, rate, threshold_db=-50.0, preroll_ms=5):
+    """Número de frames de silêncio no começo (mantendo um pequeno pre-roll)."""
+    limit = 10.0 ** (threshold_db / 20.0)
+    loud = np.flatnonzero(np.abs(samples).max(axis=1) > limit)
+    if not len(loud):
+        return 0
+    return max(0, int(loud[0]) - int(rate * preroll_ms / 1000))
+
+
+def analyse(samples, rate):
+    return {
+        'rms_dbfs': round(float(rms_dbfs(samples)), 2),
+        'lufs': round(loudness(samples, rate), 2),
+        'peak_dbfs': round(float(20.0 * np.log10(max(np.abs(samples).max(), 1e-10))), 2),
+        'leading_silence_ms': round(leading_silence(samples, rate) * 1000.0 / rate, 1),
+    }
+
+
+def prepare(samples, rate, target_lufs, peak_db=-1.0):
+    """Corta o silêncio inicial e normaliza o loudness."""
+    samples = samples[leading_silence(samples, rate):]
+    gain = 10.0 ** ((target_lufs - loudness(samples, rate)) / 20.0)
+    peak = np.abs(samples).max() * gain
+    max_peak = 10.0 ** (peak_db / 20.0)
+    if peak > max_peak:
+        gain *= max_peak / peak
+    return samples * np.float32(gain)
+
+
+def write_wav(path, samples, rate):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype('<i2')
+    tmp = path + '.tmp'
+    with wave.open(tmp, 'wb') as w:
+        w.setnchannels(samples.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    os.replace(tmp, path)
+
+
+def device_rate(default=TARGET_RATE):
+    """Taxa preferida da saída padrão (se o Qt conseguir informar)."""
+    try:
+        from PyQt5.QtMultimedia import QAudioDeviceInfo
+        rate = QAudioDeviceInfo.defaultOutputDevice().preferredFormat().sampleRate()
+        return rate if rate > 0 else default
+    except ImportError:
+        return default
+
+
+def prepare_file(path, out_path, rate=TARGET_RATE, channels=TARGET_CHANNELS, target_lufs=TARGET_LUFS):
+    """Prepara um WAV. Retorna (taxa original, análise antes, análise depois)."""
+    info, pcm = load_wav(path)
+    samples = pcm_to_float(pcm, info)
+    before = analyse(samples, info.sample_rate)
+    samples = convert(samples, info.sample_rate, rate, channels)
+    samples = prepare(samples, rate, target_lufs)
+    write_wav(out_path, samples, rate)
+    after = analyse(samples, rate)
+    print(f"[PREP] {os.path.basename(path)}: {info.sample_rate} Hz -> {rate} Hz, "
+          f"{before['lufs']} -> {after['lufs']} LUFS, "
+          f"silêncio cortado {before['leading_silence_ms']} ms")
+    return info.sample_rate, before, after
+
+
+def prepare_all(paths, out_dir=PREPARED_DIR, rate=TARGET_RATE, channels=TARGET_CHANNELS,
+                target_lufs=TARGET_LUFS, jobs=None):
+    """Prepara os WAVs pelo build (mesmo cache). Retorna {saída: 'cache' | 'build' | 'erro'}."""
+    from .build import Builder, audio_tasks
+    tasks = audio_tasks(paths, out_dir, {'rate': rate, 'channels': channels, 'lufs': target_lufs})
+    return Builder(workers=jobs).run(tasks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepara os WAVs de susto")
+    parser.add_argument('paths', nargs='*', default=SCARE_SOUNDS)
+    parser.add_argument('--rate', type=int, default=None, help="taxa de saída (padrão: a do dispositivo)")
+    parser.add_argument('--lufs', type=float, default=TARGET_LUFS)
+    parser.add_argument('--out', default=PREPARED_DIR)
+    args = parser.parse_args(argv)
+    paths = [p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])]
+    results = prepare_all(paths, args.out, rate=args.rate or device_rate(), target_lufs=args.lufs)
+    return 1 if 'erro' in results.values() else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
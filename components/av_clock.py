@@ -0,0 +1,113 @@
+"""Relógio de apresentação compartilhado entre áudio e vídeo do susto.
+
+O áudio é o mestre: o relógio devolve a posição do som que está de fato
+saindo do dispositivo, e o FramePlayer escolhe o quadro a partir dela.
+Enquanto o som não começa o vídeo segura o primeiro quadro; se o áudio
+nunca começar (ou acabar antes do GIF) o relógio segue pelo relógio
+monotônico a partir da última posição conhecida.
+
+Checagem headless do skew: QT_QPA_PLATFORM=offscreen python -m components.av_clock
+(a mesma medição roda no pytest, em tests/test_av_clock.py)
+"""
+
+import time
+
+# Quanto esperar o áudio começar antes de seguir só pelo relógio monotônico
+AUDIO_START_TIMEOUT_MS = 250
+
+
+class PresentationClock:
+    """Relógio em segundos (mesma interface do time.monotonic)."""
+
+    def __init__(self, audio_position=None, start_timeout_ms=AUDIO_START_TIMEOUT_MS):
+        # audio_position: callable que retorna a posição tocada em ms (ou None)
+        self.audio_position = audio_position
+        self.start_timeout_ms = start_timeout_ms
+        self.t0 = None
+        self._last_pos = None
+        self._last_at = None
+        self._last_returned = 0.0
+
+    def start(self):
+        self.t0 = time.monotonic()
+        self._last_pos = None
+        self._last_at = None
+        self._last_returned = 0.0
+
+    @property
+    def audio_master(self):
+        """True depois que o áudio começou a andar."""
+        return self._last_pos is not None
+
+    def __call__(self):
+        mono = time.monotonic()
+        pos = self.audio_position() if self.audio_position else None
+        if pos is not None and pos > 0 and pos != self._last_pos:
+            self._last_pos = pos
+            self._last_at = mono
+
+        if self._last_pos is not None:
+            # Interpola entre as leituras (a posição do áudio anda em blocos)
+            ms = self._last_pos + (mono - self._last_at) * 1000.0
+        else:
+            waited = (mono - self.t0) * 1000.0
+            ms = max(0.0, waited - self.start_timeout_ms)
+
+        # Nunca volta no tempo (evita o vídeo "piscar" um quadro para trás)
+        self._last_returned = max(self._last_returned, ms / 1000.0)
+        return self._last_returned
+
+
+SKEW_LIMIT_MS = 20.0
+
+
+def measure_skew(duration_s=2.0):
+    """Toca um GIF sintético contra um "áudio" simulado; retorna a série `av.skew_ms`."""
+    import sys
+
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtGui import QColor, QImage
+    from PyQt5.QtWidgets import QApplication
+
+    from . import metrics
+    from .frames import FrameCanvas, FramePlayer, FrameSequence
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    images = []
+    for i in range(int(duration_s * 25)):
+        image = QImage(64, 64, QImage.Format_ARGB32)
+        image.fill(QColor(i * 5 % 256, 0, 0))
+        images.append(image)
+    frames = FrameSequence(images, [40] * len(images))
+
+    # Áudio simulado: começa 30 ms depois e anda em blocos de 10 ms
+    started = time.monotonic() + 0.03
+
+    def audio_position():
+        ms = (time.monotonic() - started) * 1000.0
+        return None if ms <= 0 else ms - ms % 10
+
+    clock = PresentationClock(audio_position)
+    canvas = FrameCanvas()
+    player = FramePlayer(frames, canvas, time_source=clock)
+    player.finished.connect(app.quit)
+    metrics.reset()
+    clock.start()
+    player.start()
+    QTimer.singleShot(int(duration_s * 1000) + 2000, app.quit)
+    app.exec_()
+    return metrics.get('av.skew_ms')
+
+
+def _selfcheck(threshold_ms=SKEW_LIMIT_MS, duration_s=2.0):
+    from . import metrics
+
+    skew = measure_skew(duration_s)
+    worst = skew.max if skew else 0.0
+    print(metrics.summary('av.skew_ms'))
+    print("OK" if worst <= threshold_ms else f"FALHOU: skew máximo {worst:.1f} ms > {threshold_ms} ms")
+    return worst <= threshold_ms
+
+
+if __name__ == '__main__':
+    raise SystemExit(0 if _selfcheck() else 1)
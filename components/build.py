@@ -0,0 +1,309 @@
+"""Build incremental e paralelo dos artefatos derivados dos assets.
+
+Cada alvo (WAV preparado, pacote .jspk, resources_rc.py, cache de quadros)
+tem uma chave = hash dos parâmetros + hash do conteúdo de cada entrada. Se
+a chave bate com a do último build e a saída existe, o alvo é pulado. O
+hash de cada arquivo fica guardado junto com tamanho e mtime, então um
+arquivo que não foi tocado nem é relido. Esse manifest (`.build/manifest.json`)
+é o único: o `python -m components.audio_prep` também passa por aqui.
+
+Alvos independentes rodam num ProcessPoolExecutor; um pacote só entra na
+fila depois do WAV preparado que ele embute. Cada alvo vai para o log
+(`.build/build.log`) como "cache" ou "build", com o tempo gasto.
+
+Uso: python -m components.build [-j N] [--force] [--dry-run] [--frames 1920x1080@1]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .catalog import PACKS_DIR, SUSTOS
+from .packs import SUFFIX as PACK_SUFFIX
+
+try:
+    from . import audio_prep
+except ImportError:  # sem NumPy: os pacotes embutem o WAV original
+    audio_prep = None
+
+BUILD_DIR = '.build'
+MANIFEST = 'manifest.json'
+LOG = 'build.log'
+QRC = 'resources.qrc'
+RCC_OUT = 'resources_rc.py'
+
+# target: caminho da saída | kind: função do worker | inputs: arquivos lidos
+# params: tudo mais que muda a saída | deps: alvos que precisam vir antes
+Task = namedtuple('Task', 'target kind inputs params deps')
+
+
+# --- Workers (rodam nos processos filhos) ---
+
+def _build_audio(target, inputs, params):
+    audio_prep.prepare_file(inputs[0], target, params['rate'], params['channels'], params['lufs'])
+
+
+def _build_pack(target, inputs, params):
+    from .packs import build_pack
+    members = dict(zip(params['members'], inputs))
+    build_pack(target, params['name'], members, tags=params['tags'], franchise=params['franchise'])
+
+
+def _build_rcc(target, inputs, params):
+    subprocess.run(['pyrcc5', '-o', target, inputs[0]], check=True, capture_output=True)
+
+
+def _build_frames(target, inputs, params):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from . import frame_cache
+    from .decoders import gui_app
+    # A aplicação fica viva no processo do worker entre um alvo e outro
+    gui_app()
+    frame_cache.load(inputs[0], params['width'], params['height'], params['dpr']).close()
+
+
+WORKERS = {
+    'audio': _build_audio,
+    'pack': _build_pack,
+    'rcc': _build_rcc,
+    'frames': _build_frames,
+}
+
+
+def _run(task):
+    start = time.perf_counter()
+    WORKERS[task.kind](task.target, task.inputs, task.params)
+    return (time.perf_counter() - start) * 1000.0
+
+
+# --- Grafo de alvos ---
+
+def _qrc_files(qrc):
+    import xml.etree.ElementTree as ET
+    base = os.path.dirname(qrc)
+    return [os.path.join(base, node.text) for node in ET.parse(qrc).iter('file')]
+
+
+def _missing(name, path):
+    if path and not os.path.exists(path):
+        print(f"[BUILD] Pulando {name}: {path} não existe")
+        return True
+    return False
+
+
+def audio_tasks(paths, out_dir, params):
+    """Alvos dos WAVs preparados (também usado pelo `python -m components.audio_prep`)."""
+    return [Task(os.path.join(out_dir, os.path.basename(path)), 'audio', [path], params, [])
+            for path in paths if os.path.exists(path)]
+
+
+def plan(frames=None, rate=None, channels=None, lufs=None, packs_dir=PACKS_DIR):
+    """Lista os alvos do build a partir de SUSTOS e do resources.qrc (entradas faltando são puladas).
+
+    `rate`, `channels` e `lufs` em None usam os padrões do audio_prep, os mesmos do
+    `python -m components.audio_prep`, para os dois caminhos baterem no mesmo cache.
+    """
+    tasks = []
+    prepared = {}
+    if audio_prep is not None:
+        params = {'rate': rate or audio_prep.device_rate(),
+                  'channels': channels or audio_prep.TARGET_CHANNELS,
+                  'lufs': audio_prep.TARGET_LUFS if lufs is None else lufs}
+        for task in audio_tasks(audio_prep.SCARE_SOUNDS, audio_prep.PREPARED_DIR, params):
+            prepared[task.inputs[0]] = task.target
+            tasks.append(task)
+
+    for name, info in SUSTOS.items():
+        if _missing(name, info['gif']) or _missing(name, info['sound']):
+            continue
+        icon = info.get('icon')
+        if icon and not os.path.exists(icon):
+            print(f"[BUILD] {name}: pacote sem ícone ({icon} não existe)")
+            icon = None
+        members = {'gif': info['gif'], 'sound': prepared.get(info['sound'], info['sound']),
+                   'icon': icon}
+        members = {key: path for key, path in members.items() if path}
+        deps = [members['sound']] if info['sound'] in prepared else []
+        params = {'name': name, 'tags': info.get('tags', []), 'franchise': info.get('franchise', ''),
+                  'members': list(members)}
+        tasks.append(Task(os.path.join(packs_dir, name + PACK_SUFFIX), 'pack',
+                          list(members.values()), params, deps))
+
+    if os.path.exists(QRC) and shutil.which('pyrcc5'):
+        tasks.append(Task(RCC_OUT, 'rcc', [QRC] + _qrc_files(QRC), {}, []))
+
+    if frames:
+        from .frame_cache import SUFFIX as FRAMES_SUFFIX, cache_dir, cache_key
+        width, height, dpr = frames
+        for info in SUSTOS.values():
+            if not os.path.exists(info['gif']):
+                continue
+            target = os.path.join(cache_dir(), cache_key(info['gif'], width, height, dpr) + FRAMES_SUFFIX)
+            tasks.append(Task(target, 'frames', [info['gif']],
+                              {'width': width, 'height': height, 'dpr': dpr}, []))
+    return tasks
+
+
+# --- Build ---
+
+class Builder:
+    def __init__(self, build_dir=BUILD_DIR, workers=None, force=False):
+        self.build_dir = build_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.force = force
+        self.manifest_path = os.path.join(build_dir, MANIFEST)
+        self.manifest = {'files': {}, 'targets': {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest.update(json.load(f))
+        self.log_lines = []
+
+    def file_hash(self, path):
+        """SHA-256 do arquivo, relido só se tamanho ou mtime mudaram."""
+        st = os.stat(path)
+        cached = self.manifest['files'].get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.manifest['files'][path] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def task_key(self, task):
+        h = hashlib.sha256(json.dumps([task.kind, task.params], sort_keys=True).encode())
+        for path in task.inputs:
+            h.update(path.encode())
+            h.update(self.file_hash(path).encode())
+        return h.hexdigest()
+
+    def log(self, status, target, elapsed_ms, detail=''):
+        line = f"{time.strftime('%Y-%m-%d %H:%M:%S')} {status:6} {elapsed_ms:9.1f} ms  {target}"
+        if detail:
+            line += f"  ({detail})"
+        self.log_lines.append(line)
+        print(f"[BUILD] {line[20:]}")
+
+    def run(self, tasks, dry_run=False):
+        """Roda os alvos; retorna {alvo: 'cache' | 'build' | 'erro'}."""
+        pending = {task.target: task for task in tasks}
+        results = {}
+        running = {}
+        keys = {}
+        start = time.perf_counter()
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        executor = None
+        try:
+            while pending or running:
+                for target, task in list(pending.items()):
+                    if any(dep in pending or dep in running for dep in task.deps):
+                        continue
+                    del pending[target]
+                    if any(results.get(dep) == 'erro' for dep in task.deps):
+                        results[target] = 'erro'
+                        self.log('erro', target, 0.0, "dependência falhou")
+                        continue
+                    if dry_run and any(results.get(dep) == 'build' for dep in task.deps):
+                        # A entrada ainda nem existe (ou vai mudar): sairia de novo de qualquer jeito
+                        results[target] = 'build'
+                        self.log('build', target, 0.0, "dry-run")
+                        continue
+                    t0 = time.perf_counter()
+                    try:
+                        key = self.task_key(task)
+                    except OSError as e:
+                        results[target] = 'erro'
+                        self.log('erro', target, 0.0, e)
+                        continue
+                    if (not self.force and self.manifest['targets'].get(target) == key
+                            and os.path.exists(target)):
+                        results[target] = 'cache'
+                        self.log('cache', target, (time.perf_counter() - t0) * 1000.0)
+                        continue
+                    if dry_run:
+                        results[target] = 'build'
+                        self.log('build', target, 0.0, "dry-run")
+                        continue
+                    keys[target] = key
+                    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+                    if executor is None:
+                        executor = ProcessPoolExecutor(
+                            self.workers, mp_context=multiprocessing.get_context(method))
+                    running[target] = executor.submit(_run, task)
+                if not running:
+                    continue
+                done, _ = wait(list(running.values()), return_when=FIRST_COMPLETED)
+                for target, future in list(running.items()):
+                    if future not in done:
+                        continue
+                    del running[target]
+                    try:
+                        elapsed = future.result()
+                    except Exception as e:
+                        results[target] = 'erro'
+                        self.log('erro', target, 0.0, e)
+                        continue
+                    results[target] = 'build'
+                    self.manifest['targets'][target] = keys[target]
+                    self.log('build', target, elapsed)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if not dry_run:
+                self.save()
+
+        counts = {status: list(results.values()).count(status) for status in ('cache', 'build', 'erro')}
+        total = (time.perf_counter() - start) * 1000.0
+        self.log('total', f"{counts['build']} construído(s), {counts['cache']} em cache, "
+                 f"{counts['erro']} erro(s), {self.workers} processo(s)", total)
+        if not dry_run:
+            self.write_log()
+        return results
+
+    def save(self):
+        os.makedirs(self.build_dir, exist_ok=True)
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def write_log(self):
+        os.makedirs(self.build_dir, exist_ok=True)
+        with open(os.path.join(self.build_dir, LOG), 'a') as f:
+            f.write('\n'.join(self.log_lines) + '\n')
+
+
+def _parse_frames(value):
+    size, _, dpr = value.partition('@')
+    width, height = (int(v) for v in size.lower().split('x'))
+    return width, height, float(dpr or 1.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build incremental dos assets")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument('--force', action='store_true', help="ignora o cache e reconstrói tudo")
+    parser.add_argument('--dry-run', action='store_true', help="só mostra o que seria construído")
+    parser.add_argument('--frames', type=_parse_frames, default=None,
+                        help="também pré-escala os quadros para LxA[@dpr] no cache de quadros")
+    parser.add_argument('--rate', type=int, default=None, help="taxa dos WAVs preparados (padrão: a do dispositivo)")
+    parser.add_argument('--lufs', type=float, default=None, help="loudness dos WAVs preparados (padrão: -16)")
+    args = parser.parse_args(argv)
+
+    tasks = plan(frames=args.frames, rate=args.rate, lufs=args.lufs)
+    results = Builder(workers=args.jobs, force=args.force).run(tasks, dry_run=args.dry_run)
+    return 1 if 'erro' in results.values() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Catálogo de sustos: personagens soltos em assets/ (SUSTOS) + pacotes .jspk.
+
+Os pacotes da pasta `packs/` entram no catálogo sem editar código; se um
+pacote tiver o mesmo nome de uma entrada de SUSTOS, o pacote vale.
+"""
+
+import os
+
+from .packs import SUFFIX, ScarePack, load_packs
+
+PACKS_DIR = 'packs'
+
+# Pacotes que saíram do catálogo mas ainda têm fatias (memoryviews) em uso,
+# ex: um ícone sendo decodificado; fecham num refresh seguinte
+_retired = []
+
+SUSTOS = {
+    'Chica': {
+        'gif': os.path.join('assets/video_jumpscare', 'Withered_Chica.gif'),
+        'sound': os.path.join('assets/audios', 'Jumpscare_fnaf2.wav'),
+        'icon': os.path.join('assets/icons', 'Chica_icon.png'),
+        'tags': ['fnaf', 'animatronic'],
+    },
+    'rat': {
+        'gif': os.path.join('assets/video_jumpscare', 'Monster_Rat.gif'),
+        'sound': os.path.join('assets/audios', 'rat_sound.wav'),
+        'icon': os.path.join('assets/icons', 'Monster_rat_icon.png'),
+        'tags': ['monster'],
+    },
+    'Mangle': {
+        'gif': os.path.join('assets/video_jumpscare', 'Mangle.gif'),
+        'sound': os.path.join('assets/audios', 'Jumpscare_fnaf2.wav'),
+        'icon': os.path.join('assets/icons', 'Mangle_icon.png'),
+        'tags': ['fnaf', 'animatronic'],
+    },
+    'Vinnie': {
+        'gif': os.path.join('assets/video_jumpscare','Vinnie.gif'),
+        'sound': os.path.join('assets/audios', 'Vinnie.wav'),
+        'icon': os.path.join('assets/icons', 'Monster_Vinnie_icon.jpg'),
+        'tags': ['monster'],
+    }
+}
+
+
+class CatalogEntry:
+    """Um personagem do catálogo, venha de arquivos soltos ou de um pacote."""
+
+    def __init__(self, name, gif=None, sound=None, icon=None, tags=(), franchise='', pack=None):
+        self.name = name
+        self.gif = gif
+        self.sound = sound
+        self.icon = icon
+        self.tags = list(tags)
+        self.franchise = franchise
+        self.pack = pack
+
+    @classmethod
+    def from_pack(cls, pack):
+        return cls(pack.name, tags=pack.tags, franchise=pack.franchise, pack=pack)
+
+    def _member(self, key, loose):
+        if self.pack is not None:
+            return self.pack.member(key) if self.pack.has(key) else None
+        return loose
+
+    def gif_source(self):
+        """Caminho do GIF ou, para pacotes, os bytes (lidos só quando usados)."""
+        return self._member('gif', self.gif)
+
+    def sound_source(self):
+        return self._member('sound', self.sound)
+
+    def icon_source(self):
+        return self._member('icon', self.icon)
+
+    def launch_args(self):
+        """Argumentos do `main.py --jumpscare` para este personagem."""
+        if self.pack is not None:
+            return ['--pack', self.pack.path]
+        return [self.gif, self.sound]
+
+
+def load_catalog(packs_dir=PACKS_DIR):
+    """Monta o catálogo: SUSTOS + um mmap por pacote (só o cabeçalho é lido)."""
+    entries = {name: CatalogEntry(name, **info) for name, info in SUSTOS.items()}
+    for name, pack in load_packs(packs_dir).items():
+        entries[name] = CatalogEntry.from_pack(pack)
+    return entries
+
+
+def _same(a, b):
+    return a is not None and b is not None and os.path.abspath(a) == os.path.abspath(b)
+
+
+def close_retired():
+    """Fecha (mmap + fd) os pacotes que saíram do catálogo; retorna quantos ainda estão em uso."""
+    for pack in list(_retired):
+        try:
+            pack.close()
+        except BufferError:
+            continue  # ainda há memoryview apontando para o mmap
+        _retired.remove(pack)
+    return len(_retired)
+
+
+def refresh_catalog(catalog, paths, packs_dir=PACKS_DIR):
+    """Atualiza `catalog` (no lugar) só para os arquivos em `paths`.
+
+    Retorna {'added': [...], 'changed': [...], 'removed': [...]} com os nomes
+    afetados; entradas que não tocam em nenhum desses arquivos ficam como estão.
+    """
+    before = set(catalog)
+    added, changed, removed = set(), set(), set()
+    retired = []
+    for path in paths:
+        if path.endswith(SUFFIX) and _same(os.path.dirname(path), packs_dir):
+            for name, entry in list(catalog.items()):
+                if entry.pack is not None and _same(entry.pack.path, path):
+                    del catalog[name]
+                    retired.append(entry.pack)
+                    removed.add(name)
+                    if name in SUSTOS:
+                        catalog[name] = CatalogEntry(name, **SUSTOS[name])
+            if os.path.exists(path):
+                try:
+                    pack = ScarePack(path)
+                except (OSError, ValueError) as e:
+                    print(f"[PACOTES] Ignorando {path}: {e}")
+                    continue
+                old = catalog.get(pack.name)
+                if old is not None and old.pack is not None:
+                    # Outro arquivo com o mesmo nome de pacote: o novo vale
+                    retired.append(old.pack)
+                catalog[pack.name] = CatalogEntry.from_pack(pack)
+                added.add(pack.name)
+            continue
+        for name, entry in catalog.items():
+            if entry.pack is None and any(_same(path, p) for p in (entry.gif, entry.sound, entry.icon)):
+                changed.add(name)
+
+    # Nome que já existia e continua no catálogo (pacote regravado, pacote no lugar de
+    # uma entrada de SUSTOS ou o contrário) conta como alterado
+    for name in list(added | removed):
+        if name in before and name in catalog:
+            removed.discard(name)
+            added.discard(name)
+            changed.add(name)
+    # As entradas antigas já saíram do catálogo; o mmap fecha agora ou, se alguma
+    # fatia ainda estiver em uso, num refresh seguinte
+    _retired.extend(pack for pack in retired if pack not in _retired)
+    close_retired()
+    return {'added': sorted(added), 'changed': sorted(changed - added), 'removed': sorted(removed)}
+
+
+def watched_directories(catalog, packs_dir=PACKS_DIR):
+    """Pastas que contêm algum arquivo do catálogo, mais a pasta de pacotes."""
+    dirs = {os.path.dirname(os.path.abspath(p)) for entry in catalog.values() if entry.pack is None
+            for p in (entry.gif, entry.sound, entry.icon) if p}
+    dirs.add(os.path.abspath(packs_dir))
+    return sorted(dirs)
@@ -0,0 +1,327 @@
+"""Grade virtualizada do catálogo de sustos para o menu.
+
+Um QListView em modo ícone sobre um QAbstractListModel: só as células
+visíveis são pintadas e só elas pedem o ícone ao modelo. O ícone é
+decodificado fora da thread da GUI (QThreadPool pequeno, pedidos mais
+recentes primeiro, fila curta para não decodificar o que já saiu da
+tela), já no tamanho da célula pelo QImageReader, e guardado num cache
+LRU de pixmaps com tamanho máximo.
+
+Benchmark de rolagem com 1000 entradas (offscreen):
+    python -m components.catalog_view [quantidade]
+"""
+
+import os
+import sys
+import time
+from collections import OrderedDict
+
+from PyQt5.QtCore import (QAbstractListModel, QBuffer, QByteArray, QIODevice, QModelIndex, QObject,
+                          QRunnable, QSize, Qt, QThreadPool, pyqtSignal)
+from PyQt5.QtGui import QColor, QImageReader, QPixmap
+from PyQt5.QtWidgets import QAbstractItemView, QListView
+
+from . import metrics
+
+ICON_SIZE = QSize(141, 141)
+CELL_SIZE = QSize(171, 181)
+ENTRY_ROLE = Qt.UserRole + 1
+
+# Decodificações simultâneas e quantos pedidos esperam (os mais antigos já saíram da tela)
+LOADER_THREADS = 2
+MAX_PENDING = 64
+
+STYLE = """
+QListView { background: transparent; border: none; color: white; }
+QListView::item { background-color: rgb(0, 0, 0); border: 2px solid transparent; }
+QListView::item:hover { border: 2px solid #ffffff; }
+"""
+
+
+def read_icon(source, size):
+    """Decodifica o ícone (caminho ou bytes) já reduzido para caber em `size`.
+
+    Retorna um QImage (pode rodar fora da thread da GUI) ou None.
+    """
+    if source is None:
+        return None
+    if isinstance(source, str):
+        reader = QImageReader(source)
+    else:
+        buffer = QBuffer()
+        buffer.setData(QByteArray(bytes(source)))
+        buffer.open(QIODevice.ReadOnly)
+        reader = QImageReader(buffer)
+    original = reader.size()
+    if original.isValid():
+        reader.setScaledSize(original.scaled(size, Qt.KeepAspectRatio))
+    image = reader.read()
+    return None if image.isNull() else image
+
+
+class _IconSignals(QObject):
+    loaded = pyqtSignal(str, int, object)  # nome, geração, QImage ou None
+
+
+class _IconTask(QRunnable):
+    def __init__(self, name, generation, source, signals):
+        super().__init__()
+        self.name = name
+        self.generation = generation
+        self.source = source
+        self.signals = signals
+
+    def run(self):
+        self.signals.loaded.emit(self.name, self.generation, read_icon(self.source, ICON_SIZE))
+
+
+class PixmapCache:
+    """LRU de pixmaps limitado em número de ícones."""
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._items = OrderedDict()
+
+    def get(self, key):
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap):
+        self._items[key] = pixmap
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def discard(self, key):
+        self._items.pop(key, None)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class CatalogModel(QAbstractListModel):
+    """Entradas do catálogo (CatalogEntry) com ícones carregados sob demanda."""
+
+    def __init__(self, entries=(), cache_size=256, parent=None):
+        super().__init__(parent)
+        self._all = {entry.name: entry for entry in entries}
+        self._entries = list(self._all.values())
+        self._filter = None
+        self._fetch = None
+        self._fetch_limit = 0
+        self.icons = PixmapCache(cache_size)
+        self._missing = set()
+        self._queue = OrderedDict()
+        self._inflight = set()
+        self._rows = {}
+        # Muda quando ícones são invalidados: resultados de decodificações antigas são descartados
+        self._generation = 0
+        self._placeholder = QPixmap(ICON_SIZE)
+        self._placeholder.fill(QColor(0, 0, 0))
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(LOADER_THREADS)
+        self._signals = _IconSignals(self)
+        self._signals.loaded.connect(self._on_loaded)
+        self._index_rows()
+
+    def _index_rows(self):
+        self._rows = {entry.name: row for row, entry in enumerate(self._entries)}
+
+    def set_entries(self, entries):
+        self.beginResetModel()
+        self._all = {entry.name: entry for entry in entries}
+        self._entries = list(self._all.values())
+        self._filter = None
+        self._fetch = None
+        self._generation += 1
+        self.icons.clear()
+        self._missing.clear()
+        self._queue.clear()
+        self._index_rows()
+        self.endResetModel()
+
+    def update_entries(self, entries, invalidate=()):
+        """Troca as entradas mantendo o filtro e o cache, menos os ícones de `invalidate`."""
+        if invalidate:
+            self._generation += 1
+        for name in invalidate:
+            self.icons.discard(name)
+            self._missing.discard(name)
+        self._all = {entry.name: entry for entry in entries}
+        self.set_filter(self._filter, self._fetch, self._fetch_limit)
+
+    def set_filter(self, names=None, fetch=None, limit=None):
+        """Mostra só as entradas `names`, nessa ordem (None = todas). Os ícones continuam no cache.
+
+        Com `fetch`, `names` são os `limit` primeiros resultados de uma busca e
+        `fetch(n)` devolve os n primeiros: o resto vem pelo fetchMore quando a
+        rolagem chega ao fim.
+        """
+        self._filter = names
+        self._fetch = fetch if names is not None else None
+        self._fetch_limit = limit or 0
+        self.beginResetModel()
+        if names is None:
+            self._entries = list(self._all.values())
+        else:
+            self._entries = [self._all[name] for name in names if name in self._all]
+        self._queue.clear()
+        self._index_rows()
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        # A busca voltou cheia: pode haver mais resultados
+        return (not parent.isValid() and self._fetch is not None
+                and len(self._filter) >= self._fetch_limit)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._fetch_limit *= 2
+        names = self._fetch(self._fetch_limit)
+        new = [self._all[name] for name in names[len(self._filter):] if name in self._all]
+        self._filter = names
+        if not new:
+            return
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        self._entries.extend(new)
+        for row, entry in enumerate(new, first):
+            self._rows[entry.name] = row
+        self.endInsertRows()
+
+    def entry(self, row):
+        return self._entries[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry.name
+        if role == Qt.DecorationRole:
+            return self._icon(index.row(), entry)
+        if role == Qt.ToolTipRole:
+            return ', '.join(filter(None, [entry.franchise] + entry.tags)) or entry.name
+        if role == ENTRY_ROLE:
+            return entry
+        return None
+
+    def _icon(self, row, entry):
+        pixmap = self.icons.get(entry.name)
+        if pixmap is not None:
+            return pixmap
+        if entry.name not in self._missing and entry.name not in self._inflight:
+            # Só as células visíveis pedem o ícone; o pedido mais recente vai na frente
+            self._queue[entry.name] = entry
+            self._queue.move_to_end(entry.name)
+            while len(self._queue) > MAX_PENDING:
+                self._queue.popitem(last=False)
+            self._pump()
+        return self._placeholder
+
+    def _pump(self):
+        while self._queue and len(self._inflight) < LOADER_THREADS:
+            name, entry = self._queue.popitem(last=True)
+            self._inflight.add(name)
+            self.pool.start(_IconTask(name, self._generation, entry.icon_source(), self._signals))
+
+    def _on_loaded(self, name, generation, image):
+        self._inflight.discard(name)
+        row = self._rows.get(name)
+        if generation == self._generation:
+            if image is None:
+                self._missing.add(name)
+                row = None
+            else:
+                self.icons.put(name, QPixmap.fromImage(image))
+        # Resultado de antes de uma invalidação: é descartado, mas a célula precisa
+        # repintar para pedir o ícone de novo (o pedido novo esbarrou neste em andamento)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+        self._pump()
+
+
+class CatalogView(QListView):
+    """Grade de ícones; emite `chosen(nome)` no clique e `hovered()` ao passar o mouse."""
+
+    chosen = pyqtSignal(str)
+    hovered = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setIconSize(ICON_SIZE)
+        self.setGridSize(CELL_SIZE)
+        self.setSpacing(0)
+        self.setWordWrap(False)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setMouseTracking(True)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setStyleSheet(STYLE)
+        self.clicked.connect(self._on_clicked)
+        self.entered.connect(lambda index: self.hovered.emit())
+
+    def _on_clicked(self, index):
+        self.chosen.emit(index.data(Qt.DisplayRole))
+
+    def visible_cells(self):
+        """Quantas células cabem na tela (mais duas linhas, para já haver o que rolar)."""
+        columns = max(1, self.viewport().width() // CELL_SIZE.width())
+        rows = self.viewport().height() // CELL_SIZE.height() + 2
+        return columns * rows
+
+
+def benchmark(count=1000, steps=200):
+    """Rola a grade inteira e mede o tempo de cada repintura."""
+    from PyQt5.QtWidgets import QApplication
+    from .catalog import CatalogEntry, SUSTOS
+    app = QApplication.instance() or QApplication(sys.argv)
+    icons = [info['icon'] for info in SUSTOS.values()]
+    entries = [CatalogEntry(f"susto_{i:04d}", icon=icons[i % len(icons)]) for i in range(count)]
+
+    model = CatalogModel(entries)
+    view = CatalogView()
+    view.setModel(model)
+    view.resize(784, 431)
+    view.show()
+    app.processEvents()
+
+    bar = view.verticalScrollBar()
+    step = max(1, bar.maximum() // steps)
+    times = []
+    for value in range(0, bar.maximum() + step, step):
+        start = time.perf_counter()
+        bar.setValue(value)
+        app.processEvents()
+        view.viewport().repaint()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        times.append(elapsed)
+        metrics.record('menu.scroll_frame_ms', elapsed)
+    model.pool.waitForDone()
+    times.sort()
+    p = lambda q: times[min(len(times) - 1, int(q * len(times)))]
+    print(f"{count} entradas, {len(times)} passos de rolagem: "
+          f"p50 {p(0.5):.2f} ms | p99 {p(0.99):.2f} ms | máx {times[-1]:.2f} ms | "
+          f"{len(model.icons)} ícone(s) em cache (limite {model.icons.capacity})")
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,191 @@
+"""Observa as pastas de assets e de pacotes e publica as mudanças sem reiniciar.
+
+No Linux usa inotify direto (via ctypes): um fd não bloqueante por
+watcher, lido por um QSocketNotifier no event loop do Qt, então não há
+thread nem polling. Em outros sistemas cai para o QFileSystemWatcher,
+comparando tamanho/mtime dos arquivos da pasta para descobrir o que mudou.
+
+Rajadas de eventos (editor salvando, cópia de vários arquivos, build
+regravando pacotes) são agrupadas por um QTimer de debounce; no fim
+sai um único `pathsChanged` com o conjunto de arquivos alterados e, se o
+watcher estiver cuidando de um catálogo, um `catalogChanged` só com as
+entradas afetadas. Se a fila do kernel estourar (IN_Q_OVERFLOW, eventos
+perdidos), todos os arquivos das pastas contam como alterados.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QSocketNotifier, QTimer, pyqtSignal
+
+from .catalog import PACKS_DIR, refresh_catalog, watched_directories
+
+DEBOUNCE_MS = 300
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+# Sem IN_MODIFY: IN_CLOSE_WRITE já avisa quando a escrita terminou
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+EVENT = struct.Struct('iIII')  # wd, mask, cookie, len (+ nome com len bytes)
+
+
+def _ignored(name):
+    return name.startswith('.') or name.endswith(('.tmp', '~', '.swp'))
+
+
+class _Inotify:
+    """inotify mínimo: watches de pasta e leitura dos nomes alterados."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.dirs = {}
+        # Fila do kernel estourou desde a última leitura: houve eventos perdidos
+        self.overflowed = False
+
+    def add(self, directory):
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch falhou: {directory}")
+        self.dirs[wd] = directory
+
+    def read(self):
+        """Caminhos alterados desde a última leitura."""
+        paths = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return paths
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, size = EVENT.unpack_from(data, pos)
+                name = data[pos + EVENT.size:pos + EVENT.size + size].rstrip(b'\0').decode(errors='replace')
+                pos += EVENT.size + size
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                if wd in self.dirs and name and not _ignored(name):
+                    paths.add(os.path.join(self.dirs[wd], name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CatalogWatcher(QObject):
+    """Observa pastas; com `catalog`, mantém o dict atualizado e emite `catalogChanged`."""
+
+    pathsChanged = pyqtSignal(object)     # set de caminhos absolutos
+    catalogChanged = pyqtSignal(object)   # {'added': [...], 'changed': [...], 'removed': [...]}
+
+    def __init__(self, directories=None, catalog=None, packs_dir=PACKS_DIR, debounce_ms=DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.packs_dir = packs_dir
+        if directories is None:
+            directories = watched_directories(catalog or {}, packs_dir)
+        self.directories = [os.path.abspath(d) for d in directories if os.path.isdir(d)]
+        self._changed = set()
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._flush)
+
+        self._inotify = None
+        self._fallback = None
+        try:
+            self._inotify = _Inotify()
+            for directory in self.directories:
+                self._inotify.add(directory)
+            self._notifier = QSocketNotifier(self._inotify.fd, QSocketNotifier.Read, self)
+            self._notifier.activated.connect(self._on_inotify)
+        except (OSError, AttributeError) as e:
+            # AttributeError: libc sem inotify (macOS, Windows)
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            print(f"[WATCH] inotify indisponível ({e}), usando QFileSystemWatcher")
+            self._snapshot = {d: self._scan(d) for d in self.directories}
+            self._fallback = QFileSystemWatcher(self.directories, self)
+            self._fallback.directoryChanged.connect(self._on_directory_changed)
+            self._fallback.fileChanged.connect(self._on_directory_changed)
+            files = [p for d in self.directories for p in self._snapshot[d]]
+            if files:
+                self._fallback.addPaths(files)
+        print(f"[WATCH] Observando {len(self.directories)} pasta(s)")
+
+    @staticmethod
+    def _scan(directory):
+        out = {}
+        for entry in os.scandir(directory):
+            if entry.is_file() and not _ignored(entry.name):
+                st = entry.stat()
+                out[entry.path] = (st.st_size, st.st_mtime_ns)
+        return out
+
+    def _on_inotify(self):
+        paths = self._inotify.read()
+        if self._inotify.overflowed:
+            self._inotify.overflowed = False
+            print("[WATCH] Fila do inotify estourou; reescaneando as pastas")
+            paths |= self._all_paths()
+        self._queue(paths)
+
+    def _all_paths(self):
+        """Tudo o que pode ter mudado: arquivos das pastas + os do catálogo (pegam as remoções)."""
+        paths = set()
+        for directory in self.directories:
+            try:
+                paths |= self._scan(directory).keys()
+            except OSError:
+                pass
+        for entry in (self.catalog or {}).values():
+            sources = [entry.pack.path] if entry.pack is not None else [entry.gif, entry.sound, entry.icon]
+            paths |= {os.path.abspath(p) for p in sources if p}
+        return paths
+
+    def _on_directory_changed(self, path):
+        directory = path if path in self._snapshot else os.path.dirname(path)
+        if directory not in self._snapshot:
+            return
+        before, after = self._snapshot[directory], self._scan(directory)
+        self._snapshot[directory] = after
+        changed = {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+        # Arquivos substituídos (rename atômico) saem do watch; recoloca os novos
+        new_files = [p for p in after if p not in self._fallback.files()]
+        if new_files:
+            self._fallback.addPaths(new_files)
+        self._queue(changed)
+
+    def _queue(self, paths):
+        if paths:
+            self._changed |= paths
+            self._debounce.start()
+
+    def _flush(self):
+        paths, self._changed = self._changed, set()
+        print(f"[WATCH] {len(paths)} arquivo(s) alterado(s)")
+        self.pathsChanged.emit(paths)
+        if self.catalog is not None:
+            changes = refresh_catalog(self.catalog, paths, self.packs_dir)
+            if any(changes.values()):
+                print(f"[WATCH] Catálogo: +{len(changes['added'])} ~{len(changes['changed'])} "
+                      f"-{len(changes['removed'])}")
+                self.catalogChanged.emit(changes)
+
+    def close(self):
+        self._debounce.stop()
+        if self._inotify is not None:
+            self._notifier.setEnabled(False)
+            self._inotify.close()
+            self._inotify = None
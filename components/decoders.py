@@ -0,0 +1,331 @@
+"""Decodificadores de GIF plugáveis.
+
+Todo decodificador implementa a mesma interface (`GifDecoder.frames()`,
+que gera pares (QImage, delay em ms)), então o menu e o
+JumpscareController podem trocar de backend sem mudar mais nada. A
+origem pode ser um caminho ou os bytes do GIF (ex: membro de um pacote).
+
+Backends:
+  - "qmovie": o QMovie do Qt (padrão, sem dependências extras);
+  - "pillow": o Pillow decodifica o LZW de cada quadro e a composição
+    (transparência e modos de descarte do GIF) é feita em NumPy.
+
+O backend padrão vem da variável de ambiente JUMPSCARE_DECODER.
+
+Benchmark (quadros/s, pico de RSS e tempo até o 1º quadro de todos os
+GIFs em assets/): python -m components.decoders
+"""
+
+import glob
+import io
+import json
+import os
+import struct
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+from PyQt5 import sip
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QGuiApplication, QImage, QMovie
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # backend "pillow" fica indisponível
+    np = None
+    Image = None
+
+DEFAULT_DELAY_MS = 100
+DEFAULT_BACKEND = os.environ.get('JUMPSCARE_DECODER', 'qmovie')
+PAINT_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+# --- Estrutura do arquivo GIF ---
+
+GifFrame = namedtuple('GifFrame', 'x y width height delay disposal transparent palette interlaced start end')
+GifInfo = namedtuple('GifInfo', 'width height palette background frames')
+
+
+def _skip_sub_blocks(data, pos):
+    while data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+
+def parse_gif(data):
+    """Lê a estrutura de blocos de um GIF sem decodificar os pixels."""
+    if bytes(data[:3]) != b'GIF':
+        raise ValueError("não é um GIF")
+    width, height, flags, background = struct.unpack_from('<HHBB', data, 6)
+    pos = 13
+    palette = None
+    if flags & 0x80:
+        size = 3 * (2 << (flags & 7))
+        palette = bytes(data[pos:pos + size])
+        pos += size
+
+    frames = []
+    delay, disposal, transparent = DEFAULT_DELAY_MS, 0, None
+    while pos < len(data):
+        block = data[pos]
+        if block == 0x21:
+            label = data[pos + 1]
+            if label == 0xF9 and data[pos + 2] >= 4:
+                packed, delay_cs, trans_index = struct.unpack_from('<BHB', data, pos + 3)
+                disposal = (packed >> 2) & 7
+                transparent = trans_index if packed & 1 else None
+                delay = delay_cs * 10 if delay_cs > 0 else DEFAULT_DELAY_MS
+            pos = _skip_sub_blocks(data, pos + 2)
+        elif block == 0x2C:
+            start = pos
+            x, y, w, h, packed = struct.unpack_from('<HHHHB', data, pos + 1)
+            pos += 10
+            local = palette
+            if packed & 0x80:
+                size = 3 * (2 << (packed & 7))
+                local = bytes(data[pos:pos + size])
+                pos += size
+            # Pula o "LZW minimum code size" e os sub-blocos de dados
+            pos = _skip_sub_blocks(data, pos + 1)
+            frames.append(GifFrame(x, y, w, h, delay, disposal, transparent, local,
+                                   bool(packed & 0x40), start, pos))
+            delay, disposal, transparent = DEFAULT_DELAY_MS, 0, None
+        elif block == 0x3B:
+            break
+        else:
+            raise ValueError(f"bloco GIF inválido (0x{block:02x}) na posição {pos}")
+    return GifInfo(width, height, palette, background, frames)
+
+
+def single_frame_gif(data, frame):
+    """Monta um GIF mínimo só com o quadro `frame` (no tamanho do próprio quadro)."""
+    palette = frame.palette or bytes(768)
+    bits = max(1, (len(palette) // 3 - 1).bit_length()) - 1
+    out = [b'GIF89a', struct.pack('<HHBBB', frame.width, frame.height, 0x80 | bits, 0, 0), palette]
+    if frame.transparent is not None:
+        out.append(struct.pack('<BBBBHBB', 0x21, 0xF9, 4, 1, 0, frame.transparent, 0))
+    # Descritor na posição 0,0, sem paleta local (ela virou a global)
+    packed = 0x40 if frame.interlaced else 0
+    out.append(struct.pack('<BHHHHB', 0x2C, 0, 0, frame.width, frame.height, packed))
+    header = 10 + (3 * (2 << (data[frame.start + 9] & 7)) if data[frame.start + 9] & 0x80 else 0)
+    out.append(bytes(data[frame.start + header:frame.end]))
+    out.append(b'\x3b')
+    return b''.join(out)
+
+
+def read_source(source):
+    """Bytes do GIF a partir de um caminho ou de um objeto bytes-like."""
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return f.read()
+    return source
+
+
+# --- Backends ---
+
+class GifDecoder:
+    """Interface comum: `frames()` gera (QImage, delay_ms) em ordem."""
+
+    name = None
+
+    def __init__(self, source):
+        self.source = source
+
+    def frames(self):
+        raise NotImplementedError
+
+
+class QMovieDecoder(GifDecoder):
+    name = 'qmovie'
+
+    def frames(self):
+        try:
+            data = read_source(self.source)
+        except OSError:
+            return  # como o QMovie com um arquivo que não abre: nenhum quadro
+        # O nextFrameDelay() do QMovie já vem descontado do tempo de decodificação
+        # (Mangle: 22-34 ms num GIF de 50 ms); o delay certo vem do próprio arquivo
+        try:
+            delays = [frame.delay for frame in parse_gif(data).frames]
+        except (ValueError, IndexError, struct.error):
+            delays = []
+        buffer = QBuffer()
+        buffer.setData(QByteArray(bytes(data)))
+        buffer.open(QIODevice.ReadOnly)
+        # Num QBuffer o QMovie não detecta o formato sozinho ("Invalid device")
+        movie = QMovie(buffer, b'gif')
+        movie.setCacheMode(QMovie.CacheNone)
+        if not movie.isValid() or not movie.jumpToFrame(0):
+            return
+        count = movie.frameCount()
+        while True:
+            index = movie.currentFrameNumber()
+            if index < len(delays):
+                delay = delays[index]
+            else:
+                delay = movie.nextFrameDelay()
+                delay = delay if delay > 0 else DEFAULT_DELAY_MS
+            yield movie.currentImage(), delay
+            if 0 < count <= movie.currentFrameNumber() + 1:
+                break
+            if not movie.jumpToNextFrame():
+                break
+
+
+class PillowDecoder(GifDecoder):
+    name = 'pillow'
+
+    def __init__(self, source):
+        if Image is None:
+            raise ImportError("backend 'pillow' requer Pillow e NumPy")
+        super().__init__(source)
+
+    def frames(self):
+        data = read_source(self.source)
+        info = parse_gif(data)
+        compositor = Compositor(info.width, info.height)
+        for frame in info.frames:
+            indices = decode_indices(data, frame)
+            yield compositor.compose(frame, indices), frame.delay
+
+
+def decode_indices(data, frame):
+    """Decodifica o LZW do quadro (via Pillow) em uma matriz de índices."""
+    with Image.open(io.BytesIO(single_frame_gif(data, frame))) as im:
+        # Modo "P" (ou "L" quando a paleta é a escala de cinza identidade)
+        return np.asarray(im, dtype=np.uint8)
+
+
+class Compositor:
+    """Aplica os quadros de um GIF sobre um canvas RGBA em NumPy."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.canvas = np.zeros((height, width, 4), dtype=np.uint8)
+
+    def compose(self, frame, indices):
+        """Desenha o quadro e retorna o QImage do canvas; o descarte vem em seguida."""
+        saved = self.draw(frame, indices)
+        # A conversão já gera uma cópia própria do QImage
+        image = QImage(sip.voidptr(self.canvas.ctypes.data), self.width, self.height, self.width * 4,
+                       QImage.Format_RGBA8888).convertToFormat(PAINT_FORMAT)
+        self.dispose(frame, saved)
+        return image
+
+    def _region(self, frame):
+        # Recorta o retângulo do quadro para dentro do canvas
+        x1 = min(self.width, frame.x + frame.width)
+        y1 = min(self.height, frame.y + frame.height)
+        return self.canvas[frame.y:y1, frame.x:x1]
+
+    def draw(self, frame, indices):
+        """Aplica o quadro no canvas. Retorna o que for preciso para o descarte."""
+        palette = np.frombuffer(frame.palette or bytes(768), dtype=np.uint8).reshape(-1, 3)
+        rgba = np.zeros((256, 4), dtype=np.uint8)
+        rgba[:len(palette), :3] = palette
+        rgba[:len(palette), 3] = 255
+
+        region = self._region(frame)
+        indices = indices[:region.shape[0], :region.shape[1]]
+        saved = region.copy() if frame.disposal == 3 else None
+        if frame.transparent is None:
+            region[...] = rgba[indices]
+        else:
+            mask = indices != frame.transparent
+            region[mask] = rgba[indices[mask]]
+        return saved
+
+    def dispose(self, frame, saved):
+        """Descarte depois de mostrar: 2 = limpa a área, 3 = volta ao anterior."""
+        if frame.disposal == 2:
+            self._region(frame)[...] = 0
+        elif frame.disposal == 3:
+            self._region(frame)[...] = saved
+
+
+DECODERS = {cls.name: cls for cls in (QMovieDecoder, PillowDecoder)}
+
+
+def available_backends():
+    return [name for name in DECODERS if name != 'pillow' or Image is not None]
+
+
+_gui_app = None
+
+
+def gui_app():
+    """Garante uma QGuiApplication para decodificar fora da GUI (workers, benchmarks).
+
+    A instância criada aqui fica guardada no módulo: sem nenhuma referência o
+    PyQt a destruiria na mesma linha.
+    """
+    global _gui_app
+    app = QGuiApplication.instance()
+    if app is None:
+        app = _gui_app = QGuiApplication(sys.argv)
+    return app
+
+
+def get_decoder(source, backend=DEFAULT_BACKEND):
+    try:
+        cls = DECODERS[backend]
+    except KeyError:
+        raise ValueError(f"decodificador desconhecido: {backend} (opções: {', '.join(DECODERS)})")
+    return cls(source)
+
+
+# --- Benchmark ---
+
+def _peak_rss_kb():
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _bench_worker(backend, path):
+    gui_app()
+    baseline = _peak_rss_kb()
+    start = time.perf_counter()
+    first = None
+    count = 0
+    frames = []
+    for image, _ in get_decoder(path, backend).frames():
+        if first is None:
+            first = time.perf_counter() - start
+        frames.append(image)
+        count += 1
+    total = time.perf_counter() - start
+    print(json.dumps({
+        'frames': count,
+        'fps': count / total if total else 0.0,
+        'first_ms': (first or 0.0) * 1000.0,
+        'peak_rss_mb': (_peak_rss_kb() - baseline) / 1024.0,
+    }))
+
+
+def benchmark(paths=None, backends=None):
+    """Roda cada (backend, GIF) num processo separado para medir o pico de RSS limpo."""
+    paths = paths or sorted(glob.glob('assets/**/*.gif', recursive=True))
+    backends = backends or available_backends()
+    print(f"{'GIF':45} {'backend':8} {'quadros':>7} {'q/s':>8} {'1º quadro':>10} {'RSS pico':>9}")
+    for path in paths:
+        for backend in backends:
+            env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+            result = subprocess.run(
+                [sys.executable, '-m', 'components.decoders', '--worker', backend, path],
+                capture_output=True, text=True, env=env)
+            try:
+                r = json.loads(result.stdout.strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                print(f"{path:45} {backend:8} erro: {result.stderr.strip()[-80:]}")
+                continue
+            print(f"{path:45} {backend:8} {r['frames']:7d} {r['fps']:8.1f} "
+                  f"{r['first_ms']:8.1f}ms {r['peak_rss_mb']:7.1f}MB")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--worker':
+        _bench_worker(sys.argv[2], sys.argv[3])
+    else:
+        benchmark(sys.argv[1:] or None)
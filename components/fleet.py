@@ -0,0 +1,350 @@
+"""Sustos sincronizados numa sala cheia de máquinas.
+
+Um nó é o coordenador: ele sorteia (no lugar de cada monitor sortear o
+seu) e manda por UDP o instante do susto no relógio dele, com uma folga
+(`LEAD_MS`) para todo mundo se preparar. Cada cliente estima a diferença
+entre o seu relógio e o do coordenador com uma troca estilo NTP:
+
+    t0 (cliente envia) -> t1 (coordenador recebe) -> t2 (coordenador responde) -> t3 (cliente recebe)
+    offset = ((t1 - t0) + (t2 - t3)) / 2      atraso = (t3 - t0) - (t2 - t1)
+
+De uma rajada de amostras fica a de menor atraso (a menos afetada por
+fila na rede). Ao receber um susto agendado o cliente converte o instante
+para o relógio local, faz o pré-aquecimento `PREWARM_MS` antes e apresenta
+no instante combinado (QTimer preciso + espera ativa no último ms). Depois
+cada nó informa quando apresentou e o coordenador calcula o skew.
+
+Simulação com vários processos locais (cada um com o relógio deslocado):
+    python -m components.fleet --simulate 4 --scares 5
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+from PyQt5.QtNetwork import QHostAddress, QUdpSocket
+
+from . import metrics
+
+FLEET_PORT = 8766
+LEAD_MS = 600          # folga entre o agendamento e o susto
+PREWARM_MS = 250       # quanto antes do susto cada nó se prepara
+SPIN_MS = 2            # último trecho em espera ativa (o QTimer não é tão preciso)
+SYNC_SAMPLES = 8
+SYNC_SPACING_MS = 25
+SYNC_INTERVAL_S = 10.0
+REPORT_TIMEOUT_MS = 2000
+
+
+def _send(sock, message, host, port):
+    sock.writeDatagram(json.dumps(message).encode('utf-8'), host, port)
+
+
+def _datagrams(sock):
+    while sock.hasPendingDatagrams():
+        data, host, port = sock.readDatagram(sock.pendingDatagramSize())
+        try:
+            message = json.loads(data)
+        except ValueError:
+            continue
+        # Qualquer um na rede pode mandar datagramas: só objetos JSON interessam
+        if isinstance(message, dict):
+            yield message, host, port
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _seq(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def present_at(parent, clock, local_at, prewarm, present):
+    """Agenda o pré-aquecimento e a apresentação para o instante `local_at` de `clock`."""
+    def fire():
+        while clock() < local_at:
+            pass  # no máximo SPIN_MS
+        present()
+
+    delay_ms = (local_at - clock()) * 1000.0
+    QTimer.singleShot(max(0, int(delay_ms - PREWARM_MS)), prewarm)
+    timer = QTimer(parent)
+    timer.setSingleShot(True)
+    timer.setTimerType(Qt.PreciseTimer)
+    timer.timeout.connect(fire)
+    timer.timeout.connect(timer.deleteLater)
+    timer.start(max(0, int(delay_ms - SPIN_MS)))
+
+
+class FleetCoordinator(QObject):
+    """Agenda os sustos e responde às trocas de relógio dos clientes."""
+
+    prewarm = pyqtSignal(int)
+    scare = pyqtSignal(int)
+    skewReport = pyqtSignal(int, object)   # seq, {'nodes': n, 'skew_ms': ..., 'true_skew_ms': ...}
+
+    def __init__(self, port=FLEET_PORT, lead_ms=LEAD_MS, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self.lead_ms = lead_ms
+        self.clients = {}      # nó -> (host, porta)
+        self.synced = set()
+        self.reports = {}      # seq -> {nó: relato}
+        self.seq = 0
+        self.socket = QUdpSocket(self)
+        if not self.socket.bind(QHostAddress.Any, port):
+            raise OSError(f"porta UDP {port} indisponível: {self.socket.errorString()}")
+        self.port = self.socket.localPort()
+        self.socket.readyRead.connect(self._on_ready_read)
+        print(f"[FROTA] Coordenador na porta UDP {self.port}")
+
+    def schedule(self):
+        """Agenda um susto para daqui a `lead_ms` em todos os nós. Retorna o número dele."""
+        self.seq += 1
+        seq = self.seq
+        at = self.clock() + self.lead_ms / 1000.0
+        self.reports[seq] = {}
+        for host, port in self.clients.values():
+            _send(self.socket, {'t': 'scare', 'seq': seq, 'at': at}, host, port)
+        present_at(self, self.clock, at, lambda: self.prewarm.emit(seq), lambda: self._present(seq))
+        QTimer.singleShot(self.lead_ms + REPORT_TIMEOUT_MS, lambda: self._summarize(seq))
+        print(f"[FROTA] Susto #{seq} agendado para {len(self.clients) + 1} nó(s)")
+        return seq
+
+    def _present(self, seq):
+        shown = self.clock()
+        self.scare.emit(seq)
+        self.reports[seq]['coordenador'] = {'shown_at': shown, 'true': time.monotonic()}
+
+    def _on_ready_read(self):
+        for message, host, port in _datagrams(self.socket):
+            t1 = self.clock()
+            kind = message.get('t')
+            node = message.get('node')
+            if not isinstance(node, str):
+                node = f"{host.toString()}:{port}"
+            if kind == 'sync':
+                _send(self.socket, {'t': 'sync_ack', 'id': message.get('id'), 't0': message.get('t0'),
+                                    't1': t1, 't2': self.clock()}, host, port)
+            elif kind == 'hello':
+                self.clients[node] = (host, port)
+            elif kind == 'synced':
+                self.clients[node] = (host, port)
+                self.synced.add(node)
+            elif kind == 'report' and _seq(message.get('seq')) and message['seq'] in self.reports:
+                if not _number(message.get('shown_at')):
+                    continue
+                true = message.get('true')
+                self.reports[message['seq']][node] = {'shown_at': message['shown_at'],
+                                                      'true': true if _number(true) else None}
+            elif kind == 'bye':
+                self.clients.pop(node, None)
+                self.synced.discard(node)
+
+    def _summarize(self, seq):
+        reports = self.reports.pop(seq, {})
+        if len(reports) < 2:
+            return
+        shown = [r['shown_at'] for r in reports.values()]
+        summary = {'nodes': len(reports), 'skew_ms': (max(shown) - min(shown)) * 1000.0}
+        true = [r['true'] for r in reports.values() if r.get('true') is not None]
+        if len(true) == len(reports):
+            # Só vale quando todos os nós estão na mesma máquina (simulação)
+            summary['true_skew_ms'] = (max(true) - min(true)) * 1000.0
+        metrics.record('fleet.skew_ms', summary.get('true_skew_ms', summary['skew_ms']))
+        print(f"[FROTA] Susto #{seq}: {summary['nodes']} nó(s), skew {summary['skew_ms']:.2f} ms"
+              + (f" (real {summary['true_skew_ms']:.2f} ms)" if 'true_skew_ms' in summary else ''))
+        self.skewReport.emit(seq, summary)
+
+    def shutdown(self):
+        for host, port in self.clients.values():
+            _send(self.socket, {'t': 'shutdown'}, host, port)
+
+
+class FleetClient(QObject):
+    """Sincroniza o relógio com o coordenador e apresenta os sustos agendados."""
+
+    prewarm = pyqtSignal(int)
+    scare = pyqtSignal(int)
+    synced = pyqtSignal(float, float)   # offset (s), atraso (s)
+    shutdown = pyqtSignal()
+
+    def __init__(self, host, port=FLEET_PORT, node=None, clock=time.monotonic, true_clock=None, parent=None):
+        super().__init__(parent)
+        self.host = QHostAddress(host)
+        self.port = port
+        self.node = node or f"{os.uname().nodename}-{os.getpid()}"
+        self.clock = clock
+        # Só na simulação: relógio "verdadeiro" comum a todos os processos
+        self.true_clock = true_clock
+        self.offset = None
+        self.delay = None
+        self._samples = []
+        self._pending = {}
+        self.socket = QUdpSocket(self)
+        self.socket.bind(QHostAddress.Any, 0)
+        self.socket.readyRead.connect(self._on_ready_read)
+        self._sync_timer = QTimer(self)
+        self._sync_timer.timeout.connect(self.sync)
+        _send(self.socket, {'t': 'hello', 'node': self.node}, self.host, self.port)
+
+    def start(self, interval_s=SYNC_INTERVAL_S):
+        self.sync()
+        self._sync_timer.start(int(interval_s * 1000))
+
+    def sync(self):
+        """Rajada de SYNC_SAMPLES trocas; o resultado sai em `synced`."""
+        self._samples = []
+        for i in range(SYNC_SAMPLES):
+            QTimer.singleShot(i * SYNC_SPACING_MS, self._ping)
+        QTimer.singleShot(SYNC_SAMPLES * SYNC_SPACING_MS + 200, self._finish_sync)
+
+    def _ping(self):
+        ping_id = uuid.uuid4().hex[:8]
+        t0 = self.clock()
+        self._pending[ping_id] = t0
+        _send(self.socket, {'t': 'sync', 'id': ping_id, 't0': t0, 'node': self.node}, self.host, self.port)
+
+    def _finish_sync(self):
+        self._pending.clear()
+        if not self._samples:
+            print("[FROTA] Coordenador não respondeu à sincronização")
+            return
+        self.offset, self.delay = min(self._samples, key=lambda s: s[1])
+        metrics.record('fleet.sync_delay_ms', self.delay * 1000.0)
+        _send(self.socket, {'t': 'synced', 'node': self.node, 'offset': self.offset}, self.host, self.port)
+        self.synced.emit(self.offset, self.delay)
+
+    def _on_ready_read(self):
+        for message, host, port in _datagrams(self.socket):
+            t3 = self.clock()
+            # Só o coordenador agenda sustos ou manda desligar
+            if not host.isEqual(self.host) or port != self.port:
+                continue
+            kind = message.get('t')
+            if kind == 'sync_ack' and isinstance(message.get('id'), str) and message['id'] in self._pending:
+                t1, t2 = message.get('t1'), message.get('t2')
+                if not (_number(t1) and _number(t2)):
+                    continue
+                t0 = self._pending.pop(message['id'])
+                self._samples.append((((t1 - t0) + (t2 - t3)) / 2.0, (t3 - t0) - (t2 - t1)))
+            elif kind == 'scare':
+                if _seq(message.get('seq')) and _number(message.get('at')):
+                    self._schedule(message['seq'], message['at'])
+            elif kind == 'shutdown':
+                self.shutdown.emit()
+
+    def _schedule(self, seq, at):
+        if self.offset is None:
+            print(f"[FROTA] Susto #{seq} ignorado: relógio ainda não sincronizado")
+            return
+        local_at = at - self.offset
+        if local_at <= self.clock():
+            print(f"[FROTA] Susto #{seq} chegou atrasado; apresentando já")
+        present_at(self, self.clock, local_at, lambda: self.prewarm.emit(seq), lambda: self._present(seq))
+
+    def _present(self, seq):
+        shown = self.clock()
+        self.scare.emit(seq)
+        report = {'t': 'report', 'seq': seq, 'node': self.node, 'shown_at': shown + self.offset,
+                  'true': self.true_clock() if self.true_clock else None}
+        _send(self.socket, report, self.host, self.port)
+
+    def close(self):
+        _send(self.socket, {'t': 'bye', 'node': self.node}, self.host, self.port)
+
+
+def attach(controller, role, address=None):
+    """Liga um JumpscareController à frota. `role` é 'coordinator' ou 'client'."""
+    if role == 'coordinator':
+        node = FleetCoordinator(port=int(address or FLEET_PORT))
+        controller.roll_handler = node.schedule
+    else:
+        host, _, port = (address or '127.0.0.1').partition(':')
+        node = FleetClient(host, int(port or FLEET_PORT))
+        # Quem sorteia é o coordenador
+        controller.disarm()
+        node.start()
+    node.prewarm.connect(lambda seq: controller.prewarm())
+    node.scare.connect(lambda seq: controller.request_scare())
+    return node
+
+
+# --- Simulação local ---
+
+def _run_client(address, node, clock_offset):
+    from PyQt5.QtCore import QCoreApplication
+    app = QCoreApplication(sys.argv)
+    host, _, port = address.partition(':')
+    # Relógio deslocado de propósito: a sincronização tem que descobrir o offset
+    client = FleetClient(host, int(port), node=node, clock=lambda: time.monotonic() + clock_offset,
+                         true_clock=time.monotonic)
+    client.synced.connect(lambda offset, delay: print(
+        f"[{node}] offset estimado {offset * 1000:.3f} ms (real {-clock_offset * 1000:.3f} ms), "
+        f"atraso {delay * 1000:.3f} ms", flush=True))
+    client.shutdown.connect(app.quit)
+    client.start(interval_s=2.0)
+    app.exec_()
+
+
+def simulate(clients=4, scares=5, interval_s=1.5):
+    from PyQt5.QtCore import QCoreApplication
+    app = QCoreApplication(sys.argv)
+    coordinator = FleetCoordinator(port=0)
+    rng = random.Random()
+    procs = [subprocess.Popen([sys.executable, '-m', 'components.fleet', '--client',
+                               f"127.0.0.1:{coordinator.port}", '--node', f"no{i}",
+                               '--clock-offset', f"{rng.uniform(-5.0, 5.0):.6f}"])
+             for i in range(clients)]
+    results = []
+    coordinator.skewReport.connect(lambda seq, summary: results.append(summary))
+
+    def wait_synced():
+        if len(coordinator.synced) < clients:
+            QTimer.singleShot(100, wait_synced)
+            return
+        for i in range(scares):
+            QTimer.singleShot(int(i * interval_s * 1000), coordinator.schedule)
+        QTimer.singleShot(int(scares * interval_s * 1000) + LEAD_MS + REPORT_TIMEOUT_MS + 200, finish)
+
+    def finish():
+        coordinator.shutdown()
+        app.quit()
+
+    QTimer.singleShot(100, wait_synced)
+    app.exec_()
+    for proc in procs:
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    if results:
+        skews = sorted(r.get('true_skew_ms', r['skew_ms']) for r in results)
+        print(f"[FROTA] {len(results)} susto(s) em {clients + 1} nós: skew real médio "
+              f"{sum(skews) / len(skews):.2f} ms, máximo {skews[-1]:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sustos sincronizados em várias máquinas")
+    parser.add_argument('--simulate', type=int, metavar='N', help="coordenador + N clientes locais")
+    parser.add_argument('--scares', type=int, default=5)
+    parser.add_argument('--client', metavar='HOST:PORTA')
+    parser.add_argument('--node')
+    parser.add_argument('--clock-offset', type=float, default=0.0, help="(simulação) desloca o relógio do cliente")
+    args = parser.parse_args(argv)
+    if args.client:
+        _run_client(args.client, args.node, args.clock_offset)
+    else:
+        simulate(args.simulate or 4, args.scares)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Cache em disco de quadros decodificados e já escalados, compartilhado entre processos.
+
+Cada `--jumpscare` decodificava e escalava os mesmos GIFs do zero. Aqui o
+resultado vai para um arquivo por (hash do GIF, resolução, DPR) num layout
+que pode ser mapeado direto na memória: cabeçalho, delays e depois os
+pixels ARGB32 premultiplicados, quadro após quadro. Quem abre o cache só
+faz um mmap e monta QImages por cima das páginas mapeadas, sem cópia, e
+processos diferentes compartilham as mesmas páginas do page cache.
+
+A escrita é atômica (arquivo temporário + fsync + os.replace), então um
+processo que morre no meio nunca deixa um cache corrompido visível. O
+tamanho total é limitado com descarte LRU (pela data de último uso).
+
+Local: $JUMPSCARE_CACHE_DIR ou ~/.cache/jumpscare-simulator/frames
+Limite: $JUMPSCARE_CACHE_MAX_MB (padrão 1024)
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+from PyQt5 import sip
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from .frames import FrameSequence
+
+MAGIC = b'JSFRAME1'
+HEADER = struct.Struct('<8sIIIIIQ')  # magic, quadros, largura, altura, stride, formato, offset dos pixels
+PAGE = mmap.PAGESIZE
+FORMAT = QImage.Format_ARGB32_Premultiplied
+SUFFIX = '.frames'
+
+
+def cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.environ.get('JUMPSCARE_CACHE_DIR') or os.path.join(base, 'jumpscare-simulator', 'frames')
+
+
+def max_cache_bytes():
+    return int(os.environ.get('JUMPSCARE_CACHE_MAX_MB', '1024')) * 2**20
+
+
+def asset_hash(source):
+    """Hash do GIF (caminho ou bytes, ex: membro de um pacote)."""
+    h = hashlib.sha256()
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                h.update(chunk)
+    else:
+        h.update(source)
+    return h.hexdigest()[:32]
+
+
+def cache_key(source, width, height, dpr):
+    return f"{asset_hash(source)}-{width}x{height}@{dpr:g}"
+
+
+class MappedFrameSequence(FrameSequence):
+    """Quadros servidos direto de um arquivo de cache mapeado."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            # ACCESS_COPY: páginas compartilhadas até alguém escrever (o que não fazemos)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        try:
+            magic, count, width, height, stride, fmt, offset = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or fmt != FORMAT or len(self._map) < offset + count * stride * height:
+                raise ValueError(f"cache inválido: {path}")
+            delays = list(struct.unpack_from(f'<{count}I', self._map, HEADER.size))
+        except (ValueError, struct.error) as e:
+            self._map.close()
+            # Arquivo truncado: para quem chama é só um cache inválido
+            raise ValueError(f"cache inválido: {path}") from e
+        self._array = np.frombuffer(self._map, dtype=np.uint8)
+        base = self._array.ctypes.data + offset
+        frame_bytes = stride * height
+        images = [QImage(sip.voidptr(base + i * frame_bytes), width, height, stride, FORMAT)
+                  for i in range(count)]
+        super().__init__(images, delays)
+
+    def close(self):
+        self.images = []
+        self._array = None
+        self._map.close()
+
+
+def write(path, frames, width, height):
+    """Escala e grava os quadros em `path` de forma atômica."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    scaled = [frames.image(i).scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+              .convertToFormat(FORMAT) for i in range(len(frames))]
+    stride = scaled[0].bytesPerLine() if scaled else width * 4
+    header_size = HEADER.size + 4 * len(scaled)
+    offset = (header_size + PAGE - 1) // PAGE * PAGE
+
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(scaled), width, height, stride, FORMAT, offset))
+            f.write(struct.pack(f'<{len(scaled)}I', *frames.delays))
+            f.write(bytes(offset - header_size))
+            for image in scaled:
+                ptr = image.constBits()
+                ptr.setsize(image.sizeInBytes())
+                f.write(ptr)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def evict(directory=None, limit=None):
+    """Apaga os caches menos usados até o total caber no limite."""
+    directory = directory or cache_dir()
+    limit = max_cache_bytes() if limit is None else limit
+    entries = []
+    now = time.time()
+    # Outros processos podem apagar os mesmos arquivos ao mesmo tempo: sumiu, segue
+    for entry in os.scandir(directory):
+        try:
+            if entry.name.endswith('.tmp') and now - entry.stat().st_mtime > 3600:
+                # Sobra de um processo que morreu no meio da escrita
+                os.unlink(entry.path)
+            elif entry.name.endswith(SUFFIX):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        # Quem já mapeou o arquivo continua lendo normalmente depois do unlink
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def load(gif, width, height, dpr=1.0, loader=None):
+    """Retorna os quadros de `gif` (caminho ou bytes) na resolução pedida, usando o cache.
+
+    `loader(gif)` decodifica o GIF quando não há cache (padrão: load_frames).
+    """
+    if loader is None:
+        from .frames import load_frames as loader
+    if isinstance(gif, str) and not os.path.exists(gif):
+        return loader(gif)
+
+    directory = cache_dir()
+    path = os.path.join(directory, cache_key(gif, width, height, dpr) + SUFFIX)
+    if os.path.exists(path):
+        try:
+            frames = MappedFrameSequence(path)
+            os.utime(path)  # marca como usado (LRU)
+            return frames
+        except (OSError, ValueError):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # outro processo já limpou
+
+    frames = loader(gif)
+    if not len(frames):
+        return frames
+    try:
+        write(path, frames, width, height)
+        mapped = MappedFrameSequence(path)
+    except (OSError, ValueError) as e:
+        # Cache inacessível (ex: JUMPSCARE_CACHE_DIR sem permissão): segue sem ele
+        print(f"[CACHE] Não foi possível usar o cache de quadros em {directory}: {e}")
+        return frames
+    # Só agora a cópia mapeada existe; os quadros do loader podem ser soltos
+    # (ex: SharedFrameSequence segura um bloco de memória compartilhada)
+    if hasattr(frames, 'close'):
+        frames.close()
+    evict(directory)
+    return mapped
@@ -0,0 +1,190 @@
+"""Deduplicação e codificação delta dos quadros de um susto.
+
+Muitos GIFs repetem quadros (quadros parados, loops de estática). Aqui
+cada quadro decodificado é "hasheado": duplicatas exatas viram referência
+para o primeiro quadro igual. Os outros são guardados como o retângulo
+que mudou em relação ao quadro anterior, com um quadro-chave completo de
+tempos em tempos para permitir voltar/pular. Na pintura, só o retângulo
+alterado é invalidado.
+
+Relatório de memória e área repintada: python -m components.frame_delta [gifs ...]
+"""
+
+import hashlib
+import sys
+
+import numpy as np
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QImage, QPainter
+
+from .decoders import DEFAULT_BACKEND, get_decoder
+
+PAINT_FORMAT = QImage.Format_ARGB32_Premultiplied
+SCARE_GIFS = [
+    'assets/video_jumpscare/Mangle.gif',
+    'assets/video_jumpscare/Springtrap.gif',
+    'assets/video_jumpscare/Phontom_freddy.gif',
+]
+
+KEY, DELTA, DUP = 0, 1, 2
+
+
+def _pixels(image):
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    return np.frombuffer(ptr, dtype=np.uint32).reshape(image.height(), image.bytesPerLine() // 4)[:, :image.width()]
+
+
+def dirty_rect(previous, current):
+    """Menor retângulo que contém todos os pixels diferentes (ou None)."""
+    diff = _pixels(previous) != _pixels(current)
+    rows = np.flatnonzero(diff.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(diff.any(axis=0))
+    return QRect(int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1))
+
+
+class DeltaFrameStore:
+    """Quadros-chave + deltas retangulares + referências para duplicatas."""
+
+    def __init__(self, key_interval=60, max_delta_ratio=0.6):
+        self.key_interval = key_interval
+        self.max_delta_ratio = max_delta_ratio
+        self.width = 0
+        self.height = 0
+        self.delays = []
+        # Por quadro: (tipo, dado, retângulo sujo em relação ao anterior)
+        #   KEY: QImage completo | DELTA: QImage do retângulo | DUP: índice do original
+        self._entries = []
+        self._hashes = {}
+        self._last = None
+        self._since_key = 0
+        self._canvas = None
+        self._canvas_index = None
+
+    @classmethod
+    def load(cls, source, backend=DEFAULT_BACKEND, **kwargs):
+        store = cls(**kwargs)
+        for image, delay in get_decoder(source, backend).frames():
+            store.append(image, delay)
+        store._last = None
+        return store
+
+    def append(self, image, delay):
+        image = image.convertToFormat(PAINT_FORMAT)
+        if self._last is None:
+            self.width, self.height = image.width(), image.height()
+        elif (image.width(), image.height()) != (self.width, self.height):
+            image = image.scaled(self.width, self.height)
+
+        index = len(self._entries)
+        digest = hashlib.blake2b(_pixels(image).tobytes(), digest_size=16).digest()
+        rect = dirty_rect(self._last, image) if self._last is not None else self.full_rect()
+        area = 0 if rect is None else rect.width() * rect.height()
+
+        original = self._hashes.get(digest)
+        if original is not None:
+            entry = (DUP, original, rect)
+        elif (self._last is None or self._since_key >= self.key_interval
+              or area > self.max_delta_ratio * self.width * self.height):
+            entry = (KEY, image, rect)
+            self._since_key = 0
+        else:
+            entry = (DELTA, image.copy(rect) if rect is not None else None, rect)
+        if original is None:
+            self._hashes[digest] = index
+        self._since_key += 1
+        self._entries.append(entry)
+        self.delays.append(delay)
+        self._last = image
+
+    def __len__(self):
+        return len(self._entries)
+
+    def full_rect(self):
+        return QRect(0, 0, self.width, self.height)
+
+    def dirty_rect(self, index):
+        """Região que muda do quadro index-1 para index (None = nada muda)."""
+        return self._entries[index][2]
+
+    def image(self, index):
+        """Quadro `index` reconstruído (ARGB)."""
+        if index != self._canvas_index:
+            if self._canvas_index is not None and index == self._canvas_index + 1:
+                self._apply(index)
+            else:
+                self._rebuild(index)
+            self._canvas_index = index
+        return self._canvas
+
+    def _apply(self, index):
+        kind, data, rect = self._entries[index]
+        if kind == KEY:
+            self._canvas = data.copy()
+        elif kind == DUP:
+            self._rebuild(data)
+        elif data is not None:
+            painter = QPainter(self._canvas)
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.drawImage(rect.topLeft(), data)
+            painter.end()
+
+    def _rebuild(self, index):
+        """Volta ao quadro-chave anterior e reaplica os deltas até `index`."""
+        kind, data, _ = self._entries[index]
+        if kind == DUP:
+            self._rebuild(data)
+            return
+        key = index
+        while self._entries[key][0] != KEY:
+            key -= 1
+        self._canvas = self._entries[key][1].copy()
+        for i in range(key + 1, index + 1):
+            self._apply(i)
+
+    def release_cache(self):
+        self._canvas = None
+        self._canvas_index = None
+
+    def memory_report(self):
+        stored = 0
+        counts = [0, 0, 0]
+        repaint = 0
+        for kind, data, rect in self._entries:
+            counts[kind] += 1
+            if kind != DUP and data is not None:
+                stored += data.sizeInBytes()
+            if rect is not None:
+                repaint += rect.width() * rect.height()
+        full = len(self) * self.width * self.height
+        return {
+            'frames': len(self),
+            'keys': counts[KEY],
+            'deltas': counts[DELTA],
+            'duplicates': counts[DUP],
+            'stored_bytes': stored,
+            'full_argb_bytes': full * 4,
+            'repaint_pixels': repaint,
+            'full_repaint_pixels': full,
+        }
+
+
+def _report(paths):
+    for path in paths:
+        r = DeltaFrameStore.load(path).memory_report()
+        if not r['frames']:
+            print(f"{path}: sem quadros")
+            continue
+        saved_mem = 100.0 * (1 - r['stored_bytes'] / r['full_argb_bytes'])
+        saved_paint = 100.0 * (1 - r['repaint_pixels'] / r['full_repaint_pixels'])
+        print(f"{path}: {r['frames']} quadros ({r['keys']} chave, {r['deltas']} delta, "
+              f"{r['duplicates']} duplicados) | memória {r['full_argb_bytes'] / 2**20:.1f} -> "
+              f"{r['stored_bytes'] / 2**20:.1f} MB (-{saved_mem:.0f}%) | área repintada -{saved_paint:.0f}%")
+
+
+if __name__ == '__main__':
+    from PyQt5.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    _report(sys.argv[1:] or SCARE_GIFS)
@@ -0,0 +1,215 @@
+"""Armazenamento compacto dos quadros decodificados.
+
+Um GIF é paletizado (8 bits por pixel), mas depois de decodificado cada
+quadro vira ARGB de 32 bits. O `IndexedFrameStore` guarda os quadros como
+índices de 8 bits (`QImage.Format_Indexed8`) com as paletas deduplicadas
+e compartilhadas entre quadros; só os últimos quadros mostrados ficam em
+ARGB, num cache pequeno.
+
+As paletas são exatas (as cores depois da composição), então a volta para
+ARGB devolve os mesmos pixels. Enquanto a união das cores dos quadros
+couber em 256, o GIF inteiro usa uma paleta só (a global, na prática); o
+quadro que a faria estourar (paletas locais diferentes) ganha uma paleta
+própria, deduplicada entre quadros. Um quadro composto com mais de 256
+cores fica guardado em ARGB mesmo.
+
+Relatório de memória: python -m components.frame_store [gifs ...]
+"""
+
+import glob
+import sys
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+from .decoders import DEFAULT_BACKEND, get_decoder
+
+PAINT_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+
+def image_bytes(image):
+    """Cópia dos bytes de um QImage (respeitando o bytesPerLine)."""
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    return bytes(ptr)
+
+
+def argb_pixels(image):
+    """(pixels uint32 altura x largura, QImage ARGB32 que é dono da memória deles)."""
+    # As conversões do Qt para Indexed8 aproximam as cores mesmo com menos de 256
+    argb = image.convertToFormat(QImage.Format_ARGB32)
+    ptr = argb.constBits()
+    ptr.setsize(argb.sizeInBytes())
+    pixels = np.frombuffer(ptr, dtype=np.uint32).reshape(argb.height(), argb.bytesPerLine() // 4)
+    return pixels[:, :argb.width()], argb
+
+
+def index_rows(indices):
+    """Bytes Indexed8 (linhas alinhadas em 4 bytes) a partir da matriz de índices."""
+    height, width = indices.shape
+    rows = np.zeros((height, (width + 3) & ~3), dtype=np.uint8)
+    rows[:, :width] = indices
+    return rows.tobytes()
+
+
+def exact_indexed(image):
+    """QImage Indexed8 com exatamente as cores do quadro, ou None se ele tiver mais de 256."""
+    pixels, _argb = argb_pixels(image)
+    colors = np.unique(pixels)
+    if len(colors) > 256:
+        return None
+    height, width = pixels.shape
+    # searchsorted na lista ordenada é bem mais rápido que o return_inverse do unique
+    indexed = QImage(index_rows(np.searchsorted(colors, pixels)), width, height, (width + 3) & ~3,
+                     QImage.Format_Indexed8)
+    indexed.setColorTable([int(color) for color in colors])
+    # Os bytes passados ao construtor não são copiados: copy() desacopla
+    return indexed.copy()
+
+
+class IndexedFrameStore:
+    """Quadros em 8 bits + paletas compartilhadas + cache ARGB pequeno."""
+
+    def __init__(self, argb_cache=4):
+        self.width = 0
+        self.height = 0
+        self.bytes_per_line = 0
+        # Metadados compactos: um inteiro de 16 bits por quadro em cada array
+        self.delays = array('H')
+        self.palette_ids = array('H')
+        self.palettes = []
+        self._palette_index = {}
+        # Paleta do GIF inteiro (sempre a de id 0): só cresce no fim, então os
+        # índices dos quadros já guardados continuam valendo
+        self._shared = None
+        self._pixels = []
+        # Quadros que não cabem em 256 cores: índice -> QImage ARGB
+        self._argb = {}
+        self._cache = OrderedDict()
+        self.argb_cache = argb_cache
+
+    @classmethod
+    def load(cls, source, argb_cache=4, backend=DEFAULT_BACKEND):
+        """Decodifica o GIF convertendo cada quadro na hora (sem pico em ARGB)."""
+        store = cls(argb_cache)
+        for image, delay in get_decoder(source, backend).frames():
+            store.append(image, delay)
+        return store
+
+    @classmethod
+    def from_sequence(cls, frames, argb_cache=4):
+        store = cls(argb_cache)
+        for index in range(len(frames)):
+            store.append(frames.image(index), frames.delays[index])
+        return store
+
+    def append(self, image, delay):
+        if not self._pixels:
+            self.width = image.width()
+            self.height = image.height()
+            self.bytes_per_line = (self.width + 3) & ~3
+        elif (image.width(), image.height()) != (self.width, self.height):
+            image = image.scaled(self.width, self.height)
+        pixels, _argb = argb_pixels(image)
+        colors = np.unique(pixels)
+        if len(colors) > 256:
+            self._argb[len(self._pixels)] = image.convertToFormat(PAINT_FORMAT)
+            self.palette_ids.append(0)
+            self.delays.append(min(delay, 0xFFFF))
+            self._pixels.append(b'')
+            return
+
+        data = self._shared_indexed(pixels, colors)
+        palette_id = 0
+        if data is None:
+            # Não cabe na paleta do GIF: paleta própria, exata, deduplicada
+            data = index_rows(np.searchsorted(colors, pixels))
+            table = tuple(int(color) for color in colors)
+            palette_id = self._palette_index.get(table)
+            if palette_id is None:
+                palette_id = self._palette_index[table] = len(self.palettes)
+                self.palettes.append(list(table))
+        self.palette_ids.append(palette_id)
+        self.delays.append(min(delay, 0xFFFF))
+        self._pixels.append(data)
+
+    def _shared_indexed(self, pixels, colors):
+        """Bytes do quadro indexado na paleta do GIF (que cresce se preciso), ou None se não couber."""
+        shared = self._shared if self._shared is not None else np.empty(0, dtype=np.uint32)
+        new = np.setdiff1d(colors, shared, assume_unique=True)
+        if len(shared) + len(new) > 256:
+            return None
+        if self._shared is None:
+            self.palettes.insert(0, [])
+        if len(new):
+            shared = np.concatenate([shared, new])
+            self.palettes[0].extend(int(color) for color in new)
+        self._shared = shared
+        # A paleta não está ordenada (cresce no fim): busca pela ordem dela
+        order = np.argsort(shared)
+        return index_rows(order[np.searchsorted(shared[order], pixels)])
+
+    def __len__(self):
+        return len(self._pixels)
+
+    def indexed_image(self, index):
+        """QImage Indexed8 montado a partir dos bytes guardados."""
+        image = QImage(self._pixels[index], self.width, self.height, self.bytes_per_line, QImage.Format_Indexed8)
+        image.setColorTable(self.palettes[self.palette_ids[index]])
+        return image
+
+    def image(self, index):
+        """Quadro pronto para pintar (ARGB), vindo do cache se possível."""
+        full = self._argb.get(index)
+        if full is not None:
+            return full
+        cached = self._cache.get(index)
+        if cached is not None:
+            self._cache.move_to_end(index)
+            return cached
+        image = self.indexed_image(index).convertToFormat(PAINT_FORMAT)
+        self._cache[index] = image
+        while len(self._cache) > self.argb_cache:
+            self._cache.popitem(last=False)
+        return image
+
+    def release_cache(self):
+        self._cache.clear()
+
+    def memory_report(self):
+        """Bytes usados aqui vs. todos os quadros em ARGB."""
+        pixels = sum(len(p) for p in self._pixels)
+        palettes = sum(len(p) * 4 for p in self.palettes)
+        metadata = (len(self.delays) * self.delays.itemsize
+                    + len(self.palette_ids) * self.palette_ids.itemsize)
+        pixels += sum(img.sizeInBytes() for img in self._argb.values())
+        cache = sum(img.sizeInBytes() for img in self._cache.values())
+        return {
+            'frames': len(self),
+            'argb_frames': len(self._argb),
+            'palettes': len(self.palettes),
+            'indexed_bytes': pixels + palettes + metadata,
+            'argb_cache_bytes': cache,
+            'full_argb_bytes': len(self) * self.width * self.height * 4,
+        }
+
+
+def _report(paths):
+    for path in paths:
+        store = IndexedFrameStore.load(path)
+        r = store.memory_report()
+        if not r['frames']:
+            print(f"{path}: sem quadros")
+            continue
+        cache = store.argb_cache * store.width * store.height * 4
+        print(f"{path}: {r['frames']} quadros ({r['argb_frames']} em ARGB), {r['palettes']} paleta(s) | "
+              f"ARGB completo {r['full_argb_bytes'] / 2**20:.1f} MB -> "
+              f"indexado {r['indexed_bytes'] / 2**20:.1f} MB + cache {cache / 2**20:.1f} MB")
+
+
+if __name__ == '__main__':
+    from PyQt5.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    _report(sys.argv[1:] or sorted(glob.glob('assets/**/*.gif', recursive=True)))
@@ -0,0 +1,205 @@
+"""Reprodução de GIF quadro a quadro guiada por relógio monotônico.
+
+O `QMovie` avança os quadros com timers simples: se a máquina está
+ocupada, cada atraso se acumula e a animação fica lenta. Aqui o quadro
+atual é sempre calculado a partir do instante de início e dos delays do
+GIF, então atraso não se acumula: se estivermos atrasados, os quadros
+intermediários são pulados (e contados).
+
+A cada troca de quadro o atraso do vídeo em relação ao relógio é gravado
+em `av.skew_ms`. Quando o relógio é o PresentationClock (áudio mestre),
+esse é o skew entre o som e a imagem.
+"""
+
+import bisect
+import time
+
+from PyQt5.QtCore import QObject, QRect, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter
+from PyQt5.QtWidgets import QWidget
+
+from . import metrics
+from .decoders import DEFAULT_BACKEND, get_decoder
+
+
+class FrameSequence:
+    """Quadros decodificados + delay de cada um (ms)."""
+
+    def __init__(self, images, delays):
+        self.images = images
+        self.delays = delays
+
+    def __len__(self):
+        return len(self.images)
+
+    def image(self, index):
+        return self.images[index]
+
+    @property
+    def duration(self):
+        return sum(self.delays)
+
+
+def load_frames(source, backend=DEFAULT_BACKEND):
+    """Decodifica todos os quadros de um GIF (caminho ou bytes) com o backend escolhido."""
+    images = []
+    delays = []
+    for image, delay in get_decoder(source, backend).frames():
+        images.append(image)
+        delays.append(delay)
+    return FrameSequence(images, delays)
+
+
+class FrameClock:
+    """Converte tempo decorrido em índice de quadro."""
+
+    def __init__(self, delays, loop=False, time_source=time.monotonic):
+        self.ends = []
+        total = 0
+        for delay in delays:
+            total += delay
+            self.ends.append(total)
+        self.total = total
+        self.loop = loop
+        self.time_source = time_source
+        self.t0 = None
+
+    def start(self):
+        self.t0 = self.time_source()
+
+    def elapsed_ms(self):
+        return (self.time_source() - self.t0) * 1000.0
+
+    def position(self, elapsed_ms):
+        """Retorna (volta, quadro) para o instante, ou None se acabou."""
+        if not self.total:
+            return None
+        loops, offset = divmod(elapsed_ms, self.total)
+        if loops and not self.loop:
+            return None
+        return int(loops), bisect.bisect_right(self.ends, offset)
+
+    def frame_end_ms(self, loops, index):
+        return loops * self.total + self.ends[index]
+
+    def next_boundary_ms(self, elapsed_ms):
+        """Quanto falta (ms) para a troca de quadro seguinte."""
+        loops, offset = divmod(elapsed_ms, self.total)
+        index = bisect.bisect_right(self.ends, offset)
+        return self.ends[min(index, len(self.ends) - 1)] - offset
+
+
+class FrameCanvas(QWidget):
+    """Widget que desenha o quadro atual esticado na área toda."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_OpaquePaintEvent, False)
+        self._image = None
+
+    def set_frame(self, image, dirty=None):
+        """Troca o quadro. `dirty` (coordenadas do quadro) limita a repintura."""
+        self._image = image
+        if dirty is None:
+            self.update()
+            return
+        if dirty.isEmpty():
+            return
+        sx = self.width() / max(1, image.width())
+        sy = self.height() / max(1, image.height())
+        # Margem de 1 px para o arredondamento da escala
+        self.update(QRect(int(dirty.x() * sx) - 1, int(dirty.y() * sy) - 1,
+                          int(dirty.width() * sx) + 3, int(dirty.height() * sy) + 3))
+
+    def clear(self):
+        self._image = None
+        self.update()
+
+    def paintEvent(self, event):
+        if self._image is None:
+            return
+        painter = QPainter(self)
+        painter.setClipRegion(event.region())
+        painter.drawImage(QRect(0, 0, self.width(), self.height()), self._image)
+        painter.end()
+
+
+class FramePlayer(QObject):
+    """Toca uma FrameSequence num FrameCanvas seguindo o FrameClock."""
+
+    finished = pyqtSignal()
+
+    def __init__(self, frames, canvas, loop=False, time_source=time.monotonic, parent=None):
+        super().__init__(parent)
+        self.frames = frames
+        self.canvas = canvas
+        self.clock = FrameClock(frames.delays, loop=loop, time_source=time_source)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        self.dropped = 0
+        self.max_skew = 0.0
+        self._shown = None
+        self._shown_end = None
+        self._due = None
+
+    def start(self):
+        self.dropped = 0
+        self.max_skew = 0.0
+        self._shown = None
+        self._shown_end = None
+        self.clock.start()
+        self._tick()
+
+    def stop(self):
+        if self._shown is None:
+            return
+        self.timer.stop()
+        self._due = None
+        self._shown = None
+        metrics.record('video.dropped_frames', self.dropped)
+        if self.dropped:
+            print(f"[VIDEO] {self.dropped} quadro(s) pulado(s) para manter o ritmo")
+        print(f"[VIDEO] Skew máximo A/V: {self.max_skew:.1f} ms")
+
+    def _dirty(self, index):
+        """Retângulo alterado, se a fonte de quadros souber (ex: DeltaFrameStore)."""
+        dirty_rect = getattr(self.frames, 'dirty_rect', None)
+        if dirty_rect is None:
+            return None
+        rect = dirty_rect(index)
+        return QRect() if rect is None else rect
+
+    def _tick(self):
+        if self._due is not None:
+            # Quanto o timer do quadro acordou depois do pedido (watchdog)
+            metrics.record('timer.frame_late_ms', max(0.0, (time.monotonic() - self._due) * 1000.0))
+            self._due = None
+        elapsed = self.clock.elapsed_ms()
+        position = self.clock.position(elapsed)
+        if position is None:
+            self.stop()
+            self.finished.emit()
+            return
+
+        loops, index = position
+        absolute = loops * len(self.frames) + index
+        if absolute != self._shown:
+            if self._shown is not None:
+                if absolute > self._shown + 1:
+                    self.dropped += absolute - self._shown - 1
+                # Quanto o quadro anterior ficou na tela além da conta
+                skew = max(0.0, elapsed - self._shown_end)
+                self.max_skew = max(self.max_skew, skew)
+                metrics.record('av.skew_ms', skew)
+            sequential = self._shown is not None and absolute == self._shown + 1
+            self._shown = absolute
+            self._shown_end = self.clock.frame_end_ms(loops, index)
+            self.canvas.set_frame(self.frames.image(index), self._dirty(index) if sequential else None)
+
+        # Dorme até a próxima troca de quadro (sempre recalculada a partir do início)
+        delay = max(1, int(self.clock.next_boundary_ms(elapsed) + 0.5))
+        self._due = time.monotonic() + delay / 1000.0
+        self.timer.start(delay)
@@ -1,18 +1,43 @@
+import collections
+import gc
 import sys
 import random
 import os
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel
-from PyQt5.QtCore import QTimer, Qt, QUrl
-from PyQt5.QtGui import QMovie
+import time
+from PyQt5.QtGui import QImageReader, QPixmapCache
+from PyQt5.QtWidgets import QApplication, QMainWindow, QStyle
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QTimer, Qt, QUrl
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 
+from . import metrics
+from .memory import malloc_trim, rss_bytes
+from .profiler import set_phase
+from .audio import PREPARED_DIR, AudioKeepAlive, prepared_path
+from .av_clock import PresentationClock
+from .frame_store import IndexedFrameStore
+from .frames import FrameCanvas, FramePlayer, FrameSequence, load_frames
+
 # --- CONSTANTES DE COMPATIBILIDADE ---
 # Mantidas para não quebrar o __init__.py
 GIF_PATH = 'assets/video_jumpscare/Withered_Chica.gif'
-SOUND_PATH = 'assets/audios/jumpscare_fnaf2.wav'
+SOUND_PATH = 'assets/audios/Jumpscare_fnaf2.wav'
+
+# Duração usada quando o GIF não tem quadros (ex: arquivo faltando)
+FALLBACK_SCARE_MS = 900
+# Quantos sustos pedidos pela API podem esperar o atual terminar
+MAX_QUEUED_SCARES = 8
+# Máquina ocupada: adia em passos até o limite; depois assusta no modo leve
+LOAD_DEFER_STEP_MS = 250
+LOAD_DEFER_MAX_MS = 3000
+# Na bateria o sorteio acontece a cada N intervalos (com a chance equivalente)
+POWER_SAVE_COALESCE = 5
+# Meta de memória residente do monitor parado no modo --low-memory
+IDLE_RSS_TARGET_MB = 64
 
 class JumpscareController:
-    def __init__(self, gif_path, sound_path, probability, interval_seconds):
+    def __init__(self, gif_path, sound_path, probability, interval_seconds, keep_alive=False, mixer=None,
+                 indexed_frames=False, delta_frames=False, parallel_decode=False, frame_cache=False,
+                 scheduler=None, load_aware=False, low_memory=False):
         self.gif_path = gif_path
         self.sound_path = sound_path
         self.probability = probability
@@ -26,97 +51,621 @@ class JumpscareController:
         self.scare_window.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.scare_window.setAttribute(Qt.WA_TranslucentBackground) 
         
-        # Configurar GIF
-        self.label = QLabel(self.scare_window)
+        # Configurar GIF (o canvas também é transparente)
+        self.canvas = FrameCanvas(self.scare_window)
+        self.scare_window.setCentralWidget(self.canvas)
         
-        # Verifica caminhos para evitar erro
+        # Verifica caminhos para evitar erro (gif_path também pode ser os bytes de um pacote)
         current_gif = self.gif_path
-        if not os.path.exists(current_gif) and os.path.exists(GIF_PATH):
+        if isinstance(current_gif, str) and not os.path.exists(current_gif) and os.path.exists(GIF_PATH):
              current_gif = GIF_PATH
-             
-        self.movie = QMovie(current_gif)
-        # O label também precisa ser transparente
-        self.label.setStyleSheet("background-color: transparent;")
-        self.label.setMovie(self.movie)
-        self.label.setScaledContents(True)
-        self.scare_window.setCentralWidget(self.label)
+
+        # Quadros decodificados uma vez; o relógio (mestre = áudio) decide qual mostrar
+        self.indexed_frames = indexed_frames
+        self.delta_frames = delta_frames
+        self.parallel_decode = parallel_decode
+        self.frame_cache = frame_cache
+        self.current_gif = current_gif
+        self.clock = PresentationClock(self.audio_position_ms)
+        self.frames = None
+        self.frame_player = None
+        self._set_frames(self._load_frames(current_gif))
+        self.scare_active = False
+        # Fim do susto quando não há quadros (cancelável: um susto seguinte não pode herdá-lo)
+        self._fallback_timer = QTimer()
+        self._fallback_timer.setSingleShot(True)
+        self._fallback_timer.timeout.connect(self.finish_scare)
+        self._pending_reload = None
+        self.frames_released = False
+        self.power_saving = False
+        # low_memory: entre sustos solta quadros, mídia e janela (ver release_idle)
+        self.low_memory = low_memory
+        self.audio_released = False
+        self._compact_gif = None
 
         # Configurar Som
         self.player = QMediaPlayer()
-        
-        audio_file = self.sound_path if (self.sound_path and self.sound_path != "none") else None
-        
-        if audio_file:
-            abs_path = os.path.abspath(audio_file)
-            if os.path.exists(abs_path):
-                url = QUrl.fromLocalFile(abs_path)
-                content = QMediaContent(url)
-                self.player.setMedia(content)
-                self.player.setVolume(100)
-
-        self.check_timer = QTimer()
+
+        # Mede a latência do QMediaPlayer (play() -> primeira posição > 0)
+        self._play_requested_at = None
+        self.player.setNotifyInterval(10)
+        self.player.positionChanged.connect(self._on_player_position)
+
+        # Mixer compartilhado (opcional): o stream dele já fica sempre aberto
+        self.mixer = mixer
+        self.scare_samples = None
+        self.scare_voice = None
+
+        # Keep-alive opcional: mantém a saída de áudio aberta com silêncio
+        self.use_keep_alive = keep_alive
+        self.keep_alive = None
+        self._sound_buffer = None
+        self._load_audio(self.sound_path)
+
+        # Com um WheelScheduler compartilhado, vários controllers no mesmo processo
+        # dividem um único QTimer (ver timer_wheel.py)
+        self.check_timer = scheduler.timer() if scheduler is not None else QTimer()
+        self._check_due = None
         self.check_timer.timeout.connect(self.check_probability)
 
+        # Sustos pedidos de fora (API) enquanto outro está na tela: tocam em seguida
+        self.armed = False
+        self._queued = collections.deque(maxlen=MAX_QUEUED_SCARES)
+
+        # Olha a carga da máquina antes de disparar (ver system_load.py)
+        self.load = None
+        self._load_deferred_ms = 0
+        # Próxima tentativa de um susto adiado (cancelada ao desarmar ou ao disparar)
+        self._defer_timer = QTimer()
+        self._defer_timer.setSingleShot(True)
+        self._defer_timer.timeout.connect(self._trigger_when_idle)
+        if load_aware:
+            from .system_load import SystemLoad
+            self.load = SystemLoad()
+
+        # Quem decide o que fazer quando o sorteio ganha (ex: coordenador da frota
+        # agenda o susto para todas as máquinas em vez de disparar só aqui)
+        self.roll_handler = None
+
     def start(self):
-        ms = int(self.interval_seconds * 1000)
-        self.check_timer.start(ms)
+        self.armed = True
+        self._start_check_timer()
+        if self.scare_samples is not None:
+            self.mixer.start()
+        elif self.keep_alive:
+            self.keep_alive.arm()
         print(f"[MONITOR] Rodando... Chance: {self.probability} a cada {self.interval_seconds}s")
 
+    def _start_check_timer(self):
+        ms = self._check_interval_ms()
+        self._check_due = time.monotonic() + ms / 1000.0
+        self.check_timer.start(ms)
+
     def check_probability(self):
         """Roda periodicamente."""
-        if random.random() < self.probability:
+        # Atraso do tick em relação ao previsto (o watchdog olha esta série)
+        now = time.monotonic()
+        if self._check_due is not None:
+            metrics.record('timer.check_late_ms', max(0.0, (now - self._check_due) * 1000.0))
+            self._check_due += self._check_interval_ms() / 1000.0
+            if self._check_due < now:
+                # Atrasou mais que um intervalo: o Qt pula os ticks perdidos
+                self._check_due = now + self._check_interval_ms() / 1000.0
+        if random.random() < self._roll_probability():
+            if self.roll_handler is not None:
+                self.roll_handler()
+            elif self.load is not None:
+                self.check_timer.stop()
+                self._trigger_when_idle()
+            else:
+                self.trigger_jumpscare()
+
+    def _trigger_when_idle(self):
+        """Dispara se a máquina tiver folga; senão adia (até LOAD_DEFER_MAX_MS) ou usa o modo leve."""
+        if self.scare_active or not self.armed:
+            self._load_deferred_ms = 0
+            return
+        reasons = self.load.busy_reasons()
+        if not reasons:
+            if self._load_deferred_ms:
+                metrics.record('load.deferred_ms', self._load_deferred_ms)
+            self._load_deferred_ms = 0
             self.trigger_jumpscare()
+        elif self._load_deferred_ms < LOAD_DEFER_MAX_MS:
+            self._load_deferred_ms += LOAD_DEFER_STEP_MS
+            print(f"[CARGA] Susto adiado {LOAD_DEFER_STEP_MS} ms: {'; '.join(reasons)}")
+            self._defer_timer.start(LOAD_DEFER_STEP_MS)
+        else:
+            print(f"[CARGA] Máquina ocupada há {self._load_deferred_ms} ms ({'; '.join(reasons)}); "
+                  "susto no modo leve")
+            metrics.record('load.deferred_ms', self._load_deferred_ms)
+            self._load_deferred_ms = 0
+            self.trigger_jumpscare(light=True)
+
+    def prewarm(self):
+        """Deixa o susto pronto para sair sem atraso (stream de áudio aberto, 1º quadro decodificado)."""
+        set_phase('pre-warm')
+        # Com --low-memory o som pode ter sido solto no release_idle: volta antes do susto
+        self._ensure_audio()
+        if self.scare_samples is not None:
+            self.mixer.start()
+        elif self.keep_alive:
+            self.keep_alive.arm()
+        self._ensure_frames()
+        if len(self.frames):
+            self.frames.image(0)
+        set_phase('idle')
+
+    def request_scare(self, requested_at=None):
+        """Pede um susto agora; se já houver um na tela, entra na fila. Retorna a posição na fila."""
+        requested_at = time.perf_counter() if requested_at is None else requested_at
+        if not self.scare_active:
+            self.trigger_jumpscare(requested_at)
+            return 0
+        if len(self._queued) == self._queued.maxlen:
+            return -1
+        self._queued.append(requested_at)
+        return len(self._queued)
+
+    def arm(self):
+        """Volta a sortear sustos no intervalo configurado."""
+        self.armed = True
+        if not self.scare_active and not self.check_timer.isActive():
+            self._start_check_timer()
+
+    def disarm(self):
+        """Para de sortear sustos (pedidos diretos continuam funcionando)."""
+        self.armed = False
+        self.check_timer.stop()
+        self._defer_timer.stop()
+        self._load_deferred_ms = 0
+
+    def set_probability(self, probability):
+        self.probability = min(1.0, max(0.0, float(probability)))
+
+    def _check_interval_ms(self):
+        coalesce = POWER_SAVE_COALESCE if self.power_saving else 1
+        return int(self.interval_seconds * 1000 * coalesce)
+
+    def _roll_probability(self):
+        if not self.power_saving:
+            return self.probability
+        # Um sorteio no lugar de N: mesma chance de pelo menos um acerto
+        return 1.0 - (1.0 - self.probability) ** POWER_SAVE_COALESCE
+
+    def set_power_saving(self, enabled):
+        """Bateria: timer grosso e mais espaçado, quadros liberados. Tomada: volta ao normal."""
+        if enabled == self.power_saving:
+            return
+        self.power_saving = enabled
+        self.check_timer.setTimerType(Qt.VeryCoarseTimer if enabled else Qt.CoarseTimer)
+        if self.check_timer.isActive():
+            self._start_check_timer()
+        if enabled:
+            self.release_frames()
+        else:
+            self._ensure_frames()
+        print(f"[ENERGIA] Economia {'ligada' if enabled else 'desligada'}: sorteio a cada "
+              f"{self._check_interval_ms() / 1000:g}s")
+
+    def release_frames(self):
+        """Solta os quadros decodificados; voltam a ser decodificados antes do próximo susto."""
+        if self.frames_released or self.scare_active:
+            return
+        self._set_frames(FrameSequence([], []))
+        self.frames_released = True
+        print("[VIDEO] Quadros liberados")
+
+    def _ensure_frames(self):
+        if self.frames_released:
+            self.frames_released = False
+            source = self._compact_gif if self._compact_gif is not None else self.current_gif
+            self._set_frames(self._load_frames(source))
+
+    def _ensure_audio(self):
+        if self.audio_released:
+            self.audio_released = False
+            self._load_audio(self.sound_path)
+            if self.keep_alive:
+                self.keep_alive.arm()
+
+    def release_idle(self):
+        """Monitor parado: solta quadros, mídia e a janela nativa; tudo volta antes do próximo susto."""
+        if self.scare_active:
+            return
+        set_phase('teardown')
+        # Forma compacta: o GIF ainda codificado (alguns KB/MB) em vez dos quadros em ARGB.
+        # Com --frame-cache os quadros voltam do arquivo mapeado e nem precisam disso
+        if (self._compact_gif is None and isinstance(self.current_gif, str) and not self.parallel_decode
+                and not self.frame_cache and os.path.exists(self.current_gif)):
+            with open(self.current_gif, 'rb') as f:
+                self._compact_gif = f.read()
+        self.release_frames()
+
+        if not self.audio_released:
+            self.player.stop()
+            self.player.setMedia(QMediaContent())
+            self._sound_buffer = None
+            self.scare_samples = None
+            if self.keep_alive is not None:
+                self.keep_alive.disarm()
+                self.keep_alive = None
+            self.audio_released = True
 
-    def trigger_jumpscare(self):
-        print("[!!!] SUSTO ACIONADO!")
+        # Some com a janela nativa e o backing store (o show() seguinte cria de novo)
+        self.canvas.clear()
+        self.scare_window.destroy()
+        QPixmapCache.clear()
+        gc.collect()
+        malloc_trim()
+
+        rss = rss_bytes()
+        if rss is not None:
+            rss_mb = rss / 2**20
+            metrics.record('idle.rss_mb', rss_mb)
+            over = " ACIMA DA META" if rss_mb > IDLE_RSS_TARGET_MB else ""
+            print(f"[MEMÓRIA] Ocioso: {rss_mb:.0f} MB residentes (meta {IDLE_RSS_TARGET_MB} MB){over}")
+        set_phase('idle')
+
+    def status(self):
+        return {
+            'armed': self.armed,
+            'probability': self.probability,
+            'interval_seconds': self.interval_seconds,
+            'scare_active': self.scare_active,
+            'queued': len(self._queued),
+        }
+
+    def trigger_jumpscare(self, requested_at=None, light=False):
+        print("[!!!] SUSTO ACIONADO!" + (" (modo leve)" if light else ""))
+        # Um susto adiado pela carga não pode sair de novo depois deste
+        self._defer_timer.stop()
+        self._load_deferred_ms = 0
+        # Fases para o profiler (ver profiler.py)
+        set_phase('pre-warm')
+        self._ensure_frames()
+        self._ensure_audio()
+        set_phase('scare')
+        self.scare_active = True
+        if requested_at is not None:
+            metrics.record('api.trigger_latency_ms', (time.perf_counter() - requested_at) * 1000.0)
         
         # 1. PAUSA a checagem para não encavalar sustos
         self.check_timer.stop()
         
-        # 2. Mostra a janela (agora transparente)
-        self.scare_window.showFullScreen()
-        
-        if self.movie.isValid():
-            self.movie.start()
+        # 2. Mostra a janela (agora transparente). No modo leve ela fica do
+        # tamanho do GIF, no centro: bem menos área para escalar e compor
+        if light and len(self.frames):
+            rect = QApplication.primaryScreen().availableGeometry()
+            size = self._native_size().boundedTo(rect.size())
+            self.scare_window.setGeometry(QStyle.alignedRect(Qt.LeftToRight, Qt.AlignCenter, size, rect))
+            self.scare_window.showNormal()
+        else:
+            self.scare_window.showFullScreen()
         
-        self.player.play()
+        # Áudio primeiro: o vídeo segue a posição dele
+        self.clock.start()
+        if self.scare_samples is not None:
+            self.scare_voice = self.mixer.play(self.scare_samples)
+        elif self.keep_alive:
+            self.keep_alive.play()
+        else:
+            self._play_requested_at = time.perf_counter()
+            self.player.play()
+
+        if len(self.frames):
+            self.frame_player.start()
         
-        # 3. Define quanto tempo o susto dura (ex: 2.5 segundos)
-        QTimer.singleShot(900, self.finish_scare)
+        # 3. O susto dura o GIF inteiro (o FramePlayer avisa quando acabar)
+        if not len(self.frames):
+            self._fallback_timer.start(FALLBACK_SCARE_MS)
+
+    def _native_size(self):
+        """Tamanho original do GIF (com --frame-cache os quadros já vêm escalados para a tela)."""
+        gif = self._compact_gif if self._compact_gif is not None else self.current_gif
+        if isinstance(gif, str):
+            reader = QImageReader(gif)
+        else:
+            buffer = QBuffer()
+            buffer.setData(QByteArray(bytes(gif)))
+            reader = QImageReader(buffer, b'gif')
+        # Só lê o cabeçalho
+        size = reader.size()
+        return size if size.isValid() else self.frames.image(0).size()
 
     def finish_scare(self):
         """Finaliza o susto mas MANTÉM o programa rodando."""
+        if not self.scare_active:
+            return
+        self.scare_active = False
+        set_phase('teardown')
+        self._fallback_timer.stop()
         print("[ALIVIO] Susto acabou. Retomando vigilância...")
         
         # Para o som e o gif
-        self.movie.stop()
-        self.player.stop()
+        self.frame_player.stop()
+        self.canvas.clear()
+        if self.scare_samples is not None:
+            # Fade curto para não estalar; o stream do mixer continua aberto
+            self.mixer.fade_out(self.scare_voice, 30)
+        elif self.keep_alive:
+            # Volta para o silêncio, mas o stream continua aberto
+            self.keep_alive.stop()
+        else:
+            self.player.stop()
         
         # Esconde a janela (não fecha o app)
         self.scare_window.hide()
         
         # --- AJUSTE 2: CONTINUIDADE ---
         # Reinicia o timer para continuar testando a sorte
-        ms = int(self.interval_seconds * 1000)
-        self.check_timer.start(ms)
+        if self.armed:
+            self._start_check_timer()
+
+        if self._pending_reload is not None:
+            gif, sound = self._pending_reload
+            self._pending_reload = None
+            self.reload_assets(gif, sound)
+
+        if self._queued:
+            # Próximo susto da fila, fora deste callback (deixa o Qt esconder a janela antes)
+            requested_at = self._queued.popleft()
+            QTimer.singleShot(0, lambda: self.request_scare(requested_at))
+        elif self.low_memory:
+            # Depois que o Qt esconder a janela
+            QTimer.singleShot(0, self.release_idle)
+        set_phase('idle')
+
+    def _set_frames(self, frames):
+        """Troca os quadros do susto (o FramePlayer monta o relógio a partir dos delays)."""
+        if self.frame_player is not None:
+            self.frame_player.finished.disconnect(self.finish_scare)
+        old = self.frames
+        self.frames = frames
+        self.frame_player = FramePlayer(self.frames, self.canvas, time_source=self.clock)
+        self.frame_player.finished.connect(self.finish_scare)
+        if old is not None and hasattr(old, 'close'):
+            old.close()
+
+    def _load_audio(self, sound_path):
+        """Prepara o som do susto na saída em uso (mixer, keep-alive ou QMediaPlayer)."""
+        audio_file = sound_path if sound_path not in (None, '', 'none') else None
+        if isinstance(audio_file, str):
+            # Usa a versão sem silêncio inicial/normalizada, se já foi gerada
+            audio_file = prepared_path(audio_file)
+            if not os.path.exists(audio_file):
+                audio_file = None
+
+        buffer = None
+        if isinstance(audio_file, str):
+            url = QUrl.fromLocalFile(os.path.abspath(audio_file))
+            self.player.setMedia(QMediaContent(url))
+            self.player.setVolume(100)
+        elif audio_file is not None:
+            # Som de um pacote: o QMediaPlayer lê de um buffer em memória
+            buffer = QBuffer()
+            buffer.setData(QByteArray(bytes(audio_file)))
+            buffer.open(QIODevice.ReadOnly)
+            self.player.setMedia(QMediaContent(), buffer)
+            self.player.setVolume(100)
+        else:
+            self.player.setMedia(QMediaContent())
+        # O buffer anterior só pode ser liberado depois que o player trocou de mídia
+        self._sound_buffer = buffer
+
+        self.scare_samples = None
+        if self.mixer is not None and audio_file is not None:
+            try:
+                self.scare_samples = self.mixer.load(audio_file)
+            except (OSError, ValueError) as e:
+                print(f"[AUDIO] Som não carregado no mixer: {e}")
+
+        if self.keep_alive is not None:
+            self.keep_alive.disarm()
+            self.keep_alive = None
+        if self.use_keep_alive and self.scare_samples is None and audio_file is not None:
+            try:
+                self.keep_alive = AudioKeepAlive(audio_file)
+            except (OSError, ValueError) as e:
+                print(f"[AUDIO] Keep-alive desativado: {e}")
+
+    def reload_assets(self, gif=None, sound=None):
+        """Recarrega só o que mudou (GIF e/ou som) sem reiniciar o monitor.
+
+        Durante um susto a troca fica para o fim dele.
+        """
+        if self.scare_active:
+            pending_gif, pending_sound = self._pending_reload or (None, None)
+            self._pending_reload = (gif if gif is not None else pending_gif,
+                                    sound if sound is not None else pending_sound)
+            return
+        if gif is not None:
+            self.gif_path = self.current_gif = gif
+            self._compact_gif = None
+            if not self.frames_released:
+                self._set_frames(self._load_frames(gif))
+            print("[RELOAD] Quadros do susto recarregados")
+        if sound is not None:
+            self.sound_path = sound
+            # Com o áudio solto (--low-memory) o som novo só carrega antes do próximo susto
+            if not self.audio_released:
+                self._load_audio(sound)
+                if self.keep_alive and self.check_timer.isActive():
+                    self.keep_alive.arm()
+            print("[RELOAD] Som do susto recarregado")
+
+    def _load_frames(self, gif):
+        """Decodifica o GIF no formato de armazenamento escolhido."""
+        # delta_frames: deduplica e guarda só o retângulo que muda entre quadros
+        if self.delta_frames:
+            from .frame_delta import DeltaFrameStore
+            frames = DeltaFrameStore.load(gif)
+            report = frames.memory_report()
+            print(f"[VIDEO] Quadros delta: {report['stored_bytes'] / 2**20:.1f} MB "
+                  f"({report['duplicates']} duplicados de {report['frames']})")
+            return frames
+
+        # indexed_frames: guarda em 8 bits e só converte para ARGB ao pintar
+        if self.indexed_frames:
+            frames = IndexedFrameStore.load(gif)
+            report = frames.memory_report()
+            print(f"[VIDEO] Quadros indexados: {report['indexed_bytes'] / 2**20:.1f} MB "
+                  f"(ARGB seria {report['full_argb_bytes'] / 2**20:.1f} MB)")
+            return frames
+
+        loader = load_frames
+        if self.parallel_decode:
+            # Pré-carrega usando todos os núcleos (requer Pillow e NumPy)
+            from .parallel_decode import load_frames_parallel
+            loader = load_frames_parallel
+
+        start = time.perf_counter()
+        if self.frame_cache:
+            # Quadros já escalados para a tela, compartilhados entre processos via mmap
+            from . import frame_cache
+            screen = QApplication.primaryScreen()
+            dpr = screen.devicePixelRatio()
+            size = screen.size()
+            frames = frame_cache.load(gif, int(size.width() * dpr), int(size.height() * dpr), dpr, loader=loader)
+        else:
+            frames = loader(gif)
+        print(f"[VIDEO] {len(frames)} quadros prontos em {(time.perf_counter() - start) * 1000:.0f} ms")
+        return frames
+
+    def audio_position_ms(self):
+        """Posição do som do susto (ms) na fonte de áudio em uso."""
+        if self.scare_samples is not None:
+            return self.mixer.voice_position_ms(self.scare_voice)
+        if self.keep_alive:
+            return self.keep_alive.position_ms()
+        if self.player.state() == QMediaPlayer.PlayingState:
+            return float(self.player.position())
+        return None
+
+    def _on_player_position(self, position):
+        if self._play_requested_at is None or position <= 0:
+            return
+        latency = (time.perf_counter() - self._play_requested_at) * 1000.0 - position
+        self._play_requested_at = None
+        metrics.record('audio.player_latency_ms', latency)
+        print(f"[AUDIO] Latência do susto (QMediaPlayer): {latency:.1f} ms")
 
 # --- ALIAS DE COMPATIBILIDADE ---
 JumpscareGIF = JumpscareController 
 
-def run_continuous(gif_path=GIF_PATH, sound_path=SOUND_PATH, probability=0.01, interval_seconds=1.0):
+def _reload_changed(controller, paths, gif_path, sound_path, pack_path=None):
+    """Recarrega no controller só o que foi tocado pelos arquivos em `paths`."""
+    touched = lambda path: isinstance(path, str) and os.path.abspath(path) in paths
+    if pack_path is not None:
+        if not touched(pack_path) or not os.path.exists(pack_path):
+            return
+        from .packs import ScarePack
+        try:
+            # Cópias dos membros: o controller guarda as fontes além desta chamada (recarga
+            # adiada para o fim do susto, nova decodificação depois do release_idle)
+            with ScarePack(pack_path) as pack:
+                gif = bytes(pack.member('gif'))
+                sound = bytes(pack.member('sound')) if pack.has('sound') else ''
+        except (OSError, ValueError) as e:
+            print(f"[RELOAD] Pacote ignorado: {e}")
+            return
+        controller.reload_assets(gif, sound)
+        return
+    gif = gif_path if touched(gif_path) else None
+    sound = None
+    if isinstance(sound_path, str) and sound_path not in ('', 'none'):
+        if touched(sound_path) or touched(os.path.join(PREPARED_DIR, os.path.basename(sound_path))):
+            sound = sound_path
+    if gif is not None or sound is not None:
+        controller.reload_assets(gif, sound)
+
+
+def run_continuous(gif_path=GIF_PATH, sound_path=SOUND_PATH, probability=0.01, interval_seconds=1.0, keep_alive=False, use_mixer=False, indexed_frames=False,
+                   delta_frames=False, parallel_decode=False, frame_cache=False, watch=False, pack_path=None,
+                   api=False, api_port=None, fleet=None, fleet_address=None, load_aware=False,
+                   power_aware=False, low_memory=False, watchdog=False):
     """Função chamada pelo main.py"""
     # Verifica se já existe uma instância do QApplication (caso o main já tenha criado)
     app = QApplication.instance()
     if not app:
         app = QApplication(sys.argv)
+
+    mixer = None
+    if use_mixer:
+        try:
+            from .mixer import Mixer
+            mixer = Mixer()
+        except ImportError:
+            print("[AUDIO] NumPy não instalado, mixer desativado")
     
     controller = JumpscareController(
         gif_path, 
         sound_path, 
         probability=probability, 
-        interval_seconds=interval_seconds
+        interval_seconds=interval_seconds,
+        keep_alive=keep_alive,
+        mixer=mixer,
+        indexed_frames=indexed_frames,
+        delta_frames=delta_frames,
+        parallel_decode=parallel_decode,
+        frame_cache=frame_cache,
+        load_aware=load_aware,
+        low_memory=low_memory
     )
     controller.start()
+    if low_memory:
+        # Já começa enxuto: o primeiro susto também monta tudo na hora
+        controller.release_idle()
+
+    # watch: recarrega o GIF/som (ou o pacote) quando os arquivos mudam, sem reiniciar
+    watcher = None
+    if watch:
+        from .catalog_watch import CatalogWatcher
+        sources = [p for p in (pack_path, gif_path, sound_path) if isinstance(p, str) and p not in ('', 'none')]
+        directories = {os.path.dirname(os.path.abspath(p)) for p in sources}
+        if isinstance(sound_path, str) and os.path.isdir(PREPARED_DIR):
+            directories.add(os.path.abspath(PREPARED_DIR))
+        watcher = CatalogWatcher(directories=sorted(directories))
+        watcher.pathsChanged.connect(
+            lambda paths: _reload_changed(controller, paths, gif_path, sound_path, pack_path))
+
+    # api: servidor local (HTTP/WebSocket) para disparar/armar/desarmar de fora
+    server = None
+    if api:
+        from .trigger_api import DEFAULT_PORT, ControlBridge, TriggerServer
+        server = TriggerServer(ControlBridge(controller), port=api_port or DEFAULT_PORT)
+        try:
+            server.start()
+            app.aboutToQuit.connect(server.stop)
+        except OSError as e:
+            # O monitor segue sem a API (ex: outro monitor já está na porta)
+            print(f"[API] {e}")
+            server = None
+
+    # fleet: 'coordinator' sorteia e agenda para todos; 'client' só apresenta no instante combinado
+    fleet_node = None
+    if fleet:
+        from .fleet import attach
+        fleet_node = attach(controller, fleet, fleet_address)
+        if fleet == 'client':
+            app.aboutToQuit.connect(fleet_node.close)
+
+    # power_aware: na bateria troca para timers grossos e solta os quadros
+    power = None
+    if power_aware:
+        from .power import PowerMonitor
+        power = PowerMonitor()
+        power.changed.connect(controller.set_power_saving)
+        controller.set_power_saving(power.on_battery)
+        app.aboutToQuit.connect(power.report)
+
+    # watchdog: avisa (com a pilha da GUI) quando o event loop trava
+    loop_watchdog = None
+    if watchdog:
+        from .watchdog import LoopWatchdog
+        loop_watchdog = LoopWatchdog()
+        loop_watchdog.start()
+        app.aboutToQuit.connect(loop_watchdog.stop)
     
     # Executa o loop de eventos. Como não chamamos quit() no finish_scare,
     # ele vai ficar rodando para sempre até você fechar o processo manualmente.
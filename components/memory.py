@@ -0,0 +1,33 @@
+"""Medição de memória do processo e devolução de memória livre ao sistema."""
+
+import ctypes
+import ctypes.util
+import os
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+_libc = None
+
+
+def rss_bytes():
+    """Memória residente do processo agora (None fora do Linux)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def malloc_trim():
+    """Devolve ao sistema o que o malloc da glibc guardou livre. False se não houver malloc_trim."""
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6')
+        except OSError:
+            _libc = False
+    trim = getattr(_libc, 'malloc_trim', None) if _libc else None
+    if trim is None:
+        return False
+    trim(0)
+    return True
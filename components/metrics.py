@@ -0,0 +1,81 @@
+"""Métricas simples em memória para instrumentar o app.
+
+Cada série guarda contagem, soma, mínimo, máximo, último valor e um
+histograma com faixas fixas (em ms, que é a unidade usada em quase tudo).
+"""
+
+import threading
+
+# Limites superiores das faixas do histograma (o último pega o resto)
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float('inf'))
+
+_lock = threading.Lock()
+_series = {}
+
+
+class Series:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.last = value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, limit in enumerate(BUCKETS):
+            if value <= limit:
+                self.buckets[i] += 1
+                break
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'last': self.last,
+            'histogram': {str(limit): n for limit, n in zip(BUCKETS, self.buckets)},
+        }
+
+
+def record(name, value):
+    """Registra um valor na série `name` (criando a série se preciso)."""
+    with _lock:
+        series = _series.get(name)
+        if series is None:
+            series = _series[name] = Series()
+        series.add(float(value))
+
+
+def get(name):
+    with _lock:
+        return _series.get(name)
+
+
+def snapshot():
+    """Retorna um dict serializável com todas as séries."""
+    with _lock:
+        return {name: s.as_dict() for name, s in _series.items()}
+
+
+def summary(name):
+    """Linha curta para os prints de log."""
+    s = get(name)
+    if s is None or not s.count:
+        return f"{name}: sem amostras"
+    return f"{name}: n={s.count} média={s.mean:.1f} min={s.min:.1f} máx={s.max:.1f}"
+
+
+def reset():
+    with _lock:
+        _series.clear()
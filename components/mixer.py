@@ -0,0 +1,310 @@
+"""Mixer de áudio com NumPy: várias vozes em um único stream de saída.
+
+Cada som tocado vira uma "voz" (buffer float32 + posição + ganho + fades).
+O mixer soma as vozes ativas em blocos de tamanho fixo e entrega o
+resultado em int16 para um único QAudioOutput em modo pull. Quando não há
+vozes o stream toca silêncio, então a saída fica sempre "acordada".
+
+Uso:
+    mixer = Mixer()
+    mixer.start()
+    grito = mixer.load('assets/audios/Jumpscare_fnaf2.wav')
+    mixer.play(grito, gain=0.8, fade_in_ms=5)
+
+Benchmark do custo de mixagem: `python -m components.mixer`
+"""
+
+import threading
+import time
+
+import numpy as np
+from PyQt5.QtCore import QIODevice
+from PyQt5.QtMultimedia import QAudioFormat, QAudioOutput
+
+from . import metrics
+from .audio import load_wav
+
+
+def pcm_to_float(pcm, info):
+    """Converte PCM inteiro (bytes) em array float32 (frames, canais) em [-1, 1]."""
+    width = info.sample_width
+    if width == 1:
+        data = (np.frombuffer(pcm, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        data = np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 3:
+        raw = np.frombuffer(pcm[:len(pcm) - len(pcm) % 3], dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        data = ints.astype(np.float32) / 8388608.0
+    else:
+        data = np.frombuffer(pcm, dtype='<i4').astype(np.float32) / 2147483648.0
+    frames = len(data) // info.channels
+    return data[:frames * info.channels].reshape(frames, info.channels)
+
+
+def convert(samples, src_rate, dst_rate, channels):
+    """Ajusta canais e taxa de amostragem (interpolação linear)."""
+    if samples.shape[1] != channels:
+        if samples.shape[1] == 1:
+            samples = np.repeat(samples, channels, axis=1)
+        else:
+            # Downmix para mono e replica se precisar
+            mono = samples.mean(axis=1, keepdims=True)
+            samples = np.repeat(mono, channels, axis=1)
+    if src_rate != dst_rate and len(samples) > 1:
+        n_out = int(round(len(samples) * dst_rate / src_rate))
+        src_t = np.arange(len(samples), dtype=np.float64)
+        dst_t = np.linspace(0, len(samples) - 1, n_out)
+        samples = np.stack([np.interp(dst_t, src_t, samples[:, c]) for c in range(channels)], axis=1)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+class Voice:
+    __slots__ = ('id', 'samples', 'pos', 'elapsed', 'gain', 'loop',
+                 'fade_in', 'fade_out_start', 'fade_out_len', 'requested_at')
+
+    def __init__(self, voice_id, samples, gain, loop, fade_in):
+        self.id = voice_id
+        self.samples = samples
+        self.pos = 0
+        self.elapsed = 0
+        self.gain = gain
+        self.loop = loop
+        self.fade_in = fade_in
+        self.fade_out_start = None
+        self.fade_out_len = 0
+        self.requested_at = time.perf_counter()
+
+    def render(self, out, n):
+        """Soma até `n` frames desta voz em `out`. Retorna False quando acabou."""
+        total = len(self.samples)
+        if self.loop:
+            idx = (self.pos + np.arange(n)) % total
+            chunk = self.samples[idx]
+            count = n
+        else:
+            count = min(n, total - self.pos)
+            chunk = self.samples[self.pos:self.pos + count]
+
+        gain = self._envelope(count)
+        if np.isscalar(gain):
+            out[:count] += chunk * gain
+        else:
+            out[:count] += chunk * gain[:, None]
+
+        self.pos = (self.pos + count) % total if self.loop else self.pos + count
+        self.elapsed += count
+        if self.fade_out_start is not None and self.elapsed >= self.fade_out_start + self.fade_out_len:
+            return False
+        return self.loop or self.pos < total
+
+    def _envelope(self, count):
+        in_fade = self.fade_in and self.elapsed < self.fade_in
+        out_fade = self.fade_out_start is not None and self.elapsed + count > self.fade_out_start
+        if not in_fade and not out_fade:
+            return self.gain
+        t = self.elapsed + np.arange(count, dtype=np.float32)
+        env = np.full(count, self.gain, dtype=np.float32)
+        if in_fade:
+            env *= np.clip(t / self.fade_in, 0.0, 1.0)
+        if out_fade:
+            env *= np.clip(1.0 - (t - self.fade_out_start) / max(self.fade_out_len, 1), 0.0, 1.0)
+        return env
+
+
+class Mixer:
+    """Mistura as vozes ativas em blocos fixos para um único stream."""
+
+    def __init__(self, sample_rate=48000, channels=2, block_frames=512, max_voices=16):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_frames = block_frames
+        self.max_voices = max_voices
+        self.master_gain = 1.0
+        self._voices = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._acc = np.zeros((block_frames, channels), dtype=np.float32)
+        self.output = None
+        self.device = None
+
+    # --- Sons ---
+
+    def load(self, source):
+        """Lê um WAV (caminho ou bytes) já convertido para o formato do mixer."""
+        info, pcm = load_wav(source)
+        return self.load_pcm(pcm, info)
+
+    def load_pcm(self, pcm, info):
+        return convert(pcm_to_float(pcm, info), info.sample_rate, self.sample_rate, self.channels)
+
+    # --- Vozes ---
+
+    def play(self, samples, gain=1.0, fade_in_ms=0, loop=False):
+        """Começa a tocar `samples`. Retorna o id da voz."""
+        if not len(samples):
+            return None
+        fade_in = int(self.sample_rate * fade_in_ms / 1000)
+        with self._lock:
+            voice = Voice(self._next_id, samples, gain, loop, fade_in)
+            self._next_id += 1
+            if len(self._voices) >= self.max_voices:
+                # Limite de vozes: rouba a mais antiga
+                self._voices.pop(0)
+            self._voices.append(voice)
+        return voice.id
+
+    def set_gain(self, voice_id, gain):
+        with self._lock:
+            for voice in self._voices:
+                if voice.id == voice_id:
+                    voice.gain = gain
+
+    def fade_out(self, voice_id, ms):
+        """Faz o fade-out da voz e a remove quando chegar a zero."""
+        length = max(1, int(self.sample_rate * ms / 1000))
+        with self._lock:
+            for voice in self._voices:
+                if voice.id == voice_id and voice.fade_out_start is None:
+                    voice.fade_out_start = voice.elapsed
+                    voice.fade_out_len = length
+
+    def stop(self, voice_id):
+        with self._lock:
+            self._voices = [v for v in self._voices if v.id != voice_id]
+
+    def stop_all(self, fade_ms=0):
+        if fade_ms:
+            for voice_id in self.active_voices():
+                self.fade_out(voice_id, fade_ms)
+            return
+        with self._lock:
+            self._voices = []
+
+    def voice_position_ms(self, voice_id):
+        """Posição da voz que já saiu pelo dispositivo (ms), ou None."""
+        with self._lock:
+            voice = next((v for v in self._voices if v.id == voice_id), None)
+            elapsed = voice.elapsed if voice is not None else 0
+        if not elapsed:
+            return None
+        frame_bytes = self.channels * 2
+        queued = 0
+        if self.output is not None:
+            queued = self.output.bufferSize() - self.output.bytesFree() + self.device.pending_bytes()
+        return max(0.0, (elapsed - queued / frame_bytes) * 1000.0 / self.sample_rate)
+
+    def active_voices(self):
+        with self._lock:
+            return [v.id for v in self._voices]
+
+    # --- Mixagem ---
+
+    def mix_block(self):
+        """Mistura um bloco e retorna o PCM int16 intercalado (bytes)."""
+        acc = self._acc
+        acc.fill(0.0)
+        with self._lock:
+            alive = []
+            for voice in self._voices:
+                if voice.requested_at is not None:
+                    self._record_latency(voice)
+                if voice.render(acc, self.block_frames):
+                    alive.append(voice)
+            self._voices = alive
+        if self.master_gain != 1.0:
+            acc *= self.master_gain
+        np.clip(acc, -1.0, 1.0, out=acc)
+        return (acc * 32767.0).astype('<i2').tobytes()
+
+    def _record_latency(self, voice):
+        # Tempo até entrar num bloco + o que ainda está na fila do dispositivo
+        latency = (time.perf_counter() - voice.requested_at) * 1000.0
+        voice.requested_at = None
+        if self.output is not None:
+            queued = self.output.bufferSize() - self.output.bytesFree()
+            latency += queued * 1000.0 / (self.sample_rate * self.channels * 2)
+        metrics.record('audio.mixer_latency_ms', latency)
+
+    # --- Saída ---
+
+    def audio_format(self):
+        fmt = QAudioFormat()
+        fmt.setSampleRate(self.sample_rate)
+        fmt.setChannelCount(self.channels)
+        fmt.setSampleSize(16)
+        fmt.setCodec('audio/pcm')
+        fmt.setByteOrder(QAudioFormat.LittleEndian)
+        fmt.setSampleType(QAudioFormat.SignedInt)
+        return fmt
+
+    def start(self, buffer_blocks=4):
+        """Abre o stream de saída (fica tocando silêncio sem vozes)."""
+        if self.output is not None:
+            return
+        self.device = _MixerDevice(self)
+        self.device.open(QIODevice.ReadOnly)
+        self.output = QAudioOutput(self.audio_format())
+        self.output.setBufferSize(self.block_frames * self.channels * 2 * buffer_blocks)
+        self.output.start(self.device)
+
+    def close(self):
+        if self.output is None:
+            return
+        self.output.stop()
+        self.device.close()
+        self.output = None
+        self.device = None
+
+
+class _MixerDevice(QIODevice):
+    """Entrega blocos inteiros do mixer, guardando a sobra para o próximo pull."""
+
+    def __init__(self, mixer, parent=None):
+        super().__init__(parent)
+        self._mixer = mixer
+        self._rest = b''
+
+    def readData(self, maxlen):
+        parts = [self._rest]
+        size = len(self._rest)
+        while size < maxlen:
+            block = self._mixer.mix_block()
+            parts.append(block)
+            size += len(block)
+        data = b''.join(parts)
+        self._rest = data[maxlen:]
+        return data[:maxlen]
+
+    def pending_bytes(self):
+        """Bytes já mixados que ainda não foram entregues ao dispositivo."""
+        return len(self._rest)
+
+    def writeData(self, data):
+        return 0
+
+    def bytesAvailable(self):
+        return (1 << 20) + super().bytesAvailable()
+
+
+def benchmark(voice_counts=(1, 2, 4, 8, 16), blocks=2000, block_frames=512):
+    """Mede o custo de mixagem por bloco e por voz."""
+    rng = np.random.default_rng(0)
+    sound = rng.uniform(-0.5, 0.5, size=(48000 * 2, 2)).astype(np.float32)
+    block_ms = block_frames * 1000.0 / 48000
+    print(f"Bloco de {block_frames} frames ({block_ms:.2f} ms de áudio)")
+    for count in voice_counts:
+        mixer = Mixer(block_frames=block_frames, max_voices=count)
+        for i in range(count):
+            mixer.play(sound, gain=0.5, fade_in_ms=10 * (i % 2), loop=True)
+        start = time.perf_counter()
+        for _ in range(blocks):
+            mixer.mix_block()
+        per_block = (time.perf_counter() - start) * 1e6 / blocks
+        print(f"{count:3d} vozes: {per_block:8.1f} µs/bloco  {per_block / count:7.1f} µs/voz  "
+              f"({per_block / (block_ms * 10):.2f}% do tempo real)")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,103 @@
+"""Música do menu em streaming a partir de um WAV mapeado em memória.
+
+O arquivo é validado na criação, mapeado com mmap e entregue em pedaços
+para um QAudioOutput em modo pull. Como só o trecho pedido é lido, o uso
+de memória não depende do tamanho da faixa. No fim dos dados a leitura
+volta para o começo dentro do mesmo pedaço, então o loop não tem buraco.
+"""
+
+import mmap
+import os
+
+from PyQt5.QtCore import QIODevice
+from PyQt5.QtMultimedia import QAudioDeviceInfo, QAudioOutput
+
+from .audio import audio_format, parse_wav
+
+
+class _LoopingWavDevice(QIODevice):
+    """Lê o chunk de dados do WAV em loop infinito."""
+
+    def __init__(self, data, info, parent=None):
+        super().__init__(parent)
+        self._data = data
+        self._start = info.data_offset
+        # Tamanho alinhado ao frame para não cortar uma amostra no meio
+        self._frame = info.channels * info.sample_width
+        self._size = info.data_size - info.data_size % self._frame
+        self._pos = 0
+
+    def readData(self, maxlen):
+        maxlen -= maxlen % self._frame
+        out = []
+        remaining = maxlen
+        while remaining > 0:
+            n = min(remaining, self._size - self._pos)
+            begin = self._start + self._pos
+            out.append(self._data[begin:begin + n])
+            self._pos = (self._pos + n) % self._size
+            remaining -= n
+        return b''.join(out)
+
+    def writeData(self, data):
+        return 0
+
+    def bytesAvailable(self):
+        return (1 << 20) + super().bytesAvailable()
+
+
+class StreamingMusic:
+    """Toca um WAV em loop sem carregar o arquivo inteiro na memória."""
+
+    def __init__(self, path, volume=0.5):
+        # Valida tudo antes de abrir a saída: erro aqui é melhor do que silêncio
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"música não encontrada: {path}")
+        self.output = None
+        self.device = None
+        self._map = None
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.info = parse_wav(self._map)
+        except (ValueError, OSError):
+            if self._map is not None:
+                self._map.close()
+            self._file.close()
+            raise
+        if self.info.data_size < self.info.channels * self.info.sample_width:
+            self.close()
+            raise ValueError(f"WAV sem amostras: {path}")
+
+        self.format = audio_format(self.info)
+        if not QAudioDeviceInfo.defaultOutputDevice().isFormatSupported(self.format):
+            self.close()
+            raise ValueError("formato do WAV não suportado pela saída padrão")
+
+        self.volume = volume
+
+    def play(self):
+        if self.output is not None:
+            return
+        self.device = _LoopingWavDevice(self._map, self.info)
+        self.device.open(QIODevice.ReadOnly)
+        self.output = QAudioOutput(self.format)
+        self.output.setVolume(self.volume)
+        self.output.start(self.device)
+
+    def stop(self):
+        """Para na hora (descarta o que estiver no buffer do dispositivo)."""
+        if self.output is None:
+            return
+        self.output.reset()
+        self.output.stop()
+        self.device.close()
+        self.output = None
+        self.device = None
+
+    def close(self):
+        self.stop()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -0,0 +1,170 @@
+"""Pacotes de susto: um arquivo por personagem com GIF, sons, ícone e metadados.
+
+Formato (.jspk):
+    'JSPK' | versão (u16) | reservado (u16) | tamanho do cabeçalho (u32)
+    cabeçalho JSON (utf-8): nome, tags, franquia e a tabela de membros
+        {"members": {"gif": [offset, tamanho, "arquivo_original.gif"], ...}}
+    membros, cada um alinhado em 64 bytes
+
+Em tempo de execução cada pacote custa um open + um mmap: só as páginas do
+cabeçalho são lidas na carga do catálogo, e cada membro vira uma fatia do
+mapeamento (memoryview), lida do disco só quando alguém acessa.
+
+Uso:
+    python -m components.packs build packs/Mangle.jspk --name Mangle \\
+        --gif assets/video_jumpscare/Mangle.gif --sound assets/audios/Jumpscare_fnaf2.wav \\
+        --icon assets/icons/Mangle_icon.png --tags fnaf,animatronic --franchise FNAF
+    python -m components.packs list [pasta]
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+MAGIC = b'JSPK'
+VERSION = 1
+PREAMBLE = struct.Struct('<4sHHI')
+ALIGN = 64
+SUFFIX = '.jspk'
+
+
+class ScarePack:
+    """Pacote aberto com mmap; os membros são lidos sob demanda."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, header_size = PREAMBLE.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"pacote inválido ou de versão desconhecida: {path}")
+            header = json.loads(self._map[PREAMBLE.size:PREAMBLE.size + header_size].decode('utf-8'))
+        except (ValueError, struct.error):
+            self._map.close()
+            raise
+        self.header = header
+        self.members = header.get('members', {})
+
+    @property
+    def name(self):
+        return self.header.get('name') or os.path.splitext(os.path.basename(self.path))[0]
+
+    @property
+    def tags(self):
+        return self.header.get('tags', [])
+
+    @property
+    def franchise(self):
+        return self.header.get('franchise', '')
+
+    def has(self, member):
+        return member in self.members
+
+    def member(self, member):
+        """Fatia do mmap com o conteúdo do membro (sem ler nada ainda)."""
+        offset, size = self.members[member][:2]
+        return memoryview(self._map)[offset:offset + size]
+
+    def member_name(self, member):
+        """Nome do arquivo original do membro (ex: para saber a extensão)."""
+        return self.members[member][2]
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_pack(out_path, name, members, tags=(), franchise='', **meta):
+    """Grava um pacote. `members` é {"gif": caminho, "sound": caminho, ...}."""
+    members = {key: path for key, path in members.items() if path}
+    sizes = {key: os.path.getsize(path) for key, path in members.items()}
+
+    def header_bytes(table):
+        header = dict(meta, name=name, tags=list(tags), franchise=franchise, members=table)
+        return json.dumps(header, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+    # Os offsets dependem do tamanho do cabeçalho e vice-versa: repete até estabilizar
+    table = {key: [0, size, os.path.basename(members[key])] for key, size in sizes.items()}
+    previous = None
+    while True:
+        header = header_bytes(table)
+        if len(header) == previous:
+            break
+        previous = len(header)
+        offset = PREAMBLE.size + len(header)
+        for key in sorted(table):
+            offset = (offset + ALIGN - 1) // ALIGN * ALIGN
+            table[key][0] = offset
+            offset += sizes[key]
+
+    directory = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(PREAMBLE.pack(MAGIC, VERSION, 0, len(header)))
+            f.write(header)
+            for key in sorted(table):
+                f.write(bytes(table[key][0] - f.tell()))
+                with open(members[key], 'rb') as src:
+                    f.write(src.read())
+        os.chmod(tmp, 0o644)  # mkstemp cria com 0600
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def load_packs(directory):
+    """Abre todos os pacotes da pasta (só o cabeçalho de cada um é lido)."""
+    packs = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*' + SUFFIX))):
+        try:
+            pack = ScarePack(path)
+        except (OSError, ValueError) as e:
+            print(f"[PACOTES] Ignorando {path}: {e}")
+            continue
+        packs[pack.name] = pack
+    return packs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pacotes de susto (.jspk)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="cria um pacote")
+    build.add_argument('out')
+    build.add_argument('--name', required=True)
+    build.add_argument('--gif', required=True)
+    build.add_argument('--sound')
+    build.add_argument('--icon')
+    build.add_argument('--tags', default='')
+    build.add_argument('--franchise', default='')
+    listing = sub.add_parser('list', help="lista os pacotes de uma pasta")
+    listing.add_argument('directory', nargs='?', default='packs')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        tags = [t.strip() for t in args.tags.split(',') if t.strip()]
+        build_pack(args.out, args.name, {'gif': args.gif, 'sound': args.sound, 'icon': args.icon},
+                   tags=tags, franchise=args.franchise)
+        print(f"[PACOTES] {args.out} criado")
+    else:
+        for name, pack in load_packs(args.directory).items():
+            sizes = ', '.join(f"{key} {pack.members[key][1] / 1024:.0f} KB" for key in sorted(pack.members))
+            print(f"{name:20} {pack.franchise:12} {','.join(pack.tags):30} {sizes}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
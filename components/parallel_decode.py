@@ -0,0 +1,177 @@
+"""Decodificação de GIFs grandes em paralelo, em vários processos.
+
+O GIF é dividido em faixas de quadros que podem ser decodificadas sem
+conhecer o que veio antes: uma faixa sempre começa num "quadro-chave"
+(o primeiro, um quadro opaco que cobre a tela toda, ou o quadro logo
+depois de um que limpa a tela inteira). Cada faixa vai para um processo
+do ProcessPoolExecutor, que decodifica com o backend Pillow/NumPy e
+escreve os pixels direto numa memória compartilhada. O processo da GUI
+só monta QImages por cima dessa memória, sem copiar os quadros.
+
+Tempo de pré-carregamento por número de processos:
+    python -m components.parallel_decode [gif]
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from PyQt5 import sip
+from PyQt5.QtGui import QImage
+
+from .decoders import Compositor, decode_indices, gui_app, parse_gif
+from .frames import FrameSequence, load_frames
+
+# Abaixo disso não compensa subir processos
+MIN_PARALLEL_PIXELS = 4 * 1920 * 1080
+
+_executor = None
+_executor_workers = 0
+
+
+def _covers(info, frame):
+    return frame.x == 0 and frame.y == 0 and frame.width >= info.width and frame.height >= info.height
+
+
+def keyframes(info):
+    """Índices dos quadros que não dependem do canvas anterior."""
+    keys = []
+    for i, frame in enumerate(info.frames):
+        if i == 0:
+            keys.append(i)
+            continue
+        prev = info.frames[i - 1]
+        opaque_full = _covers(info, frame) and frame.transparent is None and frame.disposal != 3
+        after_clear = _covers(info, prev) and prev.disposal == 2
+        if opaque_full or after_clear:
+            keys.append(i)
+    return keys
+
+
+def split_ranges(info, workers):
+    """Agrupa os segmentos entre quadros-chave em até ~2 faixas por processo."""
+    keys = keyframes(info) + [len(info.frames)]
+    segments = [(keys[i], keys[i + 1]) for i in range(len(keys) - 1)]
+    cost = lambda seg: sum(f.width * f.height for f in info.frames[seg[0]:seg[1]])
+    target = sum(cost(seg) for seg in segments) / max(1, workers * 2)
+
+    ranges = []
+    start, acc = None, 0
+    for seg in segments:
+        if start is None:
+            start = seg[0]
+        acc += cost(seg)
+        if acc >= target:
+            ranges.append((start, seg[1]))
+            start, acc = None, 0
+    if start is not None:
+        ranges.append((start, len(info.frames)))
+    return ranges
+
+
+def _decode_range(path, start, end, shm_name, count):
+    """Roda no processo filho: decodifica [start, end) direto na memória compartilhada."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    info = parse_gif(data)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray((count, info.height, info.width, 4), dtype=np.uint8, buffer=shm.buf)
+        compositor = Compositor(info.width, info.height)
+        for i in range(start, end):
+            frame = info.frames[i]
+            saved = compositor.draw(frame, decode_indices(data, frame))
+            # RGBA -> BGRA: em little-endian é o layout do ARGB32 do Qt. O alfa do
+            # GIF é 0 ou 255 e o transparente é zerado, então já vale como premultiplicado
+            out[i] = compositor.canvas[..., (2, 1, 0, 3)]
+            compositor.dispose(frame, saved)
+        del out
+    finally:
+        shm.close()
+    return end - start
+
+
+class SharedFrameSequence(FrameSequence):
+    """FrameSequence cujos QImages apontam para uma memória compartilhada."""
+
+    def __init__(self, shm, width, height, delays):
+        self._shm = shm
+        self._array = np.ndarray((len(delays), height, width, 4), dtype=np.uint8, buffer=shm.buf)
+        base = self._array.ctypes.data
+        frame_bytes = width * height * 4
+        images = [QImage(sip.voidptr(base + i * frame_bytes), width, height, width * 4,
+                         QImage.Format_ARGB32_Premultiplied) for i in range(len(delays))]
+        super().__init__(images, list(delays))
+
+    def close(self):
+        self.images = []
+        self._array = None
+        self._shm.close()
+
+
+def _get_executor(workers):
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown()
+        # forkserver: os filhos não herdam o estado do Qt do processo da GUI
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        _executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(method))
+        _executor_workers = workers
+    return _executor
+
+
+def load_frames_parallel(path, workers=None):
+    """Decodifica todos os quadros de `path` em paralelo."""
+    if not isinstance(path, str):
+        # Os processos filhos releem o arquivo; bytes (ex: de um pacote) vão pelo caminho normal
+        return load_frames(path)
+    with open(path, 'rb') as f:
+        info = parse_gif(f.read())
+    count = len(info.frames)
+    if not count:
+        return FrameSequence([], [])
+    workers = workers or os.cpu_count() or 1
+
+    size = count * info.width * info.height * 4
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        if workers == 1 or size < MIN_PARALLEL_PIXELS * 4:
+            _decode_range(path, 0, count, shm.name, count)
+        else:
+            executor = _get_executor(workers)
+            futures = [executor.submit(_decode_range, path, start, end, shm.name, count)
+                       for start, end in split_ranges(info, workers)]
+            for future in futures:
+                future.result()
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    # O mapeamento continua válido depois do unlink; o nome só não é mais visível
+    shm.unlink()
+    return SharedFrameSequence(shm, info.width, info.height, [f.delay for f in info.frames])
+
+
+def _benchmark(path):
+    gui_app()
+    with open(path, 'rb') as f:
+        info = parse_gif(f.read())
+    print(f"{path}: {len(info.frames)} quadros, {len(keyframes(info))} quadro(s)-chave")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        _get_executor(workers)  # sobe os processos fora da medição
+        start = time.perf_counter()
+        frames = load_frames_parallel(path, workers)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        print(f"  {workers:2d} processo(s): {elapsed:8.1f} ms")
+        frames.close()
+        workers *= 2
+
+
+if __name__ == '__main__':
+    _benchmark(sys.argv[1] if len(sys.argv) > 1 else 'assets/video_jumpscare/Mangle.gif')
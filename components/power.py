@@ -0,0 +1,135 @@
+"""Estado de energia (bateria/tomada) e despertares do processo.
+
+O estado vem de `/sys/class/power_supply`: uma fonte externa (Mains, USB)
+com `online` = 1 é tomada; uma bateria com `status` = Discharging sem
+fonte ligada é bateria. Sem nada lá (desktop, fora do Linux) conta como
+tomada. O sysfs não avisa mudanças por inotify, então é lido a cada 30 s
+com um timer bem grosso (o Qt junta com outros despertares).
+
+"Despertares" são as trocas de contexto voluntárias + involuntárias de
+todas as threads do processo (`/proc/self/task/*/status`): cada vez que
+uma thread dorme esperando algo e acorda conta uma. O PowerMonitor
+acumula quantas houve em cada estado e publica a taxa por minuto.
+
+Estado e despertares agora: python -m components.power
+"""
+
+import os
+import sys
+import time
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+from . import metrics
+
+POWER_SUPPLY_DIR = '/sys/class/power_supply'
+POLL_MS = 30000
+REPORT_MS = 60000
+EXTERNAL_TYPES = ('Mains', 'USB', 'USB_C', 'USB_PD', 'Wireless')
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def on_battery(root=POWER_SUPPLY_DIR):
+    """True se a máquina está rodando na bateria."""
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return False
+    discharging = False
+    for name in names:
+        kind = _read(os.path.join(root, name, 'type'))
+        if kind in EXTERNAL_TYPES and _read(os.path.join(root, name, 'online')) == '1':
+            return False
+        if kind == 'Battery' and _read(os.path.join(root, name, 'status')) == 'Discharging':
+            discharging = True
+    return discharging
+
+
+def wakeups(pid='self'):
+    """Trocas de contexto acumuladas de todas as threads do processo."""
+    total = 0
+    task_dir = f'/proc/{pid}/task'
+    try:
+        tasks = os.listdir(task_dir)
+    except OSError:
+        return None
+    for task in tasks:
+        status = _read(os.path.join(task_dir, task, 'status')) or ''
+        for line in status.splitlines():
+            if line.startswith(('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches')):
+                total += int(line.split()[1])
+    return total
+
+
+def _label(battery):
+    return 'bateria' if battery else 'tomada'
+
+
+class PowerMonitor(QObject):
+    """Avisa quando a máquina vai para a bateria ou volta para a tomada."""
+
+    changed = pyqtSignal(bool)   # True = na bateria
+
+    def __init__(self, root=POWER_SUPPLY_DIR, poll_ms=POLL_MS, report_ms=REPORT_MS, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.on_battery = on_battery(root)
+        # estado -> [segundos, despertares] acumulados nele
+        self.stats = {False: [0.0, 0], True: [0.0, 0]}
+        self._mark = (time.monotonic(), wakeups())
+
+        self._poll = QTimer(self)
+        self._poll.setTimerType(Qt.VeryCoarseTimer)
+        self._poll.timeout.connect(self.poll)
+        self._poll.start(poll_ms)
+        self._report = QTimer(self)
+        self._report.setTimerType(Qt.VeryCoarseTimer)
+        self._report.timeout.connect(self.report)
+        if report_ms:
+            self._report.start(report_ms)
+        print(f"[ENERGIA] Na {_label(self.on_battery)}")
+
+    def _account(self):
+        now, count = time.monotonic(), wakeups()
+        then, before = self._mark
+        self._mark = (now, count)
+        if count is not None and before is not None:
+            self.stats[self.on_battery][0] += now - then
+            self.stats[self.on_battery][1] += count - before
+
+    def poll(self):
+        battery = on_battery(self.root)
+        if battery == self.on_battery:
+            return
+        self._account()
+        self.on_battery = battery
+        print(f"[ENERGIA] Mudou para a {_label(battery)}")
+        self.changed.emit(battery)
+
+    def wakeups_per_minute(self):
+        """{'tomada': taxa, 'bateria': taxa} só com os estados já vividos."""
+        self._account()
+        return {_label(battery): count * 60.0 / seconds
+                for battery, (seconds, count) in self.stats.items() if seconds > 0}
+
+    def report(self):
+        rates = self.wakeups_per_minute()
+        for state, rate in rates.items():
+            metrics.record(f'power.wakeups_per_min.{state}', rate)
+        print("[ENERGIA] Despertares/min: " + ', '.join(f"{state} {rate:.0f}" for state, rate in rates.items()))
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    before = wakeups()
+    time.sleep(seconds)
+    after = wakeups()
+    print(f"Na {_label(on_battery())}; este processo parado: "
+          f"{(after - before) * 60.0 / seconds:.0f} despertares/min")
@@ -0,0 +1,182 @@
+"""Profiler por amostragem embutido (saída em pilhas "folded" para flamegraph).
+
+Ligado por `python main.py --profile` ou pela variável de ambiente
+`JUMPSCARE_PROFILE` (caminho do arquivo; `{pid}` vira o pid, `1` usa
+`profile-{pid}.folded`). A variável passa para o processo `--jumpscare`
+que o menu abre, então dá para medir o susto sem anexar nada de fora.
+`JUMPSCARE_PROFILE_HZ` muda a taxa (padrão 100 amostras/s).
+
+Uma thread de fundo acorda na taxa pedida, pega o quadro atual da thread
+principal (`sys._current_frames`) e conta a pilha de code objects junto
+com a fase do app (idle, pre-warm, scare, teardown, marcada pelo
+JumpscareController com `set_phase`). Os nomes só são montados na hora de
+gravar. O arquivo sai na saída do processo (atexit ou SIGTERM) ou quando
+pedido pela API (`POST /profile`), uma linha por pilha:
+
+    scare;main.py:main;jumpscare.py:run_continuous;...;frames.py:FramePlayer._tick 37
+
+flamegraph.pl profile.folded > profile.svg  (ou speedscope, inferno...)
+
+Custo medido contra uma carga de CPU em Python: python -m components.profiler
+"""
+
+import atexit
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+ENV_PATH = 'JUMPSCARE_PROFILE'
+ENV_HZ = 'JUMPSCARE_PROFILE_HZ'
+DEFAULT_PATH = 'profile-{pid}.folded'
+DEFAULT_HZ = 100.0
+
+_phase = 'idle'
+_active = None
+
+
+def set_phase(name):
+    """Marca a fase atual (vai como primeiro quadro das próximas amostras)."""
+    global _phase
+    _phase = name
+
+
+def active():
+    """O profiler ligado neste processo, ou None."""
+    return _active
+
+
+class SamplingProfiler:
+    def __init__(self, path=DEFAULT_PATH, hz=DEFAULT_HZ, thread_id=None):
+        self.path = path.format(pid=os.getpid())
+        self.hz = hz
+        self.thread_id = threading.main_thread().ident if thread_id is None else thread_id
+        self.counts = Counter()       # (fase, (code, code, ...)) -> amostras
+        self.samples = 0
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _run(self):
+        interval = 1.0 / self.hz
+        current_frames = sys._current_frames
+        target = self.thread_id
+        # Agenda por prazo: a espera pelo GIL (até o switch interval, 5 ms) não atrasa a taxa
+        next_at = time.monotonic()
+        while True:
+            next_at += interval
+            now = time.monotonic()
+            if next_at < now:
+                next_at = now
+            if self._stop.wait(next_at - now):
+                return
+            frame = current_frames().get(target)
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            key = (_phase, tuple(codes))
+            with self._lock:
+                self.counts[key] += 1
+                self.samples += 1
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{name}"
+        return label
+
+    def folded(self):
+        """Linhas "fase;raiz;...;folha contagem", agregadas por nome."""
+        with self._lock:
+            items = list(self.counts.items())
+        lines = Counter()
+        for (phase, codes), count in items:
+            lines[';'.join([phase] + [self._label(code) for code in reversed(codes)])] += count
+        return [f"{stack} {count}" for stack, count in sorted(lines.items())]
+
+    def dump(self, path=None):
+        """Grava o arquivo folded; retorna (caminho, amostras)."""
+        path = path or self.path
+        lines = self.folded()
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write('\n'.join(lines) + ('\n' if lines else ''))
+        os.replace(tmp, path)
+        return path, self.samples
+
+
+def start_from_env():
+    """Liga o profiler se JUMPSCARE_PROFILE estiver definido (chamar da thread principal)."""
+    global _active
+    path = os.environ.get(ENV_PATH)
+    if not path or _active is not None:
+        return _active
+    if path == '1':
+        path = DEFAULT_PATH
+    profiler = SamplingProfiler(path, float(os.environ.get(ENV_HZ) or DEFAULT_HZ))
+    profiler.start()
+    _active = profiler
+
+    def dump_at_exit():
+        path, samples = profiler.dump()
+        print(f"[PROFILE] {samples} amostras em {path}")
+
+    atexit.register(dump_at_exit)
+    if signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+        # O monitor normalmente termina com SIGTERM, que pula o atexit
+        def on_term(signum, frame):
+            dump_at_exit()
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, on_term)
+    print(f"[PROFILE] Amostrando a {profiler.hz:g} Hz -> {profiler.path}")
+    return profiler
+
+
+def _workload(n=300000):
+    total = 0
+    for i in range(n):
+        total += sum(divmod(i * 7919, 104729))
+    return sorted(str(total + i) for i in range(n // 10))
+
+
+def benchmark(rounds=15, hz_values=(100.0, 1000.0)):
+    """Rodadas alternadas com e sem profiler (medianas), para o ruído da máquina pesar igual."""
+    def timed():
+        start = time.perf_counter()
+        _workload()
+        return time.perf_counter() - start
+
+    timed()  # aquecimento
+    for hz in hz_values:
+        base, profiled, samples = [], [], 0
+        for _ in range(rounds):
+            base.append(timed())
+            profiler = SamplingProfiler(os.devnull, hz)
+            profiler.start()
+            profiled.append(timed())
+            profiler.stop()
+            samples += profiler.samples
+        base, profiled = sorted(base)[rounds // 2], sorted(profiled)[rounds // 2]
+        print(f"{hz:6g} Hz: {base * 1000:.1f} -> {profiled * 1000:.1f} ms por rodada "
+              f"({(profiled / base - 1) * 100:+.2f}%), {samples / (rounds * profiled):.0f} amostras/s")
+
+
+if __name__ == '__main__':
+    benchmark()
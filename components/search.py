@@ -0,0 +1,220 @@
+"""Índice de busca do catálogo (nome, tags e franquia).
+
+Cada entrada recebe uma posição de bit, e cada termo (palavra normalizada:
+minúscula, sem acento) guarda a máscara das entradas onde aparece, num
+int do Python. Unir e cruzar resultados vira `|` e `&` em inteiros, o que
+custa microssegundos mesmo com dezenas de milhares de entradas.
+
+Cada palavra da busca casa com qualquer palavra indexada que a contenha
+(substring), seja qual for o tamanho; então digitar mais letras só estreita
+o resultado. Nomes que começam com a busca vêm primeiro. Para 1-2 letras e
+para 3 letras há máscaras prontas (pedaços de 1-2 letras e trigramas de
+cada palavra); com 4+ letras os trigramas dão os termos candidatos
+(interseção, conferida com substring). O índice é atualizado entrada por
+entrada quando pacotes entram ou saem.
+
+Benchmark com 10 mil entradas: python -m components.search [quantidade]
+"""
+
+import bisect
+import random
+import sys
+import time
+import unicodedata
+from collections import defaultdict
+
+SHORT_TERM = 2
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def _words(text):
+    return ''.join(c if c.isalnum() else ' ' for c in text).split()
+
+
+def trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def short_terms(word):
+    """Pedaços de 1 a SHORT_TERM letras da palavra (em qualquer posição)."""
+    return {word[i:i + n] for n in range(1, SHORT_TERM + 1) for i in range(len(word) - n + 1)}
+
+
+def _bits(mask, limit=None):
+    """Posições dos bits ligados, em ordem crescente."""
+    s = bin(mask)[:1:-1]
+    out = []
+    i = s.find('1')
+    while i >= 0 and (limit is None or len(out) < limit):
+        out.append(i)
+        i = s.find('1', i + 1)
+    return out
+
+
+class SearchIndex:
+    def __init__(self):
+        self._keys = []                   # posição do bit -> chave (None se removida)
+        self._pos = {}                    # chave -> (posição, palavras, primeira palavra do nome)
+        self._all = 0
+        self._terms = defaultdict(int)    # termo -> máscara
+        self._grams = defaultdict(set)    # trigrama -> termos
+        self._gram_masks = defaultdict(int)   # trigrama -> máscara
+        self._short = defaultdict(int)    # pedaço de 1-2 letras -> máscara
+        self._heads = defaultdict(int)    # primeira palavra do nome -> máscara (para ranquear)
+        self._head_list = []              # primeiras palavras, ordenadas (prefixos longos)
+
+    def __len__(self):
+        return len(self._pos)
+
+    def __contains__(self, key):
+        return key in self._pos
+
+    def add(self, key, name, tags=(), franchise=''):
+        """Indexa (ou reindexa) uma entrada."""
+        if key in self._pos:
+            self.remove(key)
+        pos = len(self._keys)
+        bit = 1 << pos
+        words = set(_words(normalize(' '.join([name, franchise] + list(tags)))))
+        head = (_words(normalize(name)) or [''])[0]
+        self._keys.append(key)
+        self._pos[key] = (pos, words, head)
+        self._all |= bit
+        grams, shorts = set(), set()
+        for word in words:
+            word_grams = trigrams(word)
+            if word not in self._terms:
+                for gram in word_grams:
+                    self._grams[gram].add(word)
+            self._terms[word] |= bit
+            grams |= word_grams
+            shorts |= short_terms(word)
+        for gram in grams:
+            self._gram_masks[gram] |= bit
+        for short in shorts:
+            self._short[short] |= bit
+        if head not in self._heads:
+            bisect.insort(self._head_list, head)
+        self._heads[head] |= bit
+
+    def add_entry(self, entry):
+        self.add(entry.name, entry.name, entry.tags, entry.franchise)
+
+    def remove(self, key):
+        item = self._pos.pop(key, None)
+        if item is None:
+            return
+        pos, words, head = item
+        clear = ~(1 << pos)
+        self._keys[pos] = None
+        self._all &= clear
+        grams, shorts = set(), set()
+        for word in words:
+            word_grams = trigrams(word)
+            self._terms[word] &= clear
+            if not self._terms[word]:
+                del self._terms[word]
+                for gram in word_grams:
+                    self._grams[gram].discard(word)
+                    if not self._grams[gram]:
+                        del self._grams[gram]
+            grams |= word_grams
+            shorts |= short_terms(word)
+        for gram in grams:
+            self._gram_masks[gram] &= clear
+            if not self._gram_masks[gram]:
+                del self._gram_masks[gram]
+        for short in shorts:
+            self._short[short] &= clear
+            if not self._short[short]:
+                del self._short[short]
+        self._heads[head] &= clear
+        if not self._heads[head]:
+            del self._heads[head]
+            del self._head_list[bisect.bisect_left(self._head_list, head)]
+        if len(self._keys) > 2 * len(self._pos) + 64:
+            self._compact()
+
+    def _compact(self):
+        """Reindexa para reaproveitar as posições de bits removidas."""
+        items = [(key, words, head) for key, (_, words, head) in
+                 sorted(self._pos.items(), key=lambda item: item[1][0])]
+        self.__init__()
+        for key, words, head in items:
+            # O texto original não é guardado; palavras + cabeça bastam para reindexar
+            self.add(key, head, sorted(words))
+
+    def _match_word(self, word):
+        """Máscara das entradas com alguma palavra que contém `word`."""
+        if len(word) <= SHORT_TERM:
+            return self._short.get(word, 0)
+        if len(word) == 3:
+            return self._gram_masks.get(word, 0)
+        candidates = sorted((self._grams.get(gram, ()) for gram in trigrams(word)), key=len)
+        mask = 0
+        for term in set(candidates[0]).intersection(*candidates[1:]):
+            if word in term:
+                mask |= self._terms[term]
+        return mask
+
+    def _heads_with_prefix(self, prefix):
+        mask = 0
+        i = bisect.bisect_left(self._head_list, prefix)
+        while i < len(self._head_list) and self._head_list[i].startswith(prefix):
+            mask |= self._heads[self._head_list[i]]
+            i += 1
+        return mask
+
+    def search(self, query, limit=None):
+        """Chaves que contêm todas as palavras da busca; nomes que começam com ela vêm primeiro."""
+        words = _words(normalize(query))
+        mask = self._all
+        for word in sorted(words, key=len, reverse=True):
+            mask &= self._match_word(word)
+            if not mask:
+                return []
+        if not words:
+            return [self._keys[pos] for pos in _bits(mask, limit)]
+        starts = mask & self._heads_with_prefix(words[0])
+        positions = _bits(starts, limit)
+        if limit is None or len(positions) < limit:
+            positions += _bits(mask & ~starts, None if limit is None else limit - len(positions))
+        return [self._keys[pos] for pos in positions]
+
+
+def benchmark(count=10000, rounds=200):
+    rng = random.Random(1)
+    syllables = ['fre', 'ddy', 'bon', 'nie', 'chi', 'ca', 'fox', 'y', 'man', 'gle', 'spri',
+                 'ng', 'trap', 'vin', 'rat', 'mon', 'ster', 'pup', 'pet', 'ba', 'lloon']
+    tags = ['fnaf', 'animatronic', 'monster', 'ghost', 'classic', 'loud', 'retro', 'clown']
+    franchises = ['FNAF', 'Poppy', 'Bendy', 'Granny', '']
+    index = SearchIndex()
+    start = time.perf_counter()
+    for i in range(count):
+        name = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).capitalize() + f" {i}"
+        index.add(f"e{i}", name, rng.sample(tags, 2), rng.choice(franchises))
+    build_ms = (time.perf_counter() - start) * 1000.0
+
+    queries = ['f', 'fr', 'fre', 'fredd', 'spring', 'monster', 'fnaf chi', 'xyz', 'ghost rat', 'pup']
+    times = []
+    for _ in range(rounds):
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, limit=200)
+            times.append((time.perf_counter() - start) * 1000.0)
+    times.sort()
+    p = lambda q: times[min(len(times) - 1, int(q * len(times)))]
+    print(f"{count} entradas indexadas em {build_ms:.0f} ms | busca p50 {p(0.5):.3f} ms | "
+          f"p99 {p(0.99):.3f} ms | máx {times[-1]:.3f} ms")
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search(query)
+        print(f"  {query!r:12} {len(hits):6d} resultado(s) {(time.perf_counter() - start) * 1000.0:7.3f} ms")
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
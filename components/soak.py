@@ -0,0 +1,203 @@
+"""Teste de resistência: milhares de sustos seguidos procurando vazamentos.
+
+O monitor foi feito para rodar "para sempre"; aqui o JumpscareController
+passa por dezenas de milhares de ciclos trigger_jumpscare/finish_scare na
+plataforma offscreen, sem esperar o tempo real: a posição do "áudio" que
+comanda o PresentationClock é virtual e o harness a empurra até o fim do
+GIF em poucos passos, pintando os quadros no caminho.
+
+Depois de um aquecimento (caches, primeiras alocações do Qt) o harness
+mede de tempos em tempos:
+
+- RSS do processo (depois de gc + malloc_trim, para tirar ruído do malloc);
+- memória Python alocada (tracemalloc), com as linhas que mais cresceram;
+- QObjects vivos: árvore de filhos da aplicação e das janelas + objetos
+  Python que embrulham QObjects sem pai (ex: FramePlayer, QMediaPlayer).
+
+Falha (código de saída 1) se o crescimento entre o fim do aquecimento e
+o fim do teste passar dos limites.
+
+    QT_QPA_PLATFORM=offscreen python -m components.soak --cycles 20000
+    QT_QPA_PLATFORM=offscreen python -m components.soak --cycles 5000 --low-memory
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QEvent, QObject, qInstallMessageHandler
+from PyQt5.QtWidgets import QApplication
+
+from .memory import malloc_trim, rss_bytes
+
+RSS_GROWTH_MAX_MB = 10.0
+TRACED_GROWTH_MAX_MB = 1.0
+QOBJECT_GROWTH_MAX = 5
+SAMPLES = 20
+
+
+class VirtualAudio:
+    """Posição de áudio (ms) controlada pelo harness."""
+
+    def __init__(self):
+        self.ms = 0.0
+
+    def __call__(self):
+        return self.ms
+
+
+def live_qobjects():
+    """Contagem de QObjects vivos por classe."""
+    found = {}
+    roots = [QCoreApplication.instance()] + QApplication.topLevelWidgets()
+    for root in roots:
+        found[sip.unwrapinstance(root)] = root.metaObject().className()
+        for child in root.findChildren(QObject):
+            found[sip.unwrapinstance(child)] = child.metaObject().className()
+    for obj in gc.get_objects():
+        if isinstance(obj, QObject) and not sip.isdeleted(obj):
+            found.setdefault(sip.unwrapinstance(obj), obj.metaObject().className())
+    return Counter(found.values())
+
+
+class _QtMessages:
+    """Conta os avisos do Qt em vez de imprimir um por susto (ex: raise() no offscreen)."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def __call__(self, kind, context, message):
+        self.counts[message] += 1
+
+
+def _settle(app):
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+    malloc_trim()
+
+
+def _cycle(app, controller, audio, steps):
+    audio.ms = 1.0
+    controller.trigger_jumpscare()
+    app.processEvents()
+    # Sem quadros (GIF faltando) o susto é só o FALLBACK_SCARE_MS; não há FramePlayer rodando
+    duration = controller.frames.duration if len(controller.frames) else 0
+    for step in range(1, steps + 1):
+        if not controller.scare_active or not duration:
+            break
+        audio.ms = 1.0 + duration * step / steps + (1.0 if step == steps else 0.0)
+        # Avança o FramePlayer sem esperar o timer dele (o relógio é virtual)
+        controller.frame_player._tick()
+        app.processEvents()
+    if controller.scare_active:
+        controller.finish_scare()
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def soak(cycles=10000, gif=None, sound=None, steps=4, warmup=None, low_memory=False,
+         rss_max_mb=RSS_GROWTH_MAX_MB, traced_max_mb=TRACED_GROWTH_MAX_MB, qobject_max=QOBJECT_GROWTH_MAX):
+    """Roda o teste; retorna a lista de motivos de falha (vazia = passou)."""
+    from .jumpscare import GIF_PATH, SOUND_PATH, JumpscareController
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    controller = JumpscareController(gif or GIF_PATH, sound or SOUND_PATH, probability=0.0,
+                                     interval_seconds=3600, low_memory=low_memory)
+    audio = VirtualAudio()
+    controller.clock.audio_position = audio
+    warmup = max(1, cycles // 20) if warmup is None else warmup
+    every = max(1, (cycles - warmup) // SAMPLES)
+
+    messages = _QtMessages()
+    previous_handler = qInstallMessageHandler(messages)
+    devnull = open(os.devnull, 'w')
+    stdout = sys.stdout
+    print(f"[SOAK] {cycles} ciclos ({warmup} de aquecimento), GIF {controller.current_gif!r}")
+    print(f"{'ciclo':>8} {'RSS MB':>8} {'Python MB':>10} {'QObjects':>9} {'ciclos/s':>9}")
+    samples = []
+    baseline = None
+    start = time.perf_counter()
+    last = (start, 0)
+    try:
+        for i in range(1, cycles + 1):
+            sys.stdout = devnull   # os prints do controller a cada susto
+            _cycle(app, controller, audio, steps)
+            sys.stdout = stdout
+            if i == warmup or (i > warmup and ((i - warmup) % every == 0 or i == cycles)):
+                _settle(app)
+                objects = live_qobjects()
+                if i == warmup:
+                    tracemalloc.start()
+                    # A 1ª varredura com o tracemalloc ligado aloca uma vez só; fica fora da conta
+                    objects = live_qobjects()
+                    # O snapshot de referência vive até o fim: entra na conta desde já
+                    snapshot0 = tracemalloc.take_snapshot()
+                traced = tracemalloc.get_traced_memory()[0]
+                now = time.perf_counter()
+                rate = (i - last[1]) / max(1e-9, now - last[0])
+                last = (now, i)
+                sample = (i, rss_bytes() or 0, traced, objects)
+                samples.append(sample)
+                if baseline is None:
+                    baseline = sample
+                print(f"{i:8d} {sample[1] / 2**20:8.1f} {traced / 2**20:10.2f} "
+                      f"{sum(objects.values()):9d} {rate:9.0f}")
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+        qInstallMessageHandler(previous_handler)
+    for message, n in messages.counts.most_common(3):
+        print(f"[SOAK] Aviso do Qt {n}x: {message}")
+
+    _, rss0, traced0, objects0 = baseline
+    _, rss1, traced1, objects1 = samples[-1]
+    snapshot1 = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    failures = []
+    rss_growth = (rss1 - rss0) / 2**20
+    traced_growth = (traced1 - traced0) / 2**20
+    object_growth = objects1 - objects0
+    print(f"[SOAK] {cycles} ciclos em {time.perf_counter() - start:.0f} s | RSS {rss_growth:+.1f} MB | "
+          f"Python {traced_growth:+.2f} MB | QObjects {sum(objects1.values()) - sum(objects0.values()):+d}")
+    if rss_growth > rss_max_mb:
+        failures.append(f"RSS cresceu {rss_growth:.1f} MB (limite {rss_max_mb} MB)")
+    if traced_growth > traced_max_mb:
+        failures.append(f"memória Python cresceu {traced_growth:.2f} MB (limite {traced_max_mb} MB)")
+        for stat in snapshot1.compare_to(snapshot0, 'lineno')[:5]:
+            print(f"    {stat}")
+    if sum(object_growth.values()) > qobject_max:
+        grown = ', '.join(f"{name} +{n}" for name, n in object_growth.most_common(5))
+        failures.append(f"QObjects vivos cresceram: {grown} (limite {qobject_max})")
+    for reason in failures:
+        print(f"[SOAK] FALHOU: {reason}")
+    if not failures:
+        print("[SOAK] OK")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de resistência (vazamentos em sustos repetidos)")
+    parser.add_argument('--cycles', type=int, default=10000)
+    parser.add_argument('--gif')
+    parser.add_argument('--sound', help="'none' para rodar sem som")
+    parser.add_argument('--steps', type=int, default=4, help="passos do relógio virtual por susto")
+    parser.add_argument('--low-memory', action='store_true', help="exercita também o release_idle")
+    parser.add_argument('--rss-max-mb', type=float, default=RSS_GROWTH_MAX_MB)
+    parser.add_argument('--traced-max-mb', type=float, default=TRACED_GROWTH_MAX_MB)
+    parser.add_argument('--qobject-max', type=int, default=QOBJECT_GROWTH_MAX)
+    args = parser.parse_args(argv)
+    failures = soak(args.cycles, args.gif, args.sound, args.steps, low_memory=args.low_memory,
+                    rss_max_mb=args.rss_max_mb, traced_max_mb=args.traced_max_mb, qobject_max=args.qobject_max)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    sys.exit(main())
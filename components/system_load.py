@@ -0,0 +1,121 @@
+"""Leitura barata da carga da máquina para decidir se é hora de assustar.
+
+Com a máquina ocupada por outra coisa o susto engasga (quadros pulados,
+composição da janela em tela cheia atrasando) e perde a graça. Antes de
+disparar, o controller olha:
+
+- `/proc/loadavg`: carga de 1 min por CPU;
+- `/proc/pressure/cpu` (PSI): fração do tempo em que havia tarefa pronta
+  esperando CPU. Entre duas leituras próximas usa o contador `total` (µs),
+  que reage na hora; senão usa a média de 10 s;
+- `/proc/meminfo`: fração de memória disponível.
+
+Os arquivos ficam abertos e são relidos com `pread`, sem abrir de novo:
+uma amostra custa poucas dezenas de µs. Fora do Linux (ou sem PSI) o que
+faltar fica None e não pesa na decisão.
+
+Amostra e custo: python -m components.system_load
+"""
+
+import os
+import time
+from collections import namedtuple
+
+LOAD_PER_CPU_MAX = 1.5       # carga de 1 min por CPU
+CPU_PRESSURE_MAX = 40.0      # % do tempo com tarefa esperando CPU
+MEM_AVAILABLE_MIN = 0.05     # fração da RAM disponível
+# Janela para calcular a pressão pelo contador do PSI; fora dela usa avg10
+PSI_MIN_WINDOW_S = 0.25
+PSI_MAX_WINDOW_S = 5.0
+
+LoadSample = namedtuple('LoadSample', 'load_per_cpu cpu_pressure mem_available')
+
+
+def _open(path):
+    try:
+        return os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return None
+
+
+def _read(fd):
+    return os.pread(fd, 4096, 0).decode('ascii', errors='replace')
+
+
+class SystemLoad:
+    def __init__(self, proc='/proc'):
+        self.cpus = os.cpu_count() or 1
+        self._loadavg = _open(os.path.join(proc, 'loadavg'))
+        self._pressure = _open(os.path.join(proc, 'pressure', 'cpu'))
+        self._meminfo = _open(os.path.join(proc, 'meminfo'))
+        self._psi_last = None   # (instante, total em µs) da leitura de referência
+        self._psi_value = None
+
+    def _cpu_pressure(self):
+        line = _read(self._pressure).split('\n', 1)[0]   # "some avg10=… avg60=… avg300=… total=…"
+        fields = dict(item.split('=') for item in line.split()[1:])
+        now, total = time.monotonic(), int(fields['total'])
+        last = self._psi_last
+        if last is not None and now - last[0] < PSI_MIN_WINDOW_S:
+            # Leituras muito próximas: o contador ainda não diz nada, repete o último valor
+            return self._psi_value if self._psi_value is not None else float(fields['avg10'])
+        self._psi_last = (now, total)
+        if last is not None and now - last[0] <= PSI_MAX_WINDOW_S:
+            self._psi_value = min(100.0, (total - last[1]) / ((now - last[0]) * 1e6) * 100.0)
+        else:
+            self._psi_value = float(fields['avg10'])
+        return self._psi_value
+
+    def _mem_available(self):
+        total = available = None
+        for line in _read(self._meminfo).splitlines():
+            if line.startswith('MemTotal:'):
+                total = int(line.split()[1])
+            elif line.startswith('MemAvailable:'):
+                available = int(line.split()[1])
+                break
+        return available / total if total and available is not None else None
+
+    def sample(self):
+        load = pressure = memory = None
+        try:
+            if self._loadavg is not None:
+                load = float(_read(self._loadavg).split()[0]) / self.cpus
+            if self._pressure is not None:
+                pressure = self._cpu_pressure()
+            if self._meminfo is not None:
+                memory = self._mem_available()
+        except (OSError, ValueError, KeyError):
+            pass
+        return LoadSample(load, pressure, memory)
+
+    def busy_reasons(self, sample=None):
+        """Motivos para não assustar agora (lista vazia = há folga)."""
+        sample = self.sample() if sample is None else sample
+        reasons = []
+        if sample.load_per_cpu is not None and sample.load_per_cpu > LOAD_PER_CPU_MAX:
+            reasons.append(f"carga {sample.load_per_cpu:.2f}/CPU")
+        if sample.cpu_pressure is not None and sample.cpu_pressure > CPU_PRESSURE_MAX:
+            reasons.append(f"pressão de CPU {sample.cpu_pressure:.0f}%")
+        if sample.mem_available is not None and sample.mem_available < MEM_AVAILABLE_MIN:
+            reasons.append(f"só {sample.mem_available * 100:.1f}% de memória livre")
+        return reasons
+
+    def close(self):
+        for fd in (self._loadavg, self._pressure, self._meminfo):
+            if fd is not None:
+                os.close(fd)
+        self._loadavg = self._pressure = self._meminfo = None
+
+
+if __name__ == '__main__':
+    load = SystemLoad()
+    load.sample()
+    rounds = 2000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        sample = load.sample()
+    cost_us = (time.perf_counter() - start) * 1e6 / rounds
+    print(f"{sample} | {cost_us:.1f} µs por amostra")
+    print("ocupada: " + ('; '.join(load.busy_reasons(sample)) or 'não'))
+    load.close()
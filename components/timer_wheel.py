@@ -0,0 +1,367 @@
+"""Agenda de sustos em roda de timers hierárquica (um QTimer para tudo).
+
+Cada controller tinha o seu QTimer; com dezenas de agendas no mesmo
+processo (por personagem, por tela) são dezenas de timers do Qt acordando
+cada um na sua hora. Aqui todas as agendas moram numa roda:
+
+- o tempo anda em ticks (1 ms por padrão) e cada nível da roda tem 256
+  posições; o nível 0 cobre 256 ticks, o nível 1 cobre 256 × 256 e assim
+  por diante (4 níveis ≈ 49 dias);
+- agendar é calcular o nível e a posição e pôr num dict: O(1); cancelar é
+  tirar do dict: O(1);
+- quando o tick chega no começo de uma posição de um nível alto, as
+  entradas dela descem para os níveis de baixo (cascata);
+- uma máscara de bits por nível diz quais posições têm algo, então achar
+  o próximo evento é um `>>` e um `&` num int, e um único QTimer dorme até
+  lá.
+
+`WheelTimer` imita o pedaço do QTimer que o JumpscareController usa
+(`timeout`, `start`, `stop`, `isActive`, `setTimerType`), então dá para
+trocar um pelo outro.
+
+Benchmark contra um QTimer por agenda (Coarse, o padrão, e Precise):
+    python -m components.timer_wheel [agendas]
+"""
+
+import itertools
+import math
+import random
+import sys
+import time
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+TICK_MS = 1.0
+SLOT_BITS = 8
+LEVELS = 4
+
+
+class _Entry:
+    __slots__ = ('key', 'due', 'interval', 'callback', 'level', 'slot')
+
+    def __init__(self, key, due, interval, callback):
+        self.key = key
+        self.due = due
+        self.interval = interval
+        self.callback = callback
+        self.level = None
+        self.slot = None
+
+    @property
+    def active(self):
+        return self.level is not None
+
+
+class TimerWheel:
+    """A roda em si, sem Qt: quem chama decide quando `advance` roda."""
+
+    def __init__(self, tick_ms=TICK_MS, slot_bits=SLOT_BITS, levels=LEVELS, clock=time.monotonic):
+        self.tick_ms = tick_ms
+        self.clock = clock
+        self.bits = slot_bits
+        self.mask = (1 << slot_bits) - 1
+        self.levels = levels
+        self.slots = [[{} for _ in range(1 << slot_bits)] for _ in range(levels)]
+        self.occupied = [0] * levels          # bit s ligado = posição s do nível tem entradas
+        self.overflow = {}                    # além do último nível (raro)
+        self.tick = self.now_tick()           # último tick já processado
+        self._keys = itertools.count()
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def now_tick(self):
+        return int(self.clock() * 1000.0 / self.tick_ms)
+
+    def ticks(self, ms):
+        return max(1, math.ceil(ms / self.tick_ms))
+
+    def schedule(self, delay_ms, callback, interval_ms=None):
+        """Chama `callback` daqui a `delay_ms` (e depois a cada `interval_ms`, se dado)."""
+        due = self.now_tick() + self.ticks(delay_ms)
+        entry = _Entry(next(self._keys), due, self.ticks(interval_ms) if interval_ms else None, callback)
+        self._place(entry)
+        self._count += 1
+        return entry
+
+    def cancel(self, entry):
+        if not entry.active:
+            return
+        if entry.level == self.levels:
+            del self.overflow[entry.key]
+        else:
+            slot = self.slots[entry.level][entry.slot]
+            del slot[entry.key]
+            if not slot:
+                self.occupied[entry.level] &= ~(1 << entry.slot)
+        entry.level = entry.slot = None
+        self._count -= 1
+
+    def _place(self, entry):
+        due = max(entry.due, self.tick + 1)
+        diff = due ^ self.tick
+        for level in range(self.levels):
+            # Nível certo: o mais baixo em que o prazo e o tick atual só diferem dali para baixo
+            if diff >> (self.bits * (level + 1)) == 0:
+                slot = (due >> (self.bits * level)) & self.mask
+                self.slots[level][slot][entry.key] = entry
+                self.occupied[level] |= 1 << slot
+                entry.level, entry.slot = level, slot
+                return
+        self.overflow[entry.key] = entry
+        entry.level, entry.slot = self.levels, None
+
+    def next_tick(self):
+        """Próximo tick em que algo acontece (disparo ou cascata), ou None se a roda está vazia."""
+        for level in range(self.levels):
+            shift = self.bits * level
+            digit = (self.tick >> shift) & self.mask
+            ahead = self.occupied[level] >> (digit + 1)
+            if ahead:
+                slot = digit + (ahead & -ahead).bit_length()
+                block = (self.tick >> (shift + self.bits)) << (shift + self.bits)
+                return block | (slot << shift)
+        if self.overflow:
+            span = self.bits * self.levels
+            return ((self.tick >> span) + 1) << span
+        return None
+
+    def next_delay_ms(self):
+        tick = self.next_tick()
+        if tick is None:
+            return None
+        return max(0.0, tick * self.tick_ms - self.clock() * 1000.0)
+
+    def advance(self, to_tick=None):
+        """Processa tudo que venceu até `to_tick` (padrão: agora). Retorna quantos dispararam."""
+        to_tick = self.now_tick() if to_tick is None else to_tick
+        fired = 0
+        while True:
+            tick = self.next_tick()
+            if tick is None or tick > to_tick:
+                self.tick = max(self.tick, to_tick)
+                return fired
+            self.tick = tick
+            fired += self._process(tick)
+
+    def _process(self, tick):
+        # Quem vence exatamente no começo de uma posição de nível alto sai da cascata
+        # direto para cá (re-colocado, iria para tick + 1 e dispararia atrasado)
+        due = []
+        span = self.bits * self.levels
+        if self.overflow and tick & ((1 << span) - 1) == 0:
+            entries, self.overflow = self.overflow, {}
+            self._redistribute(entries, tick, due)
+        for level in range(self.levels - 1, 0, -1):
+            shift = self.bits * level
+            if tick & ((1 << shift) - 1) == 0:
+                slot = (tick >> shift) & self.mask
+                if self.occupied[level] >> slot & 1:
+                    entries = self.slots[level][slot]
+                    self.slots[level][slot] = {}
+                    self.occupied[level] &= ~(1 << slot)
+                    self._redistribute(entries, tick, due)
+
+        slot = tick & self.mask
+        if self.occupied[0] >> slot & 1:
+            due.extend(self.slots[0][slot].values())
+            self.slots[0][slot] = {}
+            self.occupied[0] &= ~(1 << slot)
+        for entry in due:
+            entry.level = entry.slot = None
+            if entry.interval:
+                # Periódico: conta do prazo anterior (não acumula atraso); voltas perdidas são puladas
+                entry.due += ((tick - entry.due) // entry.interval + 1) * entry.interval
+                self._place(entry)
+            else:
+                self._count -= 1
+        for entry in due:
+            entry.callback()
+        return len(due)
+
+    def _redistribute(self, entries, tick, due):
+        for entry in entries.values():
+            if entry.due <= tick:
+                due.append(entry)
+            else:
+                self._place(entry)
+
+
+class WheelScheduler(QObject):
+    """Roda de timers dirigida por um único QTimer que dorme até o próximo evento."""
+
+    def __init__(self, tick_ms=TICK_MS, parent=None):
+        super().__init__(parent)
+        self.wheel = TimerWheel(tick_ms)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._run)
+        self._wake_tick = None
+
+    def call_later(self, delay_ms, callback, interval_ms=None):
+        entry = self.wheel.schedule(delay_ms, callback, interval_ms)
+        if self._wake_tick is None or entry.due < self._wake_tick:
+            self._rearm()
+        return entry
+
+    def cancel(self, entry):
+        # O QTimer pode acordar à toa depois; é barato e evita recalcular aqui
+        self.wheel.cancel(entry)
+
+    def timer(self):
+        return WheelTimer(self)
+
+    def _run(self):
+        self._wake_tick = None
+        self.wheel.advance()
+        self._rearm()
+
+    def _rearm(self):
+        tick = self.wheel.next_tick()
+        if tick is None:
+            self._timer.stop()
+            self._wake_tick = None
+            return
+        self._wake_tick = tick
+        # Arredonda para cima: acordar antes do tick virar só faria girar em falso
+        delay = tick * self.wheel.tick_ms - self.wheel.clock() * 1000.0
+        self._timer.start(max(0, math.ceil(delay)))
+
+
+class WheelTimer(QObject):
+    """Substituto do QTimer que agenda na roda em vez de criar um timer do sistema."""
+
+    timeout = pyqtSignal()
+
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self._interval = 0
+        self._single_shot = False
+        self._timer_type = Qt.CoarseTimer
+        self._entry = None
+
+    def setInterval(self, ms):
+        self._interval = ms
+
+    def interval(self):
+        return self._interval
+
+    def setSingleShot(self, single_shot):
+        self._single_shot = single_shot
+
+    def setTimerType(self, timer_type):
+        """PreciseTimer e CoarseTimer dão no mesmo (a roda anda em ticks de 1 ms).
+
+        VeryCoarseTimer, como no Qt, arredonda o intervalo para segundos inteiros; aqui o
+        disparo também cai no segundo cheio do relógio da roda, então agendas em modo
+        economia acordam juntas.
+        """
+        self._timer_type = timer_type
+
+    def timerType(self):
+        return self._timer_type
+
+    def isActive(self):
+        return self._entry is not None and self._entry.active
+
+    def start(self, ms=None):
+        if ms is not None:
+            self._interval = ms
+        self.stop()
+        interval = delay = self._interval
+        if self._timer_type == Qt.VeryCoarseTimer:
+            interval = max(1000, round(interval / 1000.0) * 1000)
+            now_ms = self.scheduler.wheel.clock() * 1000.0
+            delay = math.ceil((now_ms + interval) / 1000.0) * 1000 - now_ms
+        self._entry = self.scheduler.call_later(delay, self._fire, None if self._single_shot else interval)
+
+    def stop(self):
+        if self._entry is not None:
+            self.scheduler.cancel(self._entry)
+            self._entry = None
+
+    def _fire(self):
+        if self._single_shot:
+            self._entry = None
+        self.timeout.emit()
+
+
+def _lateness_report(label, lateness, cpu_s, wall_s, fired):
+    lateness.sort()
+    p = lambda q: lateness[min(len(lateness) - 1, int(q * len(lateness)))] if lateness else 0.0
+    print(f"{label:22} {fired:7d} disparos | CPU {cpu_s * 1000.0 / wall_s:5.1f} ms/s | "
+          f"atraso p50 {p(0.5):6.2f} ms  p99 {p(0.99):6.2f} ms  máx {p(1.0):6.2f} ms")
+
+
+def benchmark(count=2000, seconds=3.0):
+    from PyQt5.QtCore import QCoreApplication
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    rng = random.Random(1)
+    intervals = [rng.randint(20, 500) for _ in range(count)]
+
+    def run(make_timer):
+        lateness = []
+        timers = []
+        for interval in intervals:
+            timer = make_timer()
+            state = {'n': 0}
+
+            def fire(interval=interval, state=state):
+                state['n'] += 1
+                lateness.append((time.monotonic() - state['start']) * 1000.0 - interval * state['n'])
+
+            timer.timeout.connect(fire)
+            state['start'] = time.monotonic()
+            timer.start(interval)
+            timers.append(timer)
+        cpu = time.process_time()
+        QTimer.singleShot(int(seconds * 1000), app.quit)
+        app.exec_()
+        cpu = time.process_time() - cpu
+        for timer in timers:
+            timer.stop()
+        return lateness, cpu
+
+    def precise_timer():
+        timer = QTimer()
+        timer.setTimerType(Qt.PreciseTimer)
+        return timer
+
+    # O padrão do QTimer é CoarseTimer (até 5% de folga); a roda usa um PreciseTimer
+    lateness, cpu = run(QTimer)
+    _lateness_report(f"{count} QTimers", lateness, cpu, seconds, len(lateness))
+    lateness, cpu = run(precise_timer)
+    _lateness_report(f"{count} QTimers precisos", lateness, cpu, seconds, len(lateness))
+    scheduler = WheelScheduler()
+    lateness, cpu = run(scheduler.timer)
+    _lateness_report(f"roda ({count} agendas)", lateness, cpu, seconds, len(lateness))
+
+    # Custo puro de agendar/cancelar (sem event loop)
+    n = 100000
+    wheel = TimerWheel()
+    noop = lambda: None
+    start = time.perf_counter()
+    entries = [wheel.schedule(rng.uniform(1, 600000), noop) for _ in range(n)]
+    insert_us = (time.perf_counter() - start) * 1e6 / n
+    start = time.perf_counter()
+    for entry in entries:
+        wheel.cancel(entry)
+    cancel_us = (time.perf_counter() - start) * 1e6 / n
+    start = time.perf_counter()
+    timers = []
+    for _ in range(n // 10):
+        timer = QTimer()
+        timer.start(rng.randint(1, 600000))
+        timers.append(timer)
+    for timer in timers:
+        timer.stop()
+    qtimer_us = (time.perf_counter() - start) * 1e6 / (n // 10)
+    print(f"roda: agendar {insert_us:.2f} µs, cancelar {cancel_us:.2f} µs | "
+          f"QTimer criar+start+stop {qtimer_us:.2f} µs")
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,461 @@
+"""API local (HTTP + WebSocket) para controlar um monitor em execução.
+
+O servidor roda num event loop asyncio numa thread própria, então ler e
+responder conexões nunca bloqueia a GUI. Cada comando atravessa para a
+thread do Qt por um sinal (conexão enfileirada) e a resposta volta para o
+asyncio com `call_soon_threadsafe`. Sustos pedidos enquanto outro está na
+tela entram na fila do JumpscareController.
+
+Só escuta em 127.0.0.1 e, contra páginas abertas no navegador (DNS
+rebinding, formulários de outros sites), recusa com 403 o Host que não for
+localhost/127.0.0.1 e qualquer cabeçalho Origin; POST exige
+`Content-Type: application/json`, que o navegador não manda sem preflight.
+Endpoints:
+    POST /trigger                      -> {"ok": true, "queued": 0}
+    POST /arm | POST /disarm
+    POST /set-probability {"probability": 0.05}   (ou ?value=0.05)
+    GET  /status | GET /metrics
+    POST /profile                      -> grava o profiler agora (só com --profile)
+    GET  /ws   (WebSocket: mensagens {"cmd": "trigger"}, {"cmd": "set-probability", "value": 0.1}, ...)
+
+Teste de carga (servidor + ponte Qt reais, offscreen):
+    python -m components.trigger_api --load-test 2000 --concurrency 50
+Por padrão o alvo é um dublê do controller (`--scare-ms` simula a duração
+do susto): os números medem o caminho HTTP -> thread do Qt -> resposta, não
+o susto. `--controller` usa um JumpscareController de verdade (GIF padrão
+ou `--gif`), com a fila real: cada susto dura o GIF inteiro, então quase
+todas as requisições de uma rajada voltam 429 (fila cheia) e a latência
+inclui a espera na fila.
+"""
+
+import asyncio
+import base64
+import collections
+import hashlib
+import json
+import struct
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from . import metrics, profiler
+
+DEFAULT_PORT = 8765
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+MAX_BODY = 64 * 1024
+CALL_TIMEOUT_S = 5.0   # a thread do Qt travada não pode segurar as conexões para sempre
+COMMANDS = ('trigger', 'arm', 'disarm', 'set-probability', 'status', 'profile')
+
+ALLOWED_HOSTS = ('localhost', '127.0.0.1')
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+               409: 'Conflict', 413: 'Payload Too Large', 415: 'Unsupported Media Type',
+               429: 'Too Many Requests', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class ControlBridge(QObject):
+    """Vive na thread do Qt e executa os comandos no controller."""
+
+    command = pyqtSignal(str, object, object)  # nome, argumento, callback(resultado)
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.command.connect(self._run)
+
+    @pyqtSlot(str, object, object)
+    def _run(self, name, arg, reply):
+        try:
+            if name == 'trigger':
+                queued = self.controller.request_scare(arg)
+                result = (429, {'ok': False, 'error': 'fila cheia'}) if queued < 0 else (200, {'ok': True, 'queued': queued})
+            elif name == 'arm':
+                self.controller.arm()
+                result = (200, {'ok': True})
+            elif name == 'disarm':
+                self.controller.disarm()
+                result = (200, {'ok': True})
+            elif name == 'set-probability':
+                self.controller.set_probability(arg)
+                result = (200, {'ok': True, 'probability': self.controller.probability})
+            else:
+                result = (200, dict(self.controller.status(), ok=True))
+        except (TypeError, ValueError) as e:
+            result = (400, {'ok': False, 'error': str(e)})
+        except Exception as e:
+            # Um slot que levanta exceção deixaria o cliente esperando a resposta
+            print(f"[API] Erro em '{name}': {e!r}")
+            result = (500, {'ok': False, 'error': f"erro interno: {e}"})
+        reply(result)
+
+
+class TriggerServer:
+    """Servidor asyncio numa thread de fundo."""
+
+    def __init__(self, bridge, host='127.0.0.1', port=DEFAULT_PORT):
+        self.bridge = bridge
+        self.host = host
+        self.port = port
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        """Sobe o servidor; levanta OSError se a porta não puder ser aberta."""
+        self._thread = threading.Thread(target=self._serve, name='trigger-api', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(5.0):
+            raise OSError(f"API não subiu em {self.host}:{self.port}")
+        if self._error is not None:
+            self._thread.join(1.0)
+            self._thread = None
+            raise OSError(f"API não pôde ouvir em {self.host}:{self.port}: {self._error}")
+        print(f"[API] Ouvindo em http://{self.host}:{self.port}")
+
+    def stop(self):
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(2.0)
+        self.loop = None
+
+    def _serve(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            # Volta para start(), que está esperando na outra thread
+            self._error = e
+            self.loop.close()
+            self.loop = None
+            self._ready.set()
+            return
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+
+    async def _call(self, name, arg=None):
+        """Executa o comando na thread do Qt e espera o resultado sem bloquear o loop."""
+        future = self.loop.create_future()
+        loop = self.loop
+
+        def reply(result):
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(result))
+
+        self.bridge.command.emit(name, arg, reply)
+        try:
+            return await asyncio.wait_for(future, CALL_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            return 503, {'ok': False, 'error': "a interface não respondeu a tempo"}
+
+    async def _dispatch(self, name, arg):
+        if name not in COMMANDS:
+            return 404, {'ok': False, 'error': f"comando desconhecido: {name}"}
+        if name == 'profile':
+            # Não passa pelo Qt: o profiler tem thread própria, e gravar fica fora do event loop
+            active = profiler.active()
+            if active is None:
+                return 409, {'ok': False, 'error': "profiler desligado (use --profile)"}
+            path, samples = await asyncio.get_running_loop().run_in_executor(None, active.dump)
+            return 200, {'ok': True, 'path': path, 'samples': samples}
+        if name == 'trigger':
+            arg = time.perf_counter()
+        elif name == 'set-probability':
+            try:
+                arg = float(arg)
+            except (TypeError, ValueError):
+                return 400, {'ok': False, 'error': "probability inválida"}
+        return await self._call(name, arg)
+
+    # --- HTTP ---
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, _ = line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    await self._respond(writer, 400, {'ok': False, 'error': "requisição inválida"}, False)
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = header.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                refused = _refuse(headers)
+                if refused:
+                    await self._respond(writer, 403, {'ok': False, 'error': refused}, False)
+                    break
+
+                url = urlsplit(target)
+                if url.path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                    await self._websocket(reader, writer, headers)
+                    break
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {'ok': False, 'error': "Content-Length inválido"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {'ok': False, 'error': "corpo grande demais"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+                if method == 'POST' and content_type != 'application/json':
+                    status, payload = 415, {'ok': False, 'error': "use Content-Type: application/json"}
+                else:
+                    status, payload = await self._route(method, url, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, url, body):
+        name = url.path.strip('/')
+        if method == 'GET' and name == 'metrics':
+            return 200, metrics.snapshot()
+        if method == 'GET' and name == 'status':
+            return await self._dispatch('status', None)
+        if method != 'POST':
+            return 405, {'ok': False, 'error': "use POST"}
+        arg = None
+        if name == 'set-probability':
+            query = parse_qs(url.query)
+            arg = query.get('value', query.get('probability', [None]))[0]
+            if body:
+                try:
+                    arg = json.loads(body).get('probability', arg)
+                except (ValueError, AttributeError):
+                    return 400, {'ok': False, 'error': "JSON inválido"}
+        return await self._dispatch(name, arg)
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    # --- WebSocket (RFC 6455, só texto) ---
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get('sec-websocket-key', '')
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+        while True:
+            opcode, payload = await _ws_read(reader)
+            if opcode == 0x8:  # close
+                writer.write(_ws_frame(b'', 0x8))
+                await writer.drain()
+                return
+            if opcode == 0x9:  # ping
+                writer.write(_ws_frame(payload, 0xA))
+                await writer.drain()
+                continue
+            if opcode != 0x1:
+                continue
+            try:
+                message = json.loads(payload)
+                status, result = await self._dispatch(message.get('cmd', ''), message.get('value'))
+            except (ValueError, AttributeError):
+                status, result = 400, {'ok': False, 'error': "JSON inválido"}
+            writer.write(_ws_frame(json.dumps(dict(result, status=status)).encode('utf-8')))
+            await writer.drain()
+
+
+def _refuse(headers):
+    """Motivo para recusar a requisição (Host estranho ou vinda de navegador), ou None."""
+    host = headers.get('host', '')
+    if host.startswith('['):
+        host = host[:host.find(']') + 1]
+    else:
+        host = host.rpartition(':')[0] if ':' in host else host
+    if host.lower() not in ALLOWED_HOSTS:
+        return "Host não permitido"
+    if 'origin' in headers:
+        return "requisições de navegador não são aceitas"
+    return None
+
+
+async def _ws_read(reader):
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack('>H', await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack('>Q', await reader.readexactly(8))
+    if length > MAX_BODY:
+        raise ConnectionError("mensagem WebSocket grande demais")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+def _ws_frame(payload, opcode=0x1):
+    length = len(payload)
+    if length < 126:
+        head = struct.pack('>BB', 0x80 | opcode, length)
+    elif length < 65536:
+        head = struct.pack('>BBH', 0x80 | opcode, 126, length)
+    else:
+        head = struct.pack('>BBQ', 0x80 | opcode, 127, length)
+    return head + payload
+
+
+# --- Teste de carga ---
+
+class _LoadTestTarget:
+    """Faz o papel do controller: cada susto "dura" `scare_ms` na thread do Qt."""
+
+    def __init__(self, scare_ms=0, max_queued=8):
+        from PyQt5.QtCore import QTimer
+        self.QTimer = QTimer
+        self.scare_ms = scare_ms
+        self.scare_active = False
+        self.queued = collections.deque(maxlen=max_queued)
+        self.probability = 0.0
+        self.scares = 0
+
+    def request_scare(self, requested_at):
+        if self.scare_active:
+            if len(self.queued) == self.queued.maxlen:
+                return -1
+            self.queued.append(requested_at)
+            return len(self.queued)
+        self._start(requested_at)
+        return 0
+
+    def _start(self, requested_at):
+        self.scare_active = True
+        self.scares += 1
+        metrics.record('api.trigger_latency_ms', (time.perf_counter() - requested_at) * 1000.0)
+        self.QTimer.singleShot(self.scare_ms, self._finish)
+
+    def _finish(self):
+        self.scare_active = False
+        if self.queued:
+            self._start(self.queued.popleft())
+
+    def arm(self):
+        pass
+
+    def disarm(self):
+        pass
+
+    def set_probability(self, value):
+        self.probability = value
+
+    def status(self):
+        return {'scares': self.scares, 'queued': len(self.queued)}
+
+
+async def _load_client(port, requests, concurrency):
+    latencies = []
+    rejected = []
+    counter = iter(range(requests))
+
+    async def worker():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        request = (b"POST /trigger HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                   b"Content-Length: 0\r\n\r\n")
+        for _ in counter:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            length = 0
+            if b' 429 ' in await reader.readline():
+                rejected.append(1)
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, len(rejected), time.perf_counter() - start
+
+
+def load_test(requests=2000, concurrency=50, scare_ms=0, controller=False, gif=None):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    if controller:
+        from .jumpscare import GIF_PATH, JumpscareController
+        target = JumpscareController(gif or GIF_PATH, 'none', probability=0.0, interval_seconds=3600)
+        print(f"[API] Alvo: JumpscareController ({len(target.frames)} quadros, "
+              f"{target.frames.duration if len(target.frames) else 0} ms por susto)")
+    else:
+        target = _LoadTestTarget(scare_ms)
+    bridge = ControlBridge(target)
+    server = TriggerServer(bridge, port=0)
+    server.start()
+    result = {}
+
+    def client():
+        result['latencies'], result['rejected'], result['elapsed'] = asyncio.run(
+            _load_client(server.port, requests, concurrency))
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    # Sai quando o cliente terminou e a fila de sustos esvaziou
+    poll = QTimer()
+    poll.timeout.connect(lambda: app.quit() if not thread.is_alive() and not target.status()['queued']
+                         and not target.scare_active else None)
+    poll.start(10)
+    app.exec_()
+    server.stop()
+
+    latencies = sorted(result['latencies'])
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(f"{len(latencies)} requisições, {concurrency} conexões: {len(latencies) / result['elapsed']:.0f} req/s | "
+          f"resposta p50 {p(0.5):.2f} ms p99 {p(0.99):.2f} ms | {result['rejected']} recusada(s) com a fila cheia")
+    print(metrics.summary('api.trigger_latency_ms') + " (requisição -> susto na tela, inclui a fila)")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Teste de carga da API de sustos")
+    parser.add_argument('--load-test', type=int, default=2000, metavar='N')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--scare-ms', type=int, default=0, help="duração simulada de cada susto")
+    parser.add_argument('--controller', action='store_true', help="usa um JumpscareController de verdade")
+    parser.add_argument('--gif', help="GIF do controller (com --controller)")
+    args = parser.parse_args()
+    load_test(args.load_test, args.concurrency, args.scare_ms, args.controller, args.gif)
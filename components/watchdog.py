@@ -0,0 +1,127 @@
+"""Detector de travamentos do event loop.
+
+Se algo segura a thread da GUI (decodificação lenta, backend de mídia
+engasgando, print bloqueado num stdout morto), o susto perde o tempo sem
+avisar ninguém. O watchdog tem duas partes:
+
+- um QTimer de batimento (50 ms) na thread da GUI: cada batimento registra
+  quanto atrasou em `loop.lag_ms` e, se o loop tinha parado, a duração da
+  parada em `loop.stall_ms`;
+- uma thread auxiliar que acorda a cada batimento e, quando o último
+  batimento passou do limite (`STALL_MS`), imprime no stderr a pilha da
+  thread da GUI naquele momento (`sys._current_frames`), uma vez por parada.
+
+Para travamentos em código C que não solta o GIL (a thread auxiliar nem
+roda), o `faulthandler` fica armado com `HANG_S` e é rearmado pelos
+batimentos (a cada meio `HANG_S`, porque rearmar recria a thread dele): se o
+loop ficar parado entre meio e um `HANG_S`, a pilha de todas as threads
+sai no stderr.
+
+Os atrasos dos timers (`timer.check_late_ms` do sorteio e
+`timer.frame_late_ms` dos quadros) são medidos onde os timers vivem; todas
+as séries aparecem no `/metrics` da API.
+
+Checagem headless (trava o loop de propósito):
+    QT_QPA_PLATFORM=offscreen python -m components.watchdog
+"""
+
+import faulthandler
+import sys
+import threading
+import time
+import traceback
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+from . import metrics
+
+HEARTBEAT_MS = 50
+STALL_MS = 200
+HANG_S = 10.0
+
+
+class LoopWatchdog(QObject):
+    def __init__(self, stall_ms=STALL_MS, heartbeat_ms=HEARTBEAT_MS, hang_s=HANG_S, parent=None):
+        super().__init__(parent)
+        self.stall_ms = stall_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.hang_s = hang_s
+        self.stalls = 0
+        self._gui_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._reported = False
+        self._armed_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._beat)
+
+    def start(self):
+        self._last_beat = time.monotonic()
+        self._timer.start(self.heartbeat_ms)
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+        self._arm_faulthandler(self._last_beat)
+        print(f"[WATCHDOG] Vigiando o event loop (paradas acima de {self.stall_ms} ms)")
+
+    def stop(self):
+        self._timer.stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        if self.hang_s:
+            faulthandler.cancel_dump_traceback_later()
+
+    def _beat(self):
+        now = time.monotonic()
+        gap_ms = (now - self._last_beat) * 1000.0
+        self._last_beat = now
+        metrics.record('loop.lag_ms', max(0.0, gap_ms - self.heartbeat_ms))
+        if gap_ms > self.stall_ms:
+            self.stalls += 1
+            metrics.record('loop.stall_ms', gap_ms)
+            print(f"[WATCHDOG] Event loop ficou parado {gap_ms:.0f} ms", file=sys.stderr)
+        self._reported = False
+        if now - self._armed_at > self.hang_s / 2:
+            self._arm_faulthandler(now)
+
+    def _arm_faulthandler(self, now):
+        if self.hang_s:
+            self._armed_at = now
+            faulthandler.dump_traceback_later(self.hang_s, repeat=True, file=sys.stderr)
+
+    def _watch(self):
+        while not self._stop.wait(self.heartbeat_ms / 1000.0):
+            stalled_ms = (time.monotonic() - self._last_beat) * 1000.0
+            if stalled_ms <= self.stall_ms or self._reported:
+                continue
+            self._reported = True
+            frame = sys._current_frames().get(self._gui_thread)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '(sem pilha)\n'
+            sys.stderr.write(f"[WATCHDOG] Event loop parado há {stalled_ms:.0f} ms; thread da GUI em:\n{stack}")
+            sys.stderr.flush()
+
+
+def _selfcheck():
+    from PyQt5.QtCore import QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    watchdog = LoopWatchdog(hang_s=0)
+    watchdog.start()
+
+    def blocking_work():
+        time.sleep(0.5)  # simula uma decodificação travando a GUI
+
+    QTimer.singleShot(300, blocking_work)
+    QTimer.singleShot(1200, app.quit)
+    app.exec_()
+    watchdog.stop()
+    print(metrics.summary('loop.lag_ms'))
+    print(metrics.summary('loop.stall_ms'))
+    return watchdog.stalls == 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(0 if _selfcheck() else 1)
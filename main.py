@@ -2,99 +2,239 @@
 import sys
 import os
 import subprocess
-from PyQt5 import QtWidgets, QtGui, QtCore, QtMultimedia
+from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtMultimedia import QSoundEffect
 from ui_untitled import Ui_JumpscareSim
 from components.jumpscare import run_continuous
+from components.frames import FrameCanvas, FramePlayer, load_frames
+from components.music import StreamingMusic
+from components.catalog import PACKS_DIR, SUSTOS, load_catalog
+from components.catalog_watch import CatalogWatcher
+from components.catalog_view import CatalogModel, CatalogView
+from components.search import SearchIndex
+from components.power import PowerMonitor
+
+try:
+	from components.mixer import Mixer
+except ImportError:  # NumPy não instalado: volta para o QSoundEffect
+	Mixer = None
 
 
 GIF_MENU = 'assets/FNAF_static.gif'  # Coloque seu GIF de menu aqui
 MUSIC_MENU = 'assets/audios/menu.wav'  # Coloque sua música de menu aqui
 
-SUSTOS = {
-	'Chica': {
-		'gif': os.path.join('assets/video_jumpscare', 'Withered_Chica.gif'),
-		'sound': os.path.join('assets/audios', 'jumpscare_fnaf2.wav')
-	},
-	'rat': {
-		'gif': os.path.join('assets/video_jumpscare', 'Monster_Rat.gif'),
-		'sound': os.path.join('assets/audios', 'rat_sound.wav')
-	},
-	'Mangle': {
-		'gif': os.path.join('assets/video_jumpscare', 'Mangle.gif'),
-		'sound': os.path.join('assets/audios', 'jumpscare_fnaf2.wav')
-	},
-	'Vinnie': {
-		'gif': os.path.join('assets/video_jumpscare','Vinnie.gif'),
-		'sound': os.path.join('assets/audios', 'Vinnie.wav')
-	}
-}
-
-
 class MainWindow(QtWidgets.QMainWindow, Ui_JumpscareSim):
 	def __init__(self):
 		super().__init__()
 		self.setupUi(self)
 		# Tamanho fixo da janela (igual ao do .ui)
 		self.setFixedSize(784, 431)
-
-		# Adiciona GIF animado no label
-		self.movie = QtGui.QMovie(GIF_MENU)
-		self.label.setMovie(self.movie)
-		self.movie.start()
-
-		# Música de fundo
-		self.player = QtMultimedia.QMediaPlayer()
-		url = QtCore.QUrl.fromLocalFile(os.path.abspath(MUSIC_MENU))
-		self.player.setMedia(QtMultimedia.QMediaContent(url))
-		self.player.setVolume(50)
-		self.player.play()
-
-		# Conecta botões
-		self.pushButton.clicked.connect(lambda: self.start_jumpscare('Chica'))
-		self.pushButton_2.clicked.connect(lambda: self.start_jumpscare('rat'))
-		self.pushButton_3.clicked.connect(lambda: self.start_jumpscare('Mangle'))
-		self.pushButton_5.clicked.connect(lambda: self.start_jumpscare('Vinnie'))
-		# self.pushButton_2.clicked.connect(lambda: self.start_jumpscare('foxy'))
-
-		self.select_sound = QSoundEffect()
-		self.select_sound.setSource(QtCore.QUrl.fromLocalFile(os.path.abspath('assets/audios/select.wav')))
-		self.select_sound.setVolume(0.5)
-
+		# Personagens de assets/ + pacotes .jspk da pasta packs/
+		self.catalog = load_catalog()
+
+		# GIF animado de fundo (mesmo decodificador e relógio do modo jumpscare)
+		self.background = FrameCanvas(self.widget)
+		self.background.setGeometry(self.label.geometry())
+		self.background.stackUnder(self.label)
+		self.background_player = FramePlayer(load_frames(GIF_MENU), self.background, loop=True)
+		self.background_player.start()
+		# Na bateria o fundo fica parado no quadro atual (a animação acordaria a CPU à toa)
+		self.power = PowerMonitor(report_ms=0, parent=self)
+		self.power.changed.connect(self.on_power_changed)
+		self.on_power_changed(self.power.on_battery)
+
+		# Música de fundo (streaming em loop, validada antes de tocar)
+		self.music = None
+		try:
+			self.music = StreamingMusic(MUSIC_MENU, volume=0.5)
+			self.music.play()
+		except (OSError, ValueError) as e:
+			print(f"[MENU] Sem música de fundo: {e}")
+
+		# Grade de personagens no lugar dos botões fixos do .ui
 		for btn in [self.pushButton, self.pushButton_2, self.pushButton_3, self.pushButton_4, self.pushButton_5, self.pushButton_6]:
-			btn.installEventFilter(self)
-
-
-	def eventFilter(self, obj, event):
-		if event.type() == QtCore.QEvent.Enter:
-			if obj in [self.pushButton, self.pushButton_2, self.pushButton_3, self.pushButton_4, self.pushButton_5, self.pushButton_6]:
-				if self.select_sound.isLoaded():
-					self.select_sound.play()
-		return super().eventFilter(obj, event)
+			btn.hide()
+		self.catalog_model = CatalogModel(self.catalog.values(), parent=self)
+		self.catalog_view = CatalogView(self.widget)
+		self.catalog_view.setModel(self.catalog_model)
+		self.catalog_view.setGeometry(QtCore.QRect(60, 75, 690, 355))
+		self.catalog_view.chosen.connect(self.start_jumpscare)
+		self.catalog_view.hovered.connect(self.play_select)
+
+		# Busca por nome, tag ou franquia (índice pronto, consulta a cada tecla)
+		self.search_index = SearchIndex()
+		for entry in self.catalog.values():
+			self.search_index.add_entry(entry)
+		self.search_box = QtWidgets.QLineEdit(self.widget)
+		self.search_box.setGeometry(QtCore.QRect(70, 38, 300, 28))
+		self.search_box.setPlaceholderText("Buscar personagem, tag ou franquia...")
+		self.search_box.setClearButtonEnabled(True)
+		self.search_box.setStyleSheet("QLineEdit { background-color: rgb(0, 0, 0); color: white; border: 1px solid #ffffff; padding: 2px 6px; }")
+		self.search_box.textChanged.connect(self.filter_catalog)
+
+		# Assets e pacotes novos/alterados aparecem sem reiniciar o menu
+		os.makedirs(PACKS_DIR, exist_ok=True)
+		self.watcher = CatalogWatcher(catalog=self.catalog, parent=self)
+		self.watcher.catalogChanged.connect(self.on_catalog_changed)
+
+		# Sons de interface passam pelo mixer (um stream só), se disponível
+		self.mixer = None
+		self.select_sound = None
+		if Mixer is not None:
+			try:
+				self.mixer = Mixer()
+				self.select_samples = self.mixer.load('assets/audios/select.wav')
+				self.mixer.start()
+			except (OSError, ValueError) as e:
+				print(f"[MENU] Mixer desativado: {e}")
+				self.mixer = None
+		if self.mixer is None:
+			self.select_sound = QSoundEffect()
+			self.select_sound.setSource(QtCore.QUrl.fromLocalFile(os.path.abspath('assets/audios/select.wav')))
+			self.select_sound.setVolume(0.5)
+
+	def on_catalog_changed(self, changes):
+		for name in changes['removed']:
+			self.search_index.remove(name)
+		for name in changes['added'] + changes['changed']:
+			self.search_index.add_entry(self.catalog[name])
+		self.catalog_model.update_entries(self.catalog.values(), invalidate=changes['changed'] + changes['removed'])
+		if self.search_box.text().strip():
+			self.filter_catalog(self.search_box.text())
+
+	def on_power_changed(self, on_battery):
+		if on_battery:
+			self.background_player.stop()
+		else:
+			self.background_player.start()
+
+	def filter_catalog(self, text):
+		if not text.strip():
+			self.catalog_model.set_filter(None)
+			return
+		# Só o que cabe na grade; o resto vem quando a rolagem chega ao fim (fetchMore)
+		search = lambda limit: self.search_index.search(text, limit)
+		limit = self.catalog_view.visible_cells()
+		self.catalog_model.set_filter(search(limit), search, limit)
+
+	def play_select(self):
+		if self.mixer is not None:
+			self.mixer.play(self.select_samples, gain=0.5)
+		elif self.select_sound.isLoaded():
+			self.select_sound.play()
 
 	def start_jumpscare(self, tipo):
-		# Para música e fecha menu
-		self.player.stop()
+		# Para música e animação e fecha menu
+		self.background_player.stop()
+		if self.music:
+			self.music.stop()
+		if self.mixer is not None:
+			self.mixer.close()
 		self.close()
 		QtWidgets.QApplication.processEvents()
 		# Inicia o modo jumpscare em um novo processo
-		gif = SUSTOS[tipo]['gif']
-		sound = SUSTOS[tipo]['sound']
 		# Chama o próprio script com argumentos para modo jumpscare
-		args = [sys.executable, sys.argv[0], '--jumpscare', gif, sound]
+		args = [sys.executable, sys.argv[0], '--jumpscare'] + self.catalog[tipo].launch_args()
 		subprocess.Popen(args)
 		# Encerra o app do menu
 		QtWidgets.QApplication.quit()
 
 
 
+def _usage(message):
+	"""Explica a opção errada e sai (código 2, como o argparse)."""
+	print(f"[MONITOR] {message}", file=sys.stderr)
+	print("Uso: main.py --jumpscare [GIF SOM | --pack ARQUIVO.jspk] [--api [--api-port PORTA]]\n"
+		"                          [--fleet-coordinator [PORTA] | --fleet HOST[:PORTA]] [outras opções]",
+		file=sys.stderr)
+	sys.exit(2)
+
+
+def _option_value(name):
+	"""Valor que vem depois de `name` na linha de comando (None se a opção não foi usada)."""
+	if name not in sys.argv:
+		return None
+	i = sys.argv.index(name) + 1
+	if i >= len(sys.argv) or sys.argv[i].startswith('--'):
+		_usage(f"{name} precisa de um valor")
+	return sys.argv[i]
+
+
+def _port(value, option):
+	if not value.isdigit() or not 0 < int(value) < 65536:
+		_usage(f"{option}: porta inválida: {value!r}")
+	return int(value)
+
+
 def main():
+	# --profile (ou JUMPSCARE_PROFILE=arquivo) liga o profiler por amostragem; o
+	# processo --jumpscare herda a variável e grava o próprio arquivo
+	if '--profile' in sys.argv:
+		os.environ.setdefault('JUMPSCARE_PROFILE', '1')
+	from components.profiler import start_from_env
+	start_from_env()
 	# Se for chamado com --jumpscare, roda só o modo jumpscare
 	if len(sys.argv) > 1 and sys.argv[1] == '--jumpscare':
 		from components.jumpscare import run_continuous
-		gif = sys.argv[2] if len(sys.argv) > 2 else SUSTOS['Chica']['gif']
-		sound = sys.argv[3] if len(sys.argv) > 3 else SUSTOS['Chica']['sound']
-		run_continuous(gif_path=gif, sound_path=sound, probability=0.01, interval_seconds=1.0)
+		pack_path = None
+		if len(sys.argv) > 3 and sys.argv[2] == '--pack':
+			# --pack <arquivo.jspk>: GIF e som saem direto do mmap do pacote
+			from components.packs import ScarePack
+			pack_path = sys.argv[3]
+			pack = ScarePack(pack_path)
+			gif = pack.member('gif')
+			sound = pack.member('sound') if pack.has('sound') else None
+		else:
+			gif = sys.argv[2] if len(sys.argv) > 2 else SUSTOS['Chica']['gif']
+			sound = sys.argv[3] if len(sys.argv) > 3 else SUSTOS['Chica']['sound']
+		# --keep-alive mantém a saída de áudio aberta entre os sustos
+		keep_alive = '--keep-alive' in sys.argv
+		# --mixer toca o susto pelo mixer NumPy (um único stream de saída)
+		use_mixer = '--mixer' in sys.argv
+		# --indexed-frames guarda os quadros em 8 bits (bem menos memória)
+		indexed_frames = '--indexed-frames' in sys.argv
+		# --delta-frames deduplica quadros e repinta só o que mudou (requer numpy)
+		delta_frames = '--delta-frames' in sys.argv
+		# --parallel-decode decodifica o GIF em vários processos (requer Pillow e numpy)
+		parallel_decode = '--parallel-decode' in sys.argv
+		# --frame-cache reaproveita quadros já escalados de um cache em disco (requer numpy)
+		frame_cache = '--frame-cache' in sys.argv
+		# --watch recarrega o GIF/som quando os arquivos mudam (sem reiniciar o monitor)
+		watch = '--watch' in sys.argv
+		# --api [--api-port N] abre a API local de disparo (HTTP/WebSocket em 127.0.0.1)
+		api = '--api' in sys.argv
+		api_port = _option_value('--api-port')
+		if api_port is not None:
+			api_port = _port(api_port, '--api-port')
+		# --load-aware adia o susto (ou usa o modo leve) quando a máquina está ocupada
+		load_aware = '--load-aware' in sys.argv
+		# --power-aware: na bateria sorteia com timer grosso e solta os quadros até o próximo susto
+		power_aware = '--power-aware' in sys.argv
+		# --low-memory: entre sustos solta quadros, mídia e janela (voltam antes do próximo)
+		low_memory = '--low-memory' in sys.argv
+		# --watchdog: mede atrasos dos timers e mostra a pilha da GUI quando o loop trava
+		watchdog = '--watchdog' in sys.argv
+		# --fleet-coordinator [PORTA] sorteia e agenda para todos; --fleet HOST[:PORTA] segue o coordenador
+		fleet, fleet_address = None, None
+		if '--fleet-coordinator' in sys.argv:
+			fleet = 'coordinator'
+			i = sys.argv.index('--fleet-coordinator') + 1
+			fleet_address = sys.argv[i] if i < len(sys.argv) and not sys.argv[i].startswith('--') else None
+			if fleet_address is not None:
+				_port(fleet_address, '--fleet-coordinator')
+		elif '--fleet' in sys.argv:
+			fleet, fleet_address = 'client', _option_value('--fleet')
+			host, _, port = fleet_address.partition(':')
+			if not host:
+				_usage(f"--fleet: falta o host em {fleet_address!r}")
+			if port:
+				_port(port, '--fleet')
+		run_continuous(gif_path=gif, sound_path=sound, probability=0.01, interval_seconds=1.0,
+			keep_alive=keep_alive, use_mixer=use_mixer, indexed_frames=indexed_frames,
+			delta_frames=delta_frames, parallel_decode=parallel_decode, frame_cache=frame_cache,
+			watch=watch, pack_path=pack_path, api=api, api_port=api_port,
+			fleet=fleet, fleet_address=fleet_address, load_aware=load_aware,
+			power_aware=power_aware, low_memory=low_memory, watchdog=watchdog)
 		return
 	app = QtWidgets.QApplication(sys.argv)
 	window = MainWindow()
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# Tudo roda sem tela
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    yield app
+
+
+@pytest.fixture
+def repo_root(monkeypatch):
+    """Os caminhos dos assets são relativos à raiz do repositório."""
+    monkeypatch.chdir(ROOT)
+    return ROOT
@@ -0,0 +1,35 @@
+from components import av_clock
+from components.av_clock import SKEW_LIMIT_MS, PresentationClock
+
+
+def test_holds_first_frame_until_audio_starts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(av_clock.time, 'monotonic', lambda: now[0])
+    clock = PresentationClock(lambda: None, start_timeout_ms=250)
+    clock.start()
+    now[0] += 0.2
+    assert clock() == 0.0
+    # Sem áudio depois do timeout: segue pelo relógio monotônico
+    now[0] += 0.1
+    assert abs(clock() - 0.05) < 1e-9
+
+
+def test_follows_audio_and_never_goes_back(monkeypatch):
+    now = [100.0]
+    position = [500.0]
+    monkeypatch.setattr(av_clock.time, 'monotonic', lambda: now[0])
+    clock = PresentationClock(lambda: position[0])
+    clock.start()
+    assert clock() == 0.5
+    now[0] += 0.005
+    before = clock()
+    assert abs(before - 0.505) < 1e-9
+    # O áudio "volta" (bloco reportado atrasado): o relógio fica onde estava
+    position[0] = 490.0
+    assert clock() == before
+
+
+def test_skew_within_bound(qapp):
+    skew = av_clock.measure_skew(duration_s=1.0)
+    assert skew is not None and skew.count > 0
+    assert skew.max <= SKEW_LIMIT_MS
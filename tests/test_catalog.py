@@ -0,0 +1,43 @@
+import os
+
+from components import catalog
+from components.catalog import close_retired, load_catalog, refresh_catalog
+from components.packs import build_pack
+
+
+def _pack(packs_dir, tmp_path, name='Teste'):
+    gif = tmp_path / 'a.gif'
+    gif.write_bytes(b'GIF89a' + bytes(64))
+    path = os.path.join(packs_dir, name + '.jspk')
+    build_pack(path, name, {'gif': str(gif)})
+    return path
+
+
+def test_reload_closes_replaced_pack(tmp_path):
+    packs_dir = str(tmp_path / 'packs')
+    os.makedirs(packs_dir)
+    path = _pack(packs_dir, tmp_path)
+    entries = load_catalog(packs_dir)
+    old = entries['Teste'].pack
+
+    assert refresh_catalog(entries, [path], packs_dir)['changed'] == ['Teste']
+    assert entries['Teste'].pack is not old
+    assert old._map.closed
+    assert old not in catalog._retired
+
+
+def test_pack_in_use_closes_on_a_later_refresh(tmp_path):
+    packs_dir = str(tmp_path / 'packs')
+    os.makedirs(packs_dir)
+    path = _pack(packs_dir, tmp_path)
+    entries = load_catalog(packs_dir)
+    old = entries['Teste'].pack
+    view = entries['Teste'].gif_source()
+
+    os.unlink(path)
+    assert refresh_catalog(entries, [path], packs_dir)['removed'] == ['Teste']
+    assert not old._map.closed
+    assert bytes(view[:6]) == b'GIF89a'
+    del view
+    assert close_retired() == 0
+    assert old._map.closed
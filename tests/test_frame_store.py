@@ -0,0 +1,34 @@
+from PyQt5.QtGui import QColor, QImage
+
+from components.frame_store import IndexedFrameStore
+from components.frames import FrameSequence
+
+
+def _frame(colors, width=37, height=5):
+    image = QImage(width, height, QImage.Format_ARGB32)
+    for x in range(width):
+        color = colors[x % len(colors)]
+        for y in range(height):
+            image.setPixel(x, y, QColor(*color).rgba())
+    return image
+
+
+def _same(a, b):
+    return a.convertToFormat(QImage.Format_ARGB32) == b.convertToFormat(QImage.Format_ARGB32)
+
+
+def test_frames_share_one_palette_when_colors_fit(qapp):
+    frames = FrameSequence([_frame([(i, 0, 0), (0, i, 0), (0, 0, 0, 0)]) for i in range(1, 30)], [40] * 29)
+    store = IndexedFrameStore.from_sequence(frames)
+    assert len(store.palettes) == 1
+    assert all(_same(store.image(i), frames.image(i)) for i in range(len(frames)))
+
+
+def test_falls_back_to_per_frame_palettes(qapp):
+    # Cada quadro com 200 cores diferentes: a união não cabe em 256
+    images = [_frame([(n, i * 40, 0) for n in range(200)], width=200) for i in range(4)]
+    frames = FrameSequence(images, [40] * 4)
+    store = IndexedFrameStore.from_sequence(frames)
+    assert store.memory_report()['argb_frames'] == 0
+    assert len(store.palettes) == 4
+    assert all(_same(store.image(i), frames.image(i)) for i in range(len(frames)))
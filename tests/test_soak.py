@@ -0,0 +1,15 @@
+from components.soak import soak
+
+# Versionado no repositório (o GIF padrão do controller pode não estar)
+GIF = 'assets/video_jumpscare/Springtrap.gif'
+
+
+def test_soak_short_run_has_no_leaks(qapp, repo_root):
+    # Versão curta do `python -m components.soak`; a longa fica para a linha de comando
+    failures = soak(cycles=300, gif=GIF, sound='none')
+    assert failures == []
+
+
+def test_soak_low_memory(qapp, repo_root):
+    failures = soak(cycles=60, gif=GIF, sound='none', low_memory=True)
+    assert failures == []
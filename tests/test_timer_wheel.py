@@ -0,0 +1,60 @@
+from PyQt5.QtCore import Qt
+
+from components.timer_wheel import TimerWheel, WheelScheduler
+
+
+class FakeClock:
+    def __init__(self, ms=0.0):
+        self.ms = ms
+
+    def __call__(self):
+        return self.ms / 1000.0
+
+
+def _fired_at(wheel, clock, until):
+    fired = []
+    for tick in range(wheel.tick + 1, until + 1):
+        clock.ms = tick
+        if wheel.advance(tick):
+            fired.append(tick)
+    return fired
+
+
+def test_fires_on_higher_level_slot_boundary():
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    # 256 e 65536 caem no começo de uma posição dos níveis 1 e 2
+    for delay in (255, 256, 257, 65536):
+        wheel.schedule(delay, lambda: None)
+    assert _fired_at(wheel, clock, 65540) == [255, 256, 257, 65536]
+    assert len(wheel) == 0
+
+
+def test_periodic_keeps_its_period_across_cascades():
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    wheel.schedule(128, lambda: None, interval_ms=128)
+    assert _fired_at(wheel, clock, 1024) == list(range(128, 1025, 128))
+
+
+def test_cancel():
+    clock = FakeClock()
+    wheel = TimerWheel(clock=clock)
+    entry = wheel.schedule(300, lambda: None)
+    wheel.cancel(entry)
+    assert not entry.active and len(wheel) == 0
+    assert _fired_at(wheel, clock, 400) == []
+
+
+def test_very_coarse_timer_lands_on_whole_seconds(qapp):
+    scheduler = WheelScheduler()
+    clock = FakeClock(12345.6)
+    scheduler.wheel = TimerWheel(clock=clock)
+    timer = scheduler.timer()
+    timer.setTimerType(Qt.VeryCoarseTimer)
+    assert timer.timerType() == Qt.VeryCoarseTimer
+    timer.start(2300)
+    # Intervalo arredondado para 2 s, disparos no segundo cheio
+    assert timer._entry.due == 15000
+    assert timer._entry.interval == 2000
+    timer.stop()